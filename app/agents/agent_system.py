@@ -4,61 +4,223 @@ Agent System for managing all agents and their communication.
 import asyncio
 import logging
 import uuid
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from app.agents.base_agent import BaseAgent, Message
+from app.agents.content_store import ContentStore, create_content_store
 from app.agents.coordinator_agent import CoordinatorAgent
 from app.agents.analyzer_agent import AnalyzerAgent
 from app.agents.fix_generator_agent import FixGeneratorAgent
+from app.agents.message_queue import AgentOverloadedError, PriorityMessageQueue
+from app.agents.session_store import SessionStore, create_session_store, is_finished
+from app.agents.transport import MessageTransport, create_transport
+from app.core.config import settings
+from app.core.request_context import (
+    PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITIES, CancellationToken,
+    bounded_timeout, get_deadline, get_priority, normalize_priority
+)
 from app.services.ai.groq_client import GroqClient
 from app.utils.sandbox.code_runner import CodeRunner
 
+# Process roles: "all" serves requests and runs agents, "api" only submits and
+# waits on sessions, "worker" only runs agents fed from the broker
+ROLE_ALL = "all"
+ROLE_API = "api"
+ROLE_WORKER = "worker"
+
+# Share of AGENT_MAX_BACKLOG each priority may fill; lower priorities are shed first
+ADMISSION_SHARE = {
+    PRIORITY_INTERACTIVE: 1.0,
+    PRIORITY_BACKGROUND: 0.75,
+    PRIORITY_BATCH: 0.5,
+}
+
 class AgentSystem:
     """
     System for managing all agents and their communication.
     """
-    def __init__(self, llm_client: GroqClient):
+    def __init__(
+        self,
+        llm_client: GroqClient,
+        role: Optional[str] = None,
+        transport: Optional[MessageTransport] = None,
+        session_store: Optional[SessionStore] = None,
+        content_store: Optional[ContentStore] = None
+    ):
         self.llm_client = llm_client
+        self.role = role or settings.AGENT_SYSTEM_ROLE
+        # Carries messages between processes (in-process unless USE_REDIS is enabled)
+        self.transport = transport if transport is not None else create_transport()
+        self.session_store = session_store if session_store is not None else create_session_store()
+        # Source code of in-flight sessions; messages carry references into it
+        self.content_store = content_store if content_store is not None else create_content_store()
         self.agents: Dict[str, BaseAgent] = {}
+        # Interchangeable agents grouped by type; messages to any member go to the least loaded one
+        self.pools: Dict[str, List[BaseAgent]] = {}
         self.logger = logging.getLogger("agent_system")
-        self.message_queue: asyncio.Queue[Message] = asyncio.Queue()
+        # Local dispatch queue, fed from the transport
+        self.message_queue = PriorityMessageQueue()
         self.running = False
+        self.rejected_requests: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        # Cancellation tokens of sessions with work in this process
+        self.cancel_tokens: Dict[str, CancellationToken] = {}
+        # Cancellation notices sent from code that cannot await
+        self._pending_notices: Set[asyncio.Task] = set()
     
     def initialize_agents(self):
-        """Initialize all agents in the system."""
+        """Initialize all agents in the system (none in the api role)."""
+        if self.role == ROLE_API:
+            self.logger.info("API role: agents run in worker processes")
+            return
+        
         # Create a code runner for sandbox execution
         code_runner = CodeRunner()
         
-        # Create analyzer agent
-        analyzer = AnalyzerAgent(
-            agent_id="analyzer_1",
-            llm_client=self.llm_client,
-            code_runner=code_runner
-        )
-        analyzer.logger = self.logger
-        self.agents[analyzer.agent_id] = analyzer
+        # Create the analyzer pool
+        for index in range(1, max(1, settings.AGENT_ANALYZER_WORKERS) + 1):
+            self.register_agent(AnalyzerAgent(
+                agent_id=f"analyzer_{index}",
+                llm_client=self.llm_client,
+                code_runner=code_runner
+            ))
         
-        # Create fix generator agent
-        fix_generator = FixGeneratorAgent(
-            agent_id="fix_generator_1",
-            llm_client=self.llm_client
-        )
-        fix_generator.logger = self.logger
-        self.agents[fix_generator.agent_id] = fix_generator
+        # Create the fix generator pool
+        for index in range(1, max(1, settings.AGENT_FIX_GENERATOR_WORKERS) + 1):
+            self.register_agent(FixGeneratorAgent(
+                agent_id=f"fix_generator_{index}",
+                llm_client=self.llm_client
+            ))
         
-        # Create coordinator agent
+        # Create coordinator agent (a single instance owns all session state)
         coordinator = CoordinatorAgent(
             agent_id="coordinator_1",
             llm_client=self.llm_client,
-            agent_registry=self.agents
+            agent_registry=self.agents,
+            session_store=self.session_store
         )
-        coordinator.logger = self.logger
-        self.agents[coordinator.agent_id] = coordinator
+        self.register_agent(coordinator)
         
         # Set up message sending for all agents
         for agent in self.agents.values():
             agent.send_message = self.send_message
     
+    def register_agent(self, agent: BaseAgent):
+        """Add an agent to the system and to the pool for its type."""
+        agent.logger = self.logger
+        agent.content_store = self.content_store
+        self.agents[agent.agent_id] = agent
+        self.pools.setdefault(agent.agent_type, []).append(agent)
+    
+    def resolve_recipient(self, recipient_id: str) -> Optional[BaseAgent]:
+        """
+        Pick the agent that should handle a message addressed to recipient_id.
+        
+        Agents address each other by the first member of a pool (e.g. "analyzer_1");
+        the message is delivered to whichever member of that pool has the least work.
+        """
+        agent = self.agents.get(recipient_id)
+        if not agent:
+            return None
+        
+        pool = self.pools.get(agent.agent_type) or [agent]
+        return min(pool, key=lambda member: member.load)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get per-type worker counts and load."""
+        return {
+            agent_type: {
+                "workers": len(pool),
+                "busy": sum(1 for agent in pool if agent.load),
+                "queued": sum(agent.message_queue.qsize() for agent in pool),
+                "load": {agent.agent_id: agent.load for agent in pool}
+            }
+            for agent_type, pool in self.pools.items()
+        }
+    
+    def backlog(self) -> int:
+        """Number of queued requests and agent work items across the whole system."""
+        local = self.message_queue.backlog + sum(agent.message_queue.backlog for agent in self.agents.values())
+        return local + self.transport.backlog()
+    
+    def check_admission(self, priority: Optional[str] = None):
+        """
+        Refuse new work when the backlog is full.
+        
+        Args:
+            priority: Priority class of the new work (defaults to the current request's)
+        
+        Raises:
+            AgentOverloadedError: If the backlog has reached the limit for this priority
+        """
+        priority = normalize_priority(priority or get_priority())
+        limit = settings.AGENT_MAX_BACKLOG * ADMISSION_SHARE[priority]
+        backlog = self.backlog()
+        
+        if backlog >= limit:
+            self.rejected_requests[priority] += 1
+            raise AgentOverloadedError(
+                f"Agent system is overloaded ({backlog} requests queued); try again later",
+                retry_after=settings.AGENT_OVERLOAD_RETRY_AFTER
+            )
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get backlog, admission limit and rejection counts."""
+        return {
+            "backlog": self.backlog(),
+            "max_backlog": settings.AGENT_MAX_BACKLOG,
+            "dispatch_queue": self.message_queue.qsize(),
+            "transport": self.transport.backlog(),
+            "rejected": dict(self.rejected_requests)
+        }
+    
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Get the session store's size and eviction counts, and the content held for sessions."""
+        return {**self.session_store.stats(), "content": self.content_store.stats()}
+    
+    async def session_reaper(self):
+        """Periodically drop expired sessions from the coordinator's session store."""
+        while self.running:
+            await asyncio.sleep(settings.SESSION_REAP_INTERVAL)
+            
+            try:
+                reaped = self.session_store.reap()
+                if reaped:
+                    self.logger.info(f"Reaped {reaped} expired sessions")
+                self.content_store.reap()
+                await self.release_cancel_tokens()
+            except Exception as e:
+                self.logger.error(f"Error reaping sessions: {str(e)}")
+    
+    async def release_cancel_tokens(self):
+        """Forget the cancellation tokens of sessions that are finished or gone."""
+        for session_id in list(self.cancel_tokens):
+            session = await self.session_store.load(session_id)
+            if session is None or is_finished(session):
+                self.cancel_tokens.pop(session_id, None)
+    
+    def cancel_token_for(self, session_id: str) -> CancellationToken:
+        """Get (or create) this process's cancellation token for a session."""
+        token = self.cancel_tokens.get(session_id)
+        if token is None:
+            token = self.cancel_tokens[session_id] = CancellationToken()
+        return token
+    
+    async def cancel_session(self, session_id: str, reason: str = "Session cancelled"):
+        """
+        Stop a session's work and mark it failed
+        
+        Work in this process is cancelled at once; the coordinator is told through a
+        control message, which also cancels the session in the process that receives it.
+        Agents in other processes stop when the session's deadline passes.
+        """
+        self.cancel_token_for(session_id).cancel(reason)
+        await self.send_message(Message(
+            message_type="cancel_session",
+            sender_id="agent_system",
+            recipient_id="coordinator_1",
+            content={"session_id": session_id, "reason": reason}
+        ))
+    
     async def start(self):
         """Start the agent system."""
         self.running = True
@@ -68,6 +230,15 @@ class AgentSystem:
         for agent in self.agents.values():
             agent_tasks.append(asyncio.create_task(agent.start()))
         
+        if self.agents:
+            # Take messages from the transport as fast as they are dispatched
+            agent_tasks.append(asyncio.create_task(
+                self.transport.consume(self.message_queue.put, self.message_queue.join)
+            ))
+            
+            # Expire finished and abandoned sessions in the background
+            agent_tasks.append(asyncio.create_task(self.session_reaper()))
+        
         # Start the message dispatcher
         dispatcher_task = asyncio.create_task(self.message_dispatcher())
         
@@ -77,7 +248,7 @@ class AgentSystem:
         except asyncio.CancelledError:
             self.logger.info("Agent system shutting down")
         finally:
-            # Cancel all agent tasks
+            # Cancel all agent tasks (and the transport consumer and session reaper)
             for task in agent_tasks:
                 task.cancel()
             
@@ -97,9 +268,16 @@ class AgentSystem:
             try:
                 recipient_id = message.recipient_id
                 
+                # Session work shares one token per process, also for messages from other processes
+                session_id = message.content.get("session_id")
+                if session_id:
+                    message.cancel_token = self.cancel_token_for(session_id)
+                    if message.message_type == "cancel_session":
+                        message.cancel_token.cancel(message.content.get("reason", "Session cancelled"))
+                
                 if recipient_id in self.agents:
-                    # Send the message to the specific agent
-                    await self.agents[recipient_id].receive_message(message)
+                    # Send the message to the least loaded agent of the recipient's type
+                    await self.resolve_recipient(recipient_id).receive_message(message)
                 elif recipient_id == "user" or not recipient_id.endswith("_1"):
                     # This is a message for the user (either explicit "user" or any non-agent ID)
                     await self.handle_user_message(message)
@@ -108,36 +286,102 @@ class AgentSystem:
             except Exception as e:
                 self.logger.error(f"Error dispatching message: {str(e)}")
             finally:
+                await self.transport.ack(message)
                 self.message_queue.task_done()
     
     async def send_message(self, message: Message):
-        """Send a message to the appropriate recipient."""
-        await self.message_queue.put(message)
+        """Send a message to the appropriate recipient, through the transport."""
+        await self.transport.publish(message)
     
     async def handle_user_message(self, message: Message):
         """Handle a message intended for the user."""
         # In a real system, this would send the message to the user interface
         self.logger.info(f"Message for user: {message.content}")
     
-    async def submit_user_request(self, user_id: str, code: str, language: str, error_message: Optional[str] = None) -> str:
-        """Submit a user request to debug code."""
+    async def submit_user_request(
+        self,
+        user_id: str,
+        code: str,
+        language: str,
+        error_message: Optional[str] = None,
+        priority: Optional[str] = None,
+        deadline: Optional[float] = None
+    ) -> str:
+        """
+        Submit a user request to debug code.
+        
+        The priority class (interactive, background, batch) and the absolute
+        deadline default to those of the calling request and are carried
+        through the session; agents abandon the session's work once the
+        deadline passes.
+        
+        Raises:
+            AgentOverloadedError: If the system's backlog is full for this priority
+        """
+        priority = normalize_priority(priority or get_priority())
+        self.check_admission(priority)
+        
         # Create a session ID
         session_id = str(uuid.uuid4())
         
+        # Store the code once; messages only carry its reference
+        code_ref = await self.content_store.put(session_id, code)
+        
         # Create a message for the coordinator
+        token = self.cancel_token_for(session_id)
         message = Message(
             message_type="user_request",
             sender_id=user_id,
             recipient_id="coordinator_1",  # Assuming we have only one coordinator
             content={
                 "session_id": session_id,
-                "code": code,
+                "code_ref": code_ref,
                 "language": language,
-                "error_message": error_message
-            }
+                "error_message": error_message,
+                "priority": priority
+            },
+            deadline=deadline if deadline is not None else get_deadline(),
+            cancel_token=token
         )
         
         # Send the message
         await self.send_message(message)
         
-        return session_id 
\ No newline at end of file
+        return session_id
+    
+    async def wait_for_session(self, session_id: str, timeout: float) -> Dict[str, Any]:
+        """
+        Wait for a debugging session to reach completed or error state.
+        
+        Resolves as soon as the coordinator finishes the session instead of polling.
+        With a shared session store the session may be finished by another process.
+        The wait never outlasts the current request's deadline, and a session
+        nobody waits for any more (timeout, or the caller was cancelled) is
+        cancelled so it stops consuming capacity.
+        
+        Args:
+            session_id: ID returned by submit_user_request
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            The coordinator's session record
+        
+        Raises:
+            asyncio.TimeoutError: If the session does not finish in time
+        """
+        try:
+            session = await self.session_store.wait_finished(session_id, bounded_timeout(timeout))
+        except asyncio.TimeoutError:
+            await self.cancel_session(session_id, "Timed out waiting for the session")
+            raise
+        except asyncio.CancelledError:
+            # Cannot await here; cancel local work now and notify the coordinator in the background
+            self.cancel_token_for(session_id).cancel("Request cancelled")
+            notice = asyncio.create_task(self.cancel_session(session_id, "Request cancelled"))
+            self._pending_notices.add(notice)
+            notice.add_done_callback(self._pending_notices.discard)
+            raise
+        
+        # Cancelled tokens stay until the reaper releases them, so late messages are still dropped
+        self.cancel_tokens.pop(session_id, None)
+        return session
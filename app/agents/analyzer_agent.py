@@ -1,14 +1,18 @@
 """
 Analyzer Agent for analyzing code and identifying issues.
 """
+import asyncio
 import json
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional
 
 from app.agents.base_agent import BaseAgent, Message
+from app.core.config import settings
 from app.services.ai.groq_client import GroqClient
-from app.utils.parsing.parser_factory import get_parser
+from app.utils.issue_merging import SEVERITY_ORDER, merge_issues
+from app.utils.parsing.parser_factory import get_parser, is_supported_language
 from app.utils.sandbox.code_runner import CodeRunner
+from app.utils.static_analysis.python_rules import rule_engine
 
 class AnalyzerAgent(BaseAgent):
     """
@@ -39,7 +43,7 @@ class AnalyzerAgent(BaseAgent):
     async def analyze_code(self, message: Message) -> Message:
         """Analyze code to identify issues."""
         session_id = message.content.get("session_id")
-        code = message.content.get("code")
+        code = await self.resolve_code(message.content)
         language = message.content.get("language")
         error_message = message.content.get("error_message")
         
@@ -48,38 +52,37 @@ class AnalyzerAgent(BaseAgent):
         issues = []
         
         try:
-            # Step 1: Static analysis using language-specific parser
-            static_issues = await self.perform_static_analysis(code, language)
-            issues.extend(static_issues)
+            # Static findings are published as soon as they are ready; the LLM stage may wait on them
+            static = asyncio.ensure_future(self.run_static_stage(message, code, language))
             
-            # Step 2: If there's an error message, analyze it
+            # Independent stages run concurrently; results are merged in this fixed order
+            stages = []
+            
+            # If there's an error message, analyze it
             if error_message:
-                error_issues = await self.analyze_error_message(code, language, error_message)
-                issues.extend(error_issues)
+                stages.append(("error_message", self.analyze_error_message(code, language, error_message), settings.ANALYZER_STATIC_TIMEOUT))
             
-            # Step 3: If we have a code runner, try to execute the code
+            # If we have a code runner, try to execute the code
             if self.code_runner and not error_message:
-                runtime_issues = await self.execute_code(code, language)
-                issues.extend(runtime_issues)
-            
-            # Step 4: Use LLM to identify additional issues
-            llm_issues = await self.identify_issues_with_llm(code, language, error_message)
-            issues.extend(llm_issues)
+                stages.append(("sandbox", self.execute_code(code, language), settings.EXECUTION_TIMEOUT + settings.ANALYZER_SANDBOX_GRACE))
             
-            # Remove duplicates and assign IDs
-            unique_issues = []
-            seen_messages = set()
+            results = await asyncio.gather(
+                static,
+                *(self.run_stage(name, stage, timeout) for name, stage, timeout in stages),
+                # Use LLM to identify additional issues
+                self.run_llm_stage(static, code, language, error_message)
+            )
+            for stage_issues in results:
+                issues.extend(stage_issues)
             
-            for issue in issues:
-                if issue["message"] not in seen_messages:
-                    issue["id"] = str(uuid.uuid4())
-                    unique_issues.append(issue)
-                    seen_messages.add(issue["message"])
+            # Merge issues that several stages reported in different words, so each gets one fix
+            unique_issues = merge_issues(issues)
+            for issue in unique_issues:
+                issue["id"] = str(uuid.uuid4())
             
             # Sort issues by severity
-            severity_order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-            unique_issues.sort(key=lambda x: severity_order.get(x.get("severity", "info"), 5))
-            
+            unique_issues.sort(key=lambda x: SEVERITY_ORDER.get(x.get("severity", "info"), 5))
+        
         except Exception as e:
             self.log(f"Error during analysis: {str(e)}", level="ERROR")
             unique_issues = [{
@@ -108,20 +111,81 @@ class AnalyzerAgent(BaseAgent):
         self.log(f"Found {len(unique_issues)} issues in code")
         return response
     
+    async def run_stage(self, name: str, stage: Awaitable[List[Dict[str, Any]]], timeout: float) -> List[Dict[str, Any]]:
+        """
+        Run one analysis stage with its own timeout
+        
+        A stage that times out or fails contributes no issues instead of failing the analysis.
+        """
+        try:
+            return await asyncio.wait_for(stage, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.log(f"Analysis stage '{name}' timed out after {timeout}s", level="WARNING")
+        except Exception as e:
+            self.log(f"Analysis stage '{name}' failed: {str(e)}", level="ERROR")
+        
+        return []
+    
+    async def run_static_stage(self, message: Message, code: str, language: str) -> List[Dict[str, Any]]:
+        """
+        Run static analysis and send its findings to the requester right away
+        
+        The coordinator shows them as preliminary issues while the slower
+        stages are still running.
+        """
+        issues = await self.run_stage("static", self.perform_static_analysis(code, language), settings.ANALYZER_STATIC_TIMEOUT)
+        
+        if issues:
+            await self.send_message(Message(
+                message_type="analysis_progress",
+                sender_id=self.agent_id,
+                recipient_id=message.sender_id,
+                content={
+                    "session_id": message.content.get("session_id"),
+                    "stage": "static",
+                    "issues": [dict(issue) for issue in issues]
+                },
+                parent_id=message.message_id
+            ))
+        
+        return issues
+    
+    async def run_llm_stage(
+        self,
+        static: Awaitable[List[Dict[str, Any]]],
+        code: str,
+        language: str,
+        error_message: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the LLM stage as ANALYZER_LLM_POLICY allows
+        
+        "always" runs it alongside static analysis, "fallback" only when
+        static analysis found nothing, and "never" skips it.
+        """
+        policy = settings.ANALYZER_LLM_POLICY
+        if policy == "never":
+            return []
+        if policy == "fallback" and await static:
+            self.log("Static analysis found issues; skipping LLM analysis")
+            return []
+        
+        return await self.run_stage("llm", self.identify_issues_with_llm(code, language, error_message), settings.ANALYZER_LLM_TIMEOUT)
+    
     async def perform_static_analysis(self, code: str, language: str) -> List[Dict[str, Any]]:
-        """Perform static analysis on the code using language-specific parsers."""
+        """Perform static analysis on the code using language-specific parsers and rules."""
         issues: List[Dict[str, Any]] = []
         
         try:
-            # Get the appropriate parser for the language
-            parser = get_parser(language)
+            # Get the appropriate parser for the language (others would be parsed as Python)
+            parser = get_parser(language) if is_supported_language(language) else None
             if not parser:
                 self.log(f"No parser available for language: {language}", level="WARNING")
                 return issues
             
-            # Parse the code and get syntax issues
-            parsed = parser.parse(code)
-            syntax_issues = parser.get_syntax_issues(parsed)
+            # Parse the code once and get syntax issues (off the event loop so other stages keep running)
+            module = await asyncio.to_thread(parser.parse_module, code)
+            syntax_issues = module.syntax_issues()
             
             for issue in syntax_issues:
                 issues.append({
@@ -134,6 +198,10 @@ class AnalyzerAgent(BaseAgent):
                     "severity": "high",
                     "confidence": 0.9
                 })
+            
+            # Rule checks run in one pass over the cached tree (modules that failed to parse have none)
+            findings = await asyncio.to_thread(rule_engine.run, module)
+            issues.extend(finding.to_issue() for finding in findings)
         except Exception as e:
             self.log(f"Error in static analysis: {str(e)}", level="ERROR")
         
@@ -165,7 +233,7 @@ class AnalyzerAgent(BaseAgent):
             return issues
         
         try:
-            result = await self.code_runner.run_code(code, language)
+            result = await self.code_runner.run_code(code, language, timeout=settings.EXECUTION_TIMEOUT)
             
             if result.get("error"):
                 error_message = result.get("error")
@@ -206,7 +274,7 @@ class AnalyzerAgent(BaseAgent):
                 })
             
             self.log(f"LLM analysis found {len(issues)} issues")
-            
+        
         except Exception as e:
             self.log(f"Error in LLM analysis: {str(e)}", level="ERROR")
             import traceback
@@ -3,14 +3,37 @@ Base agent class that all specialized agents will inherit from.
 """
 from abc import ABC, abstractmethod
 import asyncio
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional, Callable
 
+from app.agents.content_store import ContentStore, content_store
+from app.agents.message_queue import CLASS_CONTROL, PriorityMessageQueue, message_class
+from app.core.request_context import (
+    CancellationToken, RequestCancelledError, check_cancelled, get_cancel_token, get_deadline,
+    request_context, time_remaining
+)
+
 class Message:
     """
     Represents a message passed between agents.
+    
+    A message carries the absolute deadline and the cancellation token of the
+    work it belongs to; both default to those of the current request context,
+    so messages an agent sends while handling a message inherit them. The token
+    is process-local and is not serialized.
+    
+    Messages are created on every hop, so they use slots, generate their ID
+    only when it is first read and keep the creation time as a float until a
+    timestamp is asked for. Source code travels as a "code_ref" into the
+    content store rather than inline (see BaseAgent.resolve_code).
     """
+    __slots__ = (
+        "message_type", "sender_id", "recipient_id", "content", "parent_id",
+        "deadline", "cancel_token", "_message_id", "_created", "_timestamp"
+    )
+    
     def __init__(
         self,
         message_type: str,
@@ -19,15 +42,42 @@ class Message:
         content: Dict[str, Any],
         message_id: Optional[str] = None,
         parent_id: Optional[str] = None,
-        timestamp: Optional[datetime] = None
+        timestamp: Optional[datetime] = None,
+        deadline: Optional[float] = None,
+        cancel_token: Optional[CancellationToken] = None
     ):
-        self.message_id = message_id or str(uuid.uuid4())
+        self._message_id = message_id
         self.message_type = message_type
         self.sender_id = sender_id
         self.recipient_id = recipient_id
         self.content = content
         self.parent_id = parent_id
-        self.timestamp = timestamp or datetime.utcnow()
+        self._created = time.time()
+        self._timestamp = timestamp
+        self.deadline = deadline if deadline is not None else get_deadline()
+        self.cancel_token = cancel_token if cancel_token is not None else get_cancel_token()
+    
+    @property
+    def message_id(self) -> str:
+        """Unique message ID, generated on first access."""
+        if self._message_id is None:
+            self._message_id = str(uuid.uuid4())
+        return self._message_id
+    
+    @message_id.setter
+    def message_id(self, value: str):
+        self._message_id = value
+    
+    @property
+    def timestamp(self) -> datetime:
+        """UTC creation time of the message."""
+        if self._timestamp is None:
+            self._timestamp = datetime.utcfromtimestamp(self._created)
+        return self._timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self._timestamp = value
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert the message to a dictionary."""
@@ -38,7 +88,8 @@ class Message:
             "recipient_id": self.recipient_id,
             "content": self.content,
             "parent_id": self.parent_id,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self.timestamp.isoformat(),
+            "deadline": self.deadline
         }
     
     @classmethod
@@ -52,7 +103,8 @@ class Message:
             recipient_id=data["recipient_id"],
             content=data["content"],
             parent_id=data.get("parent_id"),
-            timestamp=timestamp
+            timestamp=timestamp,
+            deadline=data.get("deadline")
         )
 
 class BaseAgent(ABC):
@@ -63,18 +115,37 @@ class BaseAgent(ABC):
         self.agent_id = agent_id
         self.agent_type = agent_type
         self.memory: Dict[str, Any] = {}
-        self.message_queue: asyncio.Queue[Message] = asyncio.Queue()
+        self.message_queue = PriorityMessageQueue()
         self.tools: Dict[str, Callable] = {}
         self.logger = None  # Will be set up by the agent system
+        self.content_store: ContentStore = content_store  # Replaced by the agent system's store
+        self._processing = 0
+    
+    @property
+    def load(self) -> int:
+        """Number of messages queued for or being processed by this agent."""
+        return self.message_queue.qsize() + self._processing
     
     async def start(self):
         """Start the agent's message processing loop."""
         while True:
             message = await self.message_queue.get()
+            self._processing += 1
             try:
-                response = await self.process_message(message)
+                # LLM calls made while handling the message inherit the request's priority,
+                # session, deadline and cancellation token
+                with request_context(
+                    priority=message.content.get("priority"),
+                    session_id=message.content.get("session_id"),
+                    deadline=message.deadline,
+                    cancel_token=message.cancel_token
+                ):
+                    response = await self.process_cancellable(message)
                 if response:
                     await self.send_message(response)
+            except RequestCancelledError as e:
+                # Nobody is waiting for the result any more; drop the work without replying
+                self.log(f"Dropped message {message.message_id}: {str(e)}", level="WARNING")
             except Exception as e:
                 error_msg = f"Error processing message {message.message_id}: {str(e)}"
                 self.log(error_msg, level="ERROR")
@@ -88,8 +159,69 @@ class BaseAgent(ABC):
                 )
                 await self.send_message(error_response)
             finally:
+                self._processing -= 1
                 self.message_queue.task_done()
     
+    async def process_cancellable(self, message: Message) -> Optional[Message]:
+        """
+        Process a message, abandoning it as soon as its deadline passes or its token is cancelled
+        
+        Control messages (errors, cancellations) are always processed, since they
+        are what closes an abandoned session.
+        
+        Raises:
+            RequestCancelledError: If the message was abandoned
+        """
+        if message_class(message) == CLASS_CONTROL:
+            return await self.process_message(message)
+        
+        check_cancelled()
+        
+        task = asyncio.ensure_future(self.process_message(message))
+        waiters = [task]
+        token = message.cancel_token
+        if token is not None:
+            waiters.append(asyncio.ensure_future(token.wait()))
+        
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=time_remaining(), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            for waiter in waiters[1:]:
+                waiter.cancel()
+        
+        if task in done:
+            return task.result()
+        
+        # Stop the in-flight work (LLM calls, sandbox runs) instead of letting it finish unread
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        raise RequestCancelledError(token.reason if token is not None and token.cancelled else "Deadline exceeded")
+    
+    async def resolve_code(self, content: Dict[str, Any]) -> str:
+        """
+        Get the source code a message refers to
+        
+        Args:
+            content: Message content holding either "code" inline or a
+                "code_ref" into the session's content store
+        
+        Returns:
+            The source code ("" if the message carries none)
+        
+        Raises:
+            KeyError: If the referenced content has already been released
+        """
+        if "code" in content:
+            return content["code"]
+        
+        ref = content.get("code_ref")
+        if not ref:
+            return ""
+        return await self.content_store.get(content.get("session_id"), ref)
+    
     async def receive_message(self, message: Message):
         """Add a message to the agent's queue."""
         await self.message_queue.put(message)
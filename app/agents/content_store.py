@@ -0,0 +1,146 @@
+"""
+Per-session content store for the agent system.
+
+Source code is stored once per session and messages carry a reference (its
+SHA-256) instead of the text, so a large file is not copied into every
+message, queue entry and broker payload on its way through the agents.
+"""
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+def content_hash(text: str) -> str:
+    """Get the reference used for a piece of content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContentStore(ABC):
+    """
+    Content referenced by in-flight sessions, released when the session finishes.
+    """
+    @abstractmethod
+    async def put(self, session_id: str, text: str) -> str:
+        """Store content for a session and return its reference."""
+    
+    @abstractmethod
+    async def get(self, session_id: str, ref: str) -> str:
+        """
+        Get content stored for a session
+        
+        Raises:
+            KeyError: If the content was never stored or has been released
+        """
+    
+    @abstractmethod
+    async def release(self, session_id: str):
+        """Drop everything stored for a session."""
+    
+    @abstractmethod
+    def reap(self) -> int:
+        """Release content of sessions that were never finished and return how many were released."""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of sessions and bytes held."""
+
+
+class InMemoryContentStore(ContentStore):
+    """
+    Process-local content store.
+    
+    Content is normally released when its session finishes; content of
+    sessions that never finish is reaped SESSION_ACTIVE_TTL_SECONDS after it
+    was stored, like the in-flight sessions themselves.
+    """
+    def __init__(self, ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = settings.SESSION_ACTIVE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._clock = clock
+        self._contents: Dict[str, Dict[str, str]] = {}
+        self._expires_at: Dict[str, float] = {}
+    
+    async def put(self, session_id: str, text: str) -> str:
+        ref = content_hash(text)
+        self._contents.setdefault(session_id, {})[ref] = text
+        self._expires_at[session_id] = self._clock() + self.ttl_seconds
+        return ref
+    
+    async def get(self, session_id: str, ref: str) -> str:
+        return self._contents[session_id][ref]
+    
+    async def release(self, session_id: str):
+        self._contents.pop(session_id, None)
+        self._expires_at.pop(session_id, None)
+    
+    def reap(self) -> int:
+        now = self._clock()
+        expired = [session_id for session_id, expires_at in self._expires_at.items() if expires_at <= now]
+        
+        for session_id in expired:
+            self._contents.pop(session_id, None)
+            self._expires_at.pop(session_id, None)
+        
+        return len(expired)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._contents),
+            "bytes": sum(len(text) for contents in self._contents.values() for text in contents.values())
+        }
+
+
+class RedisContentStore(ContentStore):
+    """
+    Content store shared by API and worker processes through Redis.
+    
+    Each session's content lives in one hash that expires with the session's
+    in-flight TTL, so content of abandoned sessions does not outlive them.
+    """
+    def __init__(self, redis_client=None, prefix: str = "agentlogger:content"):
+        if redis_client is None:
+            from redis.asyncio import Redis
+            from app.agents.transport import redis_connection_kwargs
+            redis_client = Redis(**redis_connection_kwargs())
+        
+        self.redis = redis_client
+        self.prefix = prefix
+    
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+    
+    async def put(self, session_id: str, text: str) -> str:
+        ref = content_hash(text)
+        key = self._key(session_id)
+        await self.redis.hset(key, ref, text)
+        await self.redis.expire(key, max(1, int(settings.SESSION_ACTIVE_TTL_SECONDS)))
+        return ref
+    
+    async def get(self, session_id: str, ref: str) -> str:
+        text: Optional[str] = await self.redis.hget(self._key(session_id), ref)
+        if text is None:
+            raise KeyError(ref)
+        return text
+    
+    async def release(self, session_id: str):
+        await self.redis.delete(self._key(session_id))
+    
+    def reap(self) -> int:
+        # Redis expires content on its own
+        return 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+# Create a global instance
+content_store = InMemoryContentStore()
+
+
+def create_content_store() -> ContentStore:
+    """Get the content store selected by settings (shared through Redis when USE_REDIS is enabled)."""
+    if settings.USE_REDIS:
+        return RedisContentStore()
+    return content_store
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from app.agents.base_agent import BaseAgent, Message
+from app.agents.session_store import InMemorySessionStore, SessionStore, compact_session, is_finished
 
 
 class CoordinatorAgent(BaseAgent):
@@ -16,11 +17,18 @@ class CoordinatorAgent(BaseAgent):
     between analyzer, fix generator, and other specialized agents.
     """
     
-    def __init__(self, agent_id: str, llm_client, agent_registry: Dict[str, BaseAgent]):
+    def __init__(
+        self,
+        agent_id: str,
+        llm_client,
+        agent_registry: Dict[str, BaseAgent],
+        session_store: Optional[SessionStore] = None
+    ):
         super().__init__(agent_id, "coordinator")
         self.llm_client = llm_client
         self.agent_registry = agent_registry
-        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        # Bounded store: finished sessions expire, idle ones are reaped by the agent system
+        self.active_sessions: SessionStore = session_store if session_store is not None else InMemorySessionStore()
     
     async def process_message(self, message: Message) -> Optional[Message]:
         """Process incoming messages and coordinate the debugging workflow."""
@@ -28,12 +36,16 @@ class CoordinatorAgent(BaseAgent):
         
         if message.message_type == "user_request":
             return await self._handle_user_request(message)
+        elif message.message_type == "analysis_progress":
+            return await self._handle_analysis_progress(message)
         elif message.message_type == "analysis_result":
             return await self._handle_analysis_result(message)
         elif message.message_type == "fix_result":
             return await self._handle_fix_result(message)
         elif message.message_type == "error":
             return await self._handle_error(message)
+        elif message.message_type == "cancel_session":
+            return await self._handle_cancel(message)
         else:
             self.log(f"Unknown message type: {message.message_type}", level="WARNING")
             return None
@@ -42,21 +54,28 @@ class CoordinatorAgent(BaseAgent):
         """Handle a new user debugging request."""
         content = message.content
         session_id = content.get("session_id", str(uuid.uuid4()))
-        code = content.get("code")
         language = content.get("language")
         error_message = content.get("error_message")
+        priority = content.get("priority")
+        
+        # The code is stored once per session; agents receive a reference to it
+        code_ref = content.get("code_ref")
+        if code_ref is None:
+            code_ref = await self.content_store.put(session_id, content.get("code") or "")
         
         # Initialize session
-        self.active_sessions[session_id] = {
+        session = {
             "state": "analyzing",
             "user_id": message.sender_id,
-            "code": code,
+            "code_ref": code_ref,
             "language": language,
             "error_message": error_message,
+            "priority": priority,
             "started_at": datetime.utcnow().isoformat(),
             "issues": [],
             "fixes": []
         }
+        await self.active_sessions.save(session_id, session)
         
         self.log(f"Starting debugging session {session_id}")
         
@@ -69,9 +88,10 @@ class CoordinatorAgent(BaseAgent):
                 recipient_id=analyzer_id,
                 content={
                     "session_id": session_id,
-                    "code": code,
+                    "code_ref": code_ref,
                     "language": language,
-                    "error_message": error_message
+                    "error_message": error_message,
+                    "priority": priority
                 },
                 parent_id=message.message_id
             )
@@ -93,20 +113,43 @@ class CoordinatorAgent(BaseAgent):
             )
         else:
             self.log(f"Analyzer agent {analyzer_id} not found", level="ERROR")
-            self.active_sessions[session_id]["state"] = "error"
-            self.active_sessions[session_id]["error"] = "Analyzer agent not available"
+            session["state"] = "error"
+            session["error"] = "Analyzer agent not available"
+            await self._finish_session(session_id, session, expected_state="analyzing")
+            return None
+    
+    async def _handle_analysis_progress(self, message: Message) -> Optional[Message]:
+        """Show early findings (static analysis) as the session's issues until the full analysis arrives."""
+        content = message.content
+        session_id = content.get("session_id")
+        
+        session = await self.active_sessions.load(session_id)
+        if session is None or session.get("state") != "analyzing":
+            return None
+        
+        session["issues"] = content.get("issues", [])
+        # A late update must not overwrite a state another worker moved the session to meanwhile
+        if not await self.active_sessions.save(session_id, session, expected_state="analyzing"):
             return None
+        
+        self.log(f"Received {len(session['issues'])} preliminary issues from {content.get('stage')} analysis for session {session_id}")
+        return None
     
     async def _handle_analysis_result(self, message: Message) -> Optional[Message]:
         """Handle analysis results from the analyzer agent."""
         content = message.content
         session_id = content.get("session_id")
         
-        if session_id not in self.active_sessions:
+        session = await self.active_sessions.load(session_id)
+        if session is None:
             self.log(f"Session {session_id} not found", level="WARNING")
             return None
         
-        session = self.active_sessions[session_id]
+        if is_finished(session):
+            self.log(f"Ignoring analysis for finished session {session_id}")
+            return None
+        
+        state = session["state"]
         issues = content.get("issues", [])
         session["issues"] = issues
         
@@ -115,6 +158,8 @@ class CoordinatorAgent(BaseAgent):
         # If issues were found, send to fix generator
         if issues:
             session["state"] = "generating_fixes"
+            if not await self._save_transition(session_id, session, state):
+                return None
             
             fix_generator_id = "fix_generator_1"  # Assuming we have this agent
             if fix_generator_id in self.agent_registry:
@@ -124,10 +169,11 @@ class CoordinatorAgent(BaseAgent):
                     recipient_id=fix_generator_id,
                     content={
                         "session_id": session_id,
-                        "code": session["code"],
+                        "code_ref": session["code_ref"],
                         "language": session["language"],
                         "issues": issues,
-                        "error_message": session.get("error_message")
+                        "error_message": session.get("error_message"),
+                        "priority": session.get("priority")
                     },
                     parent_id=message.message_id
                 )
@@ -137,10 +183,13 @@ class CoordinatorAgent(BaseAgent):
                 self.log(f"Fix generator agent {fix_generator_id} not found", level="ERROR")
                 session["state"] = "error"
                 session["error"] = "Fix generator agent not available"
+                await self._finish_session(session_id, session, expected_state="generating_fixes")
         else:
             # No issues found, mark as completed
             session["state"] = "completed"
             session["completed_at"] = datetime.utcnow().isoformat()
+            if not await self._finish_session(session_id, session, expected_state=state):
+                return None
             
             # Notify user
             return Message(
@@ -164,15 +213,23 @@ class CoordinatorAgent(BaseAgent):
         content = message.content
         session_id = content.get("session_id")
         
-        if session_id not in self.active_sessions:
+        session = await self.active_sessions.load(session_id)
+        if session is None:
             self.log(f"Session {session_id} not found", level="WARNING")
             return None
         
-        session = self.active_sessions[session_id]
+        if is_finished(session):
+            self.log(f"Ignoring fixes for finished session {session_id}")
+            return None
+        
+        state = session["state"]
         fixes = content.get("fixes", [])
         session["fixes"] = fixes
+        session["fixed_code"] = content.get("fixed_code")
         session["state"] = "completed"
         session["completed_at"] = datetime.utcnow().isoformat()
+        if not await self._finish_session(session_id, session, expected_state=state):
+            return None
         
         self.log(f"Received fixes for session {session_id}: {len(fixes)} fixes generated")
         
@@ -186,6 +243,7 @@ class CoordinatorAgent(BaseAgent):
                 "status": "completed",
                 "issues": session["issues"],
                 "fixes": fixes,
+                "fixed_code": session["fixed_code"],
                 "message": f"Debugging completed with {len(fixes)} fixes generated"
             },
             parent_id=message.message_id
@@ -197,11 +255,14 @@ class CoordinatorAgent(BaseAgent):
         session_id = content.get("session_id")
         error = content.get("error", "Unknown error")
         
-        if session_id and session_id in self.active_sessions:
-            session = self.active_sessions[session_id]
+        session = await self.active_sessions.load(session_id) if session_id else None
+        if session is not None:
+            state = session.get("state")
             session["state"] = "error"
             session["error"] = error
             session["completed_at"] = datetime.utcnow().isoformat()
+            if not await self._finish_session(session_id, session, expected_state=state):
+                return None
             
             self.log(f"Error in session {session_id}: {error}", level="ERROR")
             
@@ -221,6 +282,77 @@ class CoordinatorAgent(BaseAgent):
         
         return None
     
+    async def _handle_cancel(self, message: Message) -> Optional[Message]:
+        """Mark a session that nobody waits for any more as failed; its late results are ignored."""
+        session_id = message.content.get("session_id")
+        session = await self.active_sessions.load(session_id) if session_id else None
+        
+        if session is None or is_finished(session):
+            return None
+        
+        state = session["state"]
+        session["state"] = "error"
+        session["error"] = message.content.get("reason", "Session cancelled")
+        session["cancelled"] = True
+        session["completed_at"] = datetime.utcnow().isoformat()
+        if not await self._finish_session(session_id, session, expected_state=state):
+            return None
+        
+        self.log(f"Cancelled session {session_id}: {session['error']}", level="WARNING")
+        return None
+    
+    async def _save_transition(self, session_id: str, session: Dict[str, Any], expected_state: str) -> bool:
+        """
+        Store a session's new state if it is still in the state it was read in
+        
+        Coordinators in other processes may handle messages for the same session;
+        the one whose transition lands first wins and later ones are dropped.
+        """
+        if await self.active_sessions.save(session_id, session, expected_state=expected_state):
+            return True
+        
+        self.log(f"Session {session_id} left state '{expected_state}' meanwhile; dropping this update", level="WARNING")
+        return False
+    
+    async def _finish_session(self, session_id: str, session: Dict[str, Any], expected_state: str) -> bool:
+        """
+        Store a session that reached completed or error state and wake everyone waiting on it
+        
+        The stored record is compacted and the session's code is released from
+        the content store; waiters are woken through the session store, so they
+        may be in other processes when the store is shared. Nothing happens if
+        the session left expected_state meanwhile.
+        
+        Returns:
+            Whether the session was finished by this call
+        """
+        if not await self._save_transition(session_id, compact_session(session), expected_state):
+            return False
+        
+        await self.content_store.release(session_id)
+        await self.active_sessions.notify_finished(session_id)
+        return True
+    
+    async def wait_for_session(self, session_id: str, timeout: float) -> Dict[str, Any]:
+        """
+        Wait until a session reaches completed or error state
+        
+        Args:
+            session_id: The session to wait for (it may not have been created yet)
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            The session record
+        
+        Raises:
+            asyncio.TimeoutError: If the session does not finish in time
+        """
+        return await self.active_sessions.wait_finished(session_id, timeout)
+    
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Get session store size and eviction counts."""
+        return self.active_sessions.stats()
+    
     def get_session_status(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get the current status of a debugging session."""
         return self.active_sessions.get(session_id)
@@ -1,12 +1,17 @@
 """
 Fix Generator Agent for generating fixes for identified issues.
 """
+import asyncio
 import json
+import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from app.agents.base_agent import BaseAgent, Message
-from app.services.ai.groq_client import GroqClient
+from app.core.config import settings
+from app.services.ai.groq_client import EDITS_FORMAT, GroqClient, extract_json_text
+from app.utils.patching import PatchApplyError, apply_hunks, hunks_from_edits, merge_hunks, number_lines
+from app.utils.static_analysis.fixers import find_local_fix
 
 class FixGeneratorAgent(BaseAgent):
     """
@@ -35,20 +40,14 @@ class FixGeneratorAgent(BaseAgent):
     async def generate_fixes(self, message: Message) -> Message:
         """Generate fixes for identified issues."""
         session_id = message.content.get("session_id")
-        code = message.content.get("code")
+        code = await self.resolve_code(message.content)
         language = message.content.get("language")
         issues = message.content.get("issues", [])
         
         self.log(f"Generating fixes for {len(issues)} issues in session {session_id}")
         
-        fixes = []
-        
         try:
-            # Process each issue and generate a fix
-            for issue in issues:
-                fix = await self.generate_fix_for_issue(code, language, issue)
-                if fix:
-                    fixes.append(fix)
+            fixes = await self.generate_fixes_for_issues(code, language, issues)
         except Exception as e:
             self.log(f"Error generating fixes: {str(e)}", level="ERROR")
             # Return error message to coordinator
@@ -71,6 +70,7 @@ class FixGeneratorAgent(BaseAgent):
             content={
                 "session_id": session_id,
                 "fixes": fixes,
+                "fixed_code": self.merge_fixes(code, fixes),
                 "fix_generation_complete": True
             },
             parent_id=message.message_id
@@ -79,44 +79,214 @@ class FixGeneratorAgent(BaseAgent):
         self.log(f"Generated {len(fixes)} fixes")
         return response
     
-    async def generate_fix_for_issue(self, code: str, language: str, issue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Generate a fix for a specific issue."""
-        try:
-            issue_id = issue.get("id")
-            issue_type = issue.get("type")
-            message = issue.get("message")
-            line_start = issue.get("line_start", 1)
-            line_end = issue.get("line_end", line_start)
+    async def generate_fixes_for_issues(self, code: str, language: str, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Generate fixes for all issues in a file
+        
+        Issues a deterministic local fixer can handle are fixed without the LLM. The
+        rest are resolved in as few size-bounded batched calls as possible. Issues a
+        batch did not cover, or all issues when the file is too large to batch, fall
+        back to one call per issue with bounded concurrency.
+        
+        Args:
+            code: The full source code
+            language: The programming language of the code
+            issues: Issues reported by the analyzer
+        
+        Returns:
+            List of fixes, in issue order
+        """
+        if not issues:
+            return []
+        
+        semaphore = asyncio.Semaphore(max(1, settings.FIX_MAX_CONCURRENCY))
+        fixes_by_issue: Dict[int, Dict[str, Any]] = self.generate_local_fixes(code, language, issues)
+        
+        pending = [i for i in range(len(issues)) if i not in fixes_by_issue]
+        if self.can_batch(code, [issues[i] for i in pending]):
+            batch_size = max(1, settings.FIX_BATCH_MAX_ISSUES)
+            batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+            
+            async def run_batch(indexes: List[int]) -> Dict[int, Dict[str, Any]]:
+                async with semaphore:
+                    return await self.generate_batch_fix(code, language, [issues[i] for i in indexes], indexes)
             
-            # Get the relevant code snippet
-            code_lines = code.splitlines()
-            if line_start > len(code_lines):
-                line_start = len(code_lines)
-            if line_end > len(code_lines):
-                line_end = len(code_lines)
+            for batch_fixes in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+                fixes_by_issue.update(batch_fixes)
+        
+        remaining = [i for i in pending if i not in fixes_by_issue]
+        if remaining:
+            if len(remaining) < len(pending):
+                self.log(f"Batched fix missed {len(remaining)} issues, retrying them individually", level="WARNING")
             
-            # Extract the relevant code snippet (with context)
-            context_lines = 5  # Number of lines of context to include
-            snippet_start = max(0, line_start - context_lines - 1)
-            snippet_end = min(len(code_lines), line_end + context_lines)
-            code_snippet = "\n".join(code_lines[snippet_start:snippet_end])
+            async def run_single(index: int) -> Optional[Dict[str, Any]]:
+                async with semaphore:
+                    return await self.generate_fix_for_issue(code, language, issues[index])
             
-            # Create a prompt for the LLM
-            prompt = self.create_fix_prompt(code, code_snippet, language, issue, snippet_start + 1)
+            results = await asyncio.gather(*(run_single(i) for i in remaining))
+            for index, fix in zip(remaining, results):
+                if fix:
+                    fixes_by_issue[index] = fix
+        
+        return [fixes_by_issue[i] for i in sorted(fixes_by_issue)]
+    
+    def generate_local_fixes(self, code: str, language: str, issues: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Fix issues with the deterministic local fixers
+        
+        Every fix is verified by parsing the fixed code. The fixers stop once
+        LOCAL_FIX_BUDGET_MS is spent; issues they leave go to the LLM.
+        
+        Args:
+            code: The full source code
+            language: The programming language of the code
+            issues: Issues reported by the analyzer
+        
+        Returns:
+            Fixes keyed by issue position
+        """
+        fixes: Dict[int, Dict[str, Any]] = {}
+        if settings.LOCAL_FIX_BUDGET_MS <= 0:
+            return fixes
+        
+        deadline = time.perf_counter() + settings.LOCAL_FIX_BUDGET_MS / 1000
+        for index, issue in enumerate(issues):
+            if time.perf_counter() > deadline:
+                self.log(f"Local fix budget spent after {index} of {len(issues)} issues", level="WARNING")
+                break
             
-            # Call the LLM
-            response = await self.llm_client.generate_text(prompt)
+            try:
+                local_fix = find_local_fix(code, language, issue, deadline=deadline)
+            except Exception as e:
+                self.log(f"Local fixer failed for issue {issue.get('id')}: {str(e)}", level="ERROR")
+                continue
             
-            # Parse the response
+            if local_fix:
+                fixes[index] = {
+                    "id": str(uuid.uuid4()),
+                    "issue_id": issue.get("id"),
+                    "description": local_fix.description,
+                    "code_after": local_fix.code_after,
+                    "edits": [hunk.to_dict() for hunk in local_fix.hunks],
+                    "explanation": local_fix.explanation,
+                    "confidence": local_fix.confidence
+                }
+        
+        if fixes:
+            self.log(f"Fixed {len(fixes)} of {len(issues)} issues locally")
+        return fixes
+    
+    def can_batch(self, code: str, issues: List[Dict[str, Any]]) -> bool:
+        """Check whether the issues can be resolved with batched prompts."""
+        return (
+            settings.FIX_BATCH_ENABLED
+            and len(issues) > 1
+            and len(code) <= settings.FIX_BATCH_MAX_CODE_CHARS
+        )
+    
+    async def generate_batch_fix(
+        self,
+        code: str,
+        language: str,
+        issues: List[Dict[str, Any]],
+        indexes: List[int]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Resolve several issues with a single LLM call
+        
+        Args:
+            code: The full source code
+            language: The programming language of the code
+            issues: The issues in this batch
+            indexes: Position of each issue in the session's issue list
+        
+        Returns:
+            Fixes keyed by issue position; issues the model skipped are omitted
+        """
+        try:
+            prompt = self.create_batch_fix_prompt(code, language, issues)
+            response = await self.llm_client.generate_text(prompt, max_tokens=settings.FIX_BATCH_MAX_TOKENS)
+            batch_data = self.parse_batch_response(response)
+        except Exception as e:
+            self.log(f"Error generating batched fix: {str(e)}", level="ERROR")
+            return {}
+        
+        if not batch_data:
+            return {}
+        
+        fixes = {}
+        for entry in batch_data["fixes"]:
+            # Issues are numbered from 1 in the prompt
+            number = entry.get("issue")
+            if not isinstance(number, int) or not 1 <= number <= len(issues):
+                continue
+            
+            issue = issues[number - 1]
+            try:
+                hunks = hunks_from_edits(entry.get("edits") or [])
+                code_after = apply_hunks(code, hunks)
+            except PatchApplyError as e:
+                # Left for the per-issue fallback
+                self.log(f"Batched edits for issue {number} do not apply: {str(e)}", level="WARNING")
+                continue
+            
+            if not hunks:
+                continue
+            
+            fixes[indexes[number - 1]] = {
+                "id": str(uuid.uuid4()),
+                "issue_id": issue.get("id"),
+                "description": entry.get("description") or f"Fix for {issue.get('message')}",
+                "code_after": code_after,
+                "edits": [hunk.to_dict() for hunk in hunks],
+                "explanation": entry.get("explanation", ""),
+                "confidence": entry.get("confidence", 0.7)
+            }
+        
+        return fixes
+    
+    async def generate_fix_for_issue(self, code: str, language: str, issue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Generate a fix for a specific issue
+        
+        Edits are requested first; the whole fixed file is requested only if they do not apply.
+        """
+        try:
+            issue_id = issue.get("id")
+            message = issue.get("message")
+            
+            # Call the LLM for line-anchored edits
+            response = await self.llm_client.generate_text(self.create_fix_prompt(code, language, issue))
             fix_data = self.parse_llm_response(response)
             
+            edits: List[Dict[str, Any]] = []
+            code_after = None
             if fix_data:
+                try:
+                    hunks = hunks_from_edits(fix_data["edits"])
+                    if hunks:
+                        code_after = apply_hunks(code, hunks)
+                        edits = [hunk.to_dict() for hunk in hunks]
+                except PatchApplyError as e:
+                    self.log(f"Edits for issue {issue_id} do not apply: {str(e)}", level="WARNING")
+            
+            if code_after is None:
+                # Fall back to whole-file output
+                response = await self.llm_client.generate_text(
+                    self.create_fix_prompt(code, language, issue, whole_file=True),
+                    max_tokens=settings.FIX_BATCH_MAX_TOKENS
+                )
+                fix_data = self.parse_llm_response(response)
+                if fix_data and fix_data["fixed_code"]:
+                    code_after = self.apply_fix(code, fix_data)
+            
+            if fix_data and code_after is not None:
                 return {
                     "id": str(uuid.uuid4()),
                     "issue_id": issue_id,
                     "description": fix_data.get("description", f"Fix for {message}"),
-                    "code_before": code,
-                    "code_after": self.apply_fix(code, fix_data),
+                    "code_after": code_after,
+                    "edits": edits,
                     "explanation": fix_data.get("explanation", ""),
                     "confidence": fix_data.get("confidence", 0.7)
                 }
@@ -126,49 +296,133 @@ class FixGeneratorAgent(BaseAgent):
             self.log(f"Error generating fix: {str(e)}", level="ERROR")
             return None
     
-    def create_fix_prompt(self, full_code: str, code_snippet: str, language: str, issue: Dict[str, Any], snippet_start_line: int) -> str:
+    def merge_fixes(self, code: str, fixes: List[Dict[str, Any]]) -> str:
+        """
+        Combine independent fixes into one version of the file
+        
+        Edit-based fixes are merged in order, skipping any that overlap a fix already
+        taken. A whole-file fix is only used when no edit-based fix could be merged.
+        """
+        edit_fixes = [fix for fix in fixes if fix.get("edits")]
+        merged, applied = merge_hunks(code, [hunks_from_edits(fix["edits"]) for fix in edit_fixes])
+        
+        if len(applied) < len(edit_fixes):
+            self.log(f"Skipped {len(edit_fixes) - len(applied)} overlapping fixes while merging", level="WARNING")
+        
+        if not applied:
+            whole_file = next((fix for fix in fixes if not fix.get("edits")), None)
+            if whole_file:
+                return whole_file["code_after"]
+        
+        return merged
+    
+    def create_fix_prompt(self, code: str, language: str, issue: Dict[str, Any], whole_file: bool = False) -> str:
         """Create a prompt for the LLM to generate a fix."""
         issue_message = issue.get("message", "Unknown issue")
         issue_type = issue.get("type", "Unknown")
         line_start = issue.get("line_start", 1)
         line_end = issue.get("line_end", line_start)
         
-        # Adjust line numbers for the snippet
-        relative_line_start = line_start - snippet_start_line + 1
-        relative_line_end = line_end - snippet_start_line + 1
-        
-        prompt = f"""
+        if whole_file:
+            return f"""
 You are an expert code fixer. Fix the following {language} code that has an issue.
 
-FULL CODE:
+CODE:
 ```{language}
-{full_code}
+{code}
 ```
 
-CODE SNIPPET (with context):
+ISSUE:
+- Type: {issue_type}
+- Message: {issue_message}
+- Location: Lines {line_start}-{line_end}
+
+Your task is to fix this issue. Provide:
+1. A description of the fix
+2. The fixed code (the ENTIRE fixed file)
+3. An explanation of why this fix works
+4. A confidence score (0.0 to 1.0) of how certain you are this fix will resolve the issue
+
+Format your response as a JSON object with the following structure:
+{{
+  "description": "brief description of the fix",
+  "fixed_code": "the entire fixed code",
+  "explanation": "explanation of why this fix works",
+  "confidence": confidence_score
+}}
+
+Only respond with the JSON object, no other text.
+"""
+
+        prompt = f"""
+You are an expert code fixer. Fix the following {language} code that has an issue.
+
+CODE (with line numbers):
 ```{language}
-{code_snippet}
+{number_lines(code)}
 ```
 
 ISSUE:
 - Type: {issue_type}
 - Message: {issue_message}
-- Location: Lines {line_start}-{line_end} in the full code (Lines {relative_line_start}-{relative_line_end} in the snippet)
+- Location: Lines {line_start}-{line_end}
 
 Your task is to fix this issue. Provide:
 1. A description of the fix
-2. The fixed code (the ENTIRE fixed file, not just the snippet)
+2. The edits that fix it: only the lines that change, each with the exact original lines it replaces
 3. An explanation of why this fix works
 4. A confidence score (0.0 to 1.0) of how certain you are this fix will resolve the issue
 
 Format your response as a JSON object with the following structure:
 {{
-  "description": "brief description of the fix",
-  "fixed_code": "the entire fixed code",
+  "description": "brief description of the fix",{EDITS_FORMAT},
   "explanation": "explanation of why this fix works",
   "confidence": confidence_score
 }}
 
+Only respond with the JSON object, no other text.
+"""
+        return prompt
+    
+    def create_batch_fix_prompt(self, code: str, language: str, issues: List[Dict[str, Any]]) -> str:
+        """Create a prompt for the LLM to fix several issues in one pass."""
+        issue_lines = []
+        for number, issue in enumerate(issues, start=1):
+            line_start = issue.get("line_start", 1)
+            line_end = issue.get("line_end", line_start)
+            issue_lines.append(
+                f"{number}. [{issue.get('type', 'Unknown')}] Lines {line_start}-{line_end}: "
+                f"{issue.get('message', 'Unknown issue')}"
+            )
+        issue_list = "\n".join(issue_lines)
+        
+        prompt = f"""
+You are an expert code fixer. Fix ALL of the listed issues in the following {language} code.
+
+CODE (with line numbers):
+```{language}
+{number_lines(code)}
+```
+
+ISSUES:
+{issue_list}
+
+For each issue, return the edits that fix it: only the lines that change, each with the exact
+original lines it replaces. Edits for different issues must not touch the same lines. Also give
+a description, an explanation of why the fix works, and a confidence score (0.0 to 1.0).
+
+Format your response as a JSON object with the following structure:
+{{
+  "fixes": [
+    {{
+      "issue": issue_number,
+      "description": "brief description of the fix",{EDITS_FORMAT},
+      "explanation": "explanation of why this fix works",
+      "confidence": confidence_score
+    }}
+  ]
+}}
+
 Only respond with the JSON object, no other text.
 """
         return prompt
@@ -188,8 +442,10 @@ Only respond with the JSON object, no other text.
             # Parse the JSON
             parsed = json.loads(response)
             if isinstance(parsed, dict):
+                edits = parsed.get("edits", [])
                 return {
                     "description": parsed.get("description", ""),
+                    "edits": edits if isinstance(edits, list) else [],
                     "fixed_code": parsed.get("fixed_code", ""),
                     "explanation": parsed.get("explanation", ""),
                     "confidence": parsed.get("confidence", 0.5)
@@ -199,6 +455,30 @@ Only respond with the JSON object, no other text.
         
         return None
     
+    def parse_batch_response(self, response: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a batched LLM response into its per-issue fixes
+        
+        Only the fixes are returned; callers rebuild the file from their edits.
+        
+        Args:
+            response: Raw LLM response text
+        
+        Returns:
+            {"fixes": [...]} with the well-formed fix objects, or None if the response is not valid JSON
+        """
+        try:
+            parsed = json.loads(extract_json_text(response.strip()))
+            if isinstance(parsed, dict):
+                fixes = parsed.get("fixes", [])
+                return {
+                    "fixes": [fix for fix in fixes if isinstance(fix, dict)] if isinstance(fixes, list) else []
+                }
+        except Exception as e:
+            self.log(f"Error parsing batched LLM response: {str(e)}", level="ERROR")
+        
+        return None
+    
     def apply_fix(self, original_code: str, fix_data: Dict[str, Any]) -> str:
         """Apply the fix to the original code."""
         fixed_code = fix_data.get("fixed_code", "")
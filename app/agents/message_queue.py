@@ -0,0 +1,95 @@
+"""
+Priority message queue and admission control for the agent system.
+"""
+import asyncio
+import itertools
+from typing import TYPE_CHECKING, Dict
+
+from app.core.request_context import PRIORITIES, normalize_priority
+
+if TYPE_CHECKING:
+    from app.agents.base_agent import Message
+
+# Message classes, drained in this order
+CLASS_CONTROL = 0  # errors and other control traffic
+CLASS_RESULT = 1  # results flowing back towards the coordinator or user
+CLASS_WORK = 2  # work for agents belonging to sessions already admitted
+CLASS_NEW_REQUEST = 3  # new sessions
+
+RESULT_MESSAGE_TYPES = {"analysis_result", "fix_result", "session_started", "debugging_complete", "debugging_error"}
+WORK_MESSAGE_TYPES = {"analyze_request", "fix_request", "task"}
+NEW_REQUEST_MESSAGE_TYPES = {"user_request"}
+
+
+class AgentOverloadedError(Exception):
+    """
+    Raised when the agent system refuses new work because its backlog is full
+    """
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def message_class(message: "Message") -> int:
+    """Get the scheduling class of a message."""
+    if message.message_type in NEW_REQUEST_MESSAGE_TYPES:
+        return CLASS_NEW_REQUEST
+    if message.message_type in WORK_MESSAGE_TYPES:
+        return CLASS_WORK
+    if message.message_type in RESULT_MESSAGE_TYPES:
+        return CLASS_RESULT
+    return CLASS_CONTROL
+
+
+class PriorityMessageQueue:
+    """
+    Queue of agent messages ordered by message class, then request priority, then arrival.
+    
+    Control messages and results are served ahead of work, and work ahead of new
+    requests, so sessions already in flight finish before new ones start; within
+    a class interactive requests go ahead of background and batch ones. The queue
+    itself never blocks a put: new work is bounded by admission control in
+    AgentSystem.submit_user_request, so results can never deadlock behind it.
+    """
+    def __init__(self):
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._class_counts: Dict[int, int] = {
+            CLASS_CONTROL: 0, CLASS_RESULT: 0, CLASS_WORK: 0, CLASS_NEW_REQUEST: 0
+        }
+    
+    async def put(self, message: "Message"):
+        """Add a message to the queue."""
+        message_rank = message_class(message)
+        priority_rank = PRIORITIES.index(normalize_priority(message.content.get("priority")))
+        
+        self._class_counts[message_rank] += 1
+        self._queue.put_nowait((message_rank, priority_rank, next(self._sequence), message))
+    
+    async def get(self) -> "Message":
+        """Remove and return the most urgent message, waiting until one is available."""
+        message_rank, _, _, message = await self._queue.get()
+        self._class_counts[message_rank] -= 1
+        return message
+    
+    def task_done(self):
+        self._queue.task_done()
+    
+    async def join(self):
+        """Wait until every message taken from the queue has been marked done."""
+        await self._queue.join()
+    
+    def qsize(self) -> int:
+        return self._queue.qsize()
+    
+    def empty(self) -> bool:
+        return self._queue.empty()
+    
+    def count(self, message_rank: int) -> int:
+        """Number of queued messages of a given class."""
+        return self._class_counts[message_rank]
+    
+    @property
+    def backlog(self) -> int:
+        """Number of queued messages that represent pending work (new requests and agent work)."""
+        return self._class_counts[CLASS_WORK] + self._class_counts[CLASS_NEW_REQUEST]
@@ -0,0 +1,404 @@
+"""
+Session storage for the coordinator agent.
+"""
+import asyncio
+import json
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+FINISHED_STATES = ("completed", "error")
+
+# Fields only needed while a session is in flight
+TRANSIENT_FIELDS = ("code", "code_ref")
+
+
+# Store ARGV[2] with TTL ARGV[3] only if the stored record's state is ARGV[1]
+COMPARE_AND_SET_STATE = """
+local current = redis.call('GET', KEYS[1])
+if not current or cjson.decode(current)['state'] ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def is_finished(session: Dict[str, Any]) -> bool:
+    """Check whether a session has reached completed or error state."""
+    return session.get("state") in FINISHED_STATES
+
+
+def compact_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop the fields a finished session no longer needs
+    
+    The submitted code is kept by the caller and released from the content
+    store when the session finishes, so finished records only hold results.
+    """
+    for field in TRANSIENT_FIELDS:
+        session.pop(field, None)
+    return session
+
+
+class SessionStore(MutableMapping):
+    """
+    Mapping of session ID to session record used by the coordinator.
+    
+    Implementations decide where sessions live and when they are dropped;
+    the coordinator writes a record back after changing it and announces
+    finished sessions through the store, which is where waiters wait. A shared
+    store is visible to every process.
+    
+    The coordinator uses load() and save() rather than the mapping methods:
+    they do not block the event loop, and save() can make a state transition
+    conditional on the state the record was read in, so coordinators in
+    different processes cannot overwrite each other's transitions.
+    """
+    shared = False
+    
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of a session record
+        
+        Returns:
+            The record, or None if the session does not exist
+        """
+    
+    @abstractmethod
+    async def save(self, session_id: str, session: Dict[str, Any], expected_state: Optional[str] = None) -> bool:
+        """
+        Store a session record
+        
+        Args:
+            session_id: The session to store
+            session: The new record
+            expected_state: Only store the record if the stored one is still in this state
+        
+        Returns:
+            Whether the record was stored
+        """
+    
+    @abstractmethod
+    def touch(self, session_id: str):
+        """Record that a session was updated (resets its expiry)."""
+    
+    @abstractmethod
+    def reap(self) -> int:
+        """Remove expired sessions and return how many were removed."""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Get size and eviction counts."""
+    
+    @abstractmethod
+    async def notify_finished(self, session_id: str):
+        """Wake everyone waiting on a session that reached completed or error state."""
+    
+    @abstractmethod
+    async def wait_finished(self, session_id: str, timeout: float) -> Dict[str, Any]:
+        """
+        Wait until a session reaches completed or error state
+        
+        Args:
+            session_id: The session to wait for (it may not have been created yet)
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            The session record
+        
+        Raises:
+            asyncio.TimeoutError: If the session does not finish in time
+        """
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store with TTL and max-entry eviction.
+    
+    Finished sessions expire SESSION_TTL_SECONDS after completion and in-flight
+    ones SESSION_ACTIVE_TTL_SECONDS after their last update. When the store is
+    over SESSION_MAX_ENTRIES the least recently used finished sessions are
+    evicted; in-flight sessions are never evicted for capacity, their number is
+    bounded by admission control in the agent system.
+    """
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        active_ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = settings.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.active_ttl_seconds = settings.SESSION_ACTIVE_TTL_SECONDS if active_ttl_seconds is None else active_ttl_seconds
+        self.max_entries = settings.SESSION_MAX_ENTRIES if max_entries is None else max_entries
+        self._clock = clock
+        # Ordered from least to most recently used
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._expires_at: Dict[str, float] = {}
+        # Completion events for sessions that someone is waiting on
+        self._finished_events: Dict[str, asyncio.Event] = {}
+        self.expired_count = 0
+        self.evicted_count = 0
+    
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        session = self._sessions[session_id]
+        if self._expires_at[session_id] <= self._clock():
+            self._remove(session_id)
+            self.expired_count += 1
+            raise KeyError(session_id)
+        
+        self._sessions.move_to_end(session_id)
+        return session
+    
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        self._sessions[session_id] = session
+        self.touch(session_id)
+    
+    def __delitem__(self, session_id: str):
+        self._remove(session_id)
+    
+    def __contains__(self, session_id: object) -> bool:
+        # Membership checks do not count as use
+        expires_at = self._expires_at.get(session_id)
+        return expires_at is not None and expires_at > self._clock()
+    
+    def __iter__(self) -> Iterator[str]:
+        # Iterate over a snapshot so callers may delete while iterating
+        now = self._clock()
+        return iter([session_id for session_id in self._sessions if self._expires_at[session_id] > now])
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self.get(session_id)
+        return dict(session) if session is not None else None
+    
+    async def save(self, session_id: str, session: Dict[str, Any], expected_state: Optional[str] = None) -> bool:
+        if expected_state is not None:
+            current = self.get(session_id)
+            if current is None or current.get("state") != expected_state:
+                return False
+        
+        self[session_id] = session
+        return True
+    
+    def touch(self, session_id: str):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        
+        ttl = self.ttl_seconds if is_finished(session) else self.active_ttl_seconds
+        self._expires_at[session_id] = self._clock() + ttl
+        self._sessions.move_to_end(session_id)
+        self._evict_over_capacity(keep=session_id)
+    
+    def reap(self) -> int:
+        now = self._clock()
+        expired = [session_id for session_id, expires_at in self._expires_at.items() if expires_at <= now]
+        
+        for session_id in expired:
+            self._remove(session_id)
+        
+        self.expired_count += len(expired)
+        return len(expired)
+    
+    def stats(self) -> Dict[str, Any]:
+        finished = sum(1 for session in self._sessions.values() if is_finished(session))
+        return {
+            "size": len(self._sessions),
+            "in_flight": len(self._sessions) - finished,
+            "finished": finished,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired_count,
+            "evicted": self.evicted_count
+        }
+    
+    async def notify_finished(self, session_id: str):
+        event = self._finished_events.pop(session_id, None)
+        if event:
+            event.set()
+    
+    async def wait_finished(self, session_id: str, timeout: float) -> Dict[str, Any]:
+        session = self.get(session_id)
+        if session and is_finished(session):
+            return session
+        
+        event = self._finished_events.setdefault(session_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Drop the event if the session never started, so it cannot leak
+            if session_id not in self._sessions:
+                self._finished_events.pop(session_id, None)
+            raise
+        
+        return self[session_id]
+    
+    def _remove(self, session_id: str):
+        del self._sessions[session_id]
+        self._expires_at.pop(session_id, None)
+    
+    def _evict_over_capacity(self, keep: str):
+        """Evict least recently used finished sessions (other than keep) until the store fits max_entries."""
+        excess = len(self._sessions) - self.max_entries
+        if excess <= 0:
+            return
+        
+        victims = []
+        for session_id, session in self._sessions.items():
+            if len(victims) == excess:
+                break
+            if session_id != keep and is_finished(session):
+                victims.append(session_id)
+        
+        for session_id in victims:
+            self._remove(session_id)
+        
+        self.evicted_count += len(victims)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store shared by API and worker processes through Redis.
+    
+    Records are JSON values whose Redis TTL follows the same rules as the
+    in-memory store; Redis expiry replaces the reaper and max-entry eviction.
+    Completion is announced on a per-session pub/sub channel.
+    
+    load(), save() and the completion channel use the asyncio client.
+    Conditional saves compare the stored state and write in one Lua script,
+    so the check and the write are atomic across processes. The synchronous
+    mapping methods are only meant for stats and debugging endpoints.
+    """
+    shared = True
+    
+    def __init__(
+        self,
+        redis_client=None,
+        async_redis_client=None,
+        ttl_seconds: Optional[float] = None,
+        active_ttl_seconds: Optional[float] = None,
+        prefix: str = "agentlogger:session"
+    ):
+        from app.agents.transport import redis_connection_kwargs
+        
+        if redis_client is None:
+            from redis import Redis
+            redis_client = Redis(**redis_connection_kwargs())
+        if async_redis_client is None:
+            from redis.asyncio import Redis as AsyncRedis
+            async_redis_client = AsyncRedis(**redis_connection_kwargs())
+        
+        self.redis = redis_client
+        self.async_redis = async_redis_client
+        self.ttl_seconds = settings.SESSION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.active_ttl_seconds = settings.SESSION_ACTIVE_TTL_SECONDS if active_ttl_seconds is None else active_ttl_seconds
+        self.prefix = prefix
+        # Registering only computes the script's digest; it is loaded on first use
+        self._compare_and_set = self.async_redis.register_script(COMPARE_AND_SET_STATE)
+    
+    def _key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}"
+    
+    def _channel(self, session_id: str) -> str:
+        return f"{self.prefix}-finished:{session_id}"
+    
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        payload = self.redis.get(self._key(session_id))
+        if payload is None:
+            raise KeyError(session_id)
+        return json.loads(payload)
+    
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        self.redis.set(self._key(session_id), json.dumps(session, default=str), ex=self._ttl(session))
+    
+    def __delitem__(self, session_id: str):
+        if not self.redis.delete(self._key(session_id)):
+            raise KeyError(session_id)
+    
+    def __contains__(self, session_id: object) -> bool:
+        return bool(self.redis.exists(self._key(session_id)))
+    
+    def __iter__(self) -> Iterator[str]:
+        start = len(self.prefix) + 1
+        return iter([key[start:] for key in self.redis.scan_iter(match=f"{self.prefix}:*")])
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self.redis.scan_iter(match=f"{self.prefix}:*"))
+    
+    def _ttl(self, session: Dict[str, Any]) -> int:
+        ttl = self.ttl_seconds if is_finished(session) else self.active_ttl_seconds
+        return max(1, int(ttl))
+    
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        payload = await self.async_redis.get(self._key(session_id))
+        return json.loads(payload) if payload is not None else None
+    
+    async def save(self, session_id: str, session: Dict[str, Any], expected_state: Optional[str] = None) -> bool:
+        payload = json.dumps(session, default=str)
+        if expected_state is None:
+            await self.async_redis.set(self._key(session_id), payload, ex=self._ttl(session))
+            return True
+        
+        stored = await self._compare_and_set(
+            keys=[self._key(session_id)],
+            args=[expected_state, payload, self._ttl(session)]
+        )
+        return bool(stored)
+    
+    def touch(self, session_id: str):
+        session = self.get(session_id)
+        if session is not None:
+            self[session_id] = session
+    
+    def reap(self) -> int:
+        # Redis expires records on its own
+        return 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "size": len(self),
+            "ttl_seconds": self.ttl_seconds,
+            "active_ttl_seconds": self.active_ttl_seconds
+        }
+    
+    async def notify_finished(self, session_id: str):
+        await self.async_redis.publish(self._channel(session_id), "finished")
+    
+    async def wait_finished(self, session_id: str, timeout: float) -> Dict[str, Any]:
+        pubsub = self.async_redis.pubsub()
+        try:
+            # Subscribe before checking the record so a completion in between is not missed
+            await pubsub.subscribe(self._channel(session_id))
+            
+            session = await self.load(session_id)
+            if session is None or not is_finished(session):
+                await asyncio.wait_for(self._next_message(pubsub), timeout=timeout)
+                session = await self.load(session_id)
+                if session is None:
+                    raise KeyError(session_id)
+            
+            return session
+        finally:
+            await pubsub.aclose()
+    
+    async def _next_message(self, pubsub):
+        async for message in pubsub.listen():
+            if message.get("type") == "message":
+                return message
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store selected by settings (shared through Redis when USE_REDIS is enabled)."""
+    if settings.USE_REDIS:
+        return RedisSessionStore()
+    return InMemorySessionStore()
@@ -0,0 +1,218 @@
+"""
+Message transports connecting API processes and agent worker processes.
+"""
+import json
+import logging
+import os
+import socket
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.agents.base_agent import Message
+from app.agents.message_queue import PriorityMessageQueue
+from app.core.config import settings
+
+logger = logging.getLogger("agent_transport")
+
+# Entries a dead consumer left unacknowledged for this long are taken over on startup
+CLAIM_IDLE_MS = 60000
+
+
+def encode_message(message: Message) -> str:
+    """Serialize a message for the broker."""
+    return json.dumps(message.to_dict(), default=str)
+
+
+def decode_message(payload: str) -> Message:
+    """Deserialize a message read from the broker."""
+    return Message.from_dict(json.loads(payload))
+
+
+def redis_connection_kwargs() -> Dict[str, object]:
+    """Connection settings shared by every Redis client the agent system opens."""
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "password": settings.REDIS_PASSWORD or None,
+        "decode_responses": True
+    }
+
+
+class MessageTransport(ABC):
+    """
+    Carries agent messages between processes.
+    
+    AgentSystem.send_message publishes to the transport; processes that run
+    agents consume from it and feed their local dispatch queue.
+    """
+    @abstractmethod
+    async def publish(self, message: Message):
+        """Send a message to whichever process runs its recipient."""
+    
+    @abstractmethod
+    async def consume(self, deliver: Callable[[Message], Awaitable[None]], wait_idle: Callable[[], Awaitable[None]]):
+        """
+        Deliver incoming messages until cancelled
+        
+        Args:
+            deliver: Puts a message on the local dispatch queue
+            wait_idle: Resolves once the local dispatch queue has drained, so a
+                process only takes work from the broker as fast as it dispatches it
+        """
+    
+    async def ack(self, message: Message):
+        """Acknowledge that a consumed message has been dispatched."""
+    
+    def backlog(self) -> int:
+        """Number of messages waiting in the transport (best effort)."""
+        return 0
+    
+    async def close(self):
+        """Release connections held by the transport."""
+
+
+class InMemoryTransport(MessageTransport):
+    """
+    In-process stand-in for the broker.
+    
+    Several AgentSystem instances sharing one transport behave like API and
+    worker processes sharing a Redis stream, which is how tests exercise the
+    distributed roles without a Redis server.
+    """
+    def __init__(self):
+        self.queue = PriorityMessageQueue()
+    
+    async def publish(self, message: Message):
+        await self.queue.put(message)
+    
+    async def consume(self, deliver: Callable[[Message], Awaitable[None]], wait_idle: Callable[[], Awaitable[None]]):
+        while True:
+            message = await self.queue.get()
+            try:
+                await deliver(message)
+            finally:
+                self.queue.task_done()
+            await wait_idle()
+    
+    def backlog(self) -> int:
+        return self.queue.backlog
+
+
+class RedisStreamsTransport(MessageTransport):
+    """
+    Transport backed by a Redis stream read through a consumer group.
+    
+    Every agent process joins the same group, so each message is delivered to
+    exactly one of them. Entries are acknowledged after dispatch; entries left
+    pending by a process that died are claimed by the next one to start.
+    """
+    def __init__(self, redis_client=None, stream: Optional[str] = None, group: Optional[str] = None):
+        if redis_client is None:
+            from redis.asyncio import Redis
+            redis_client = Redis(**redis_connection_kwargs())
+        
+        self.redis = redis_client
+        self.stream = stream or settings.AGENT_STREAM_NAME
+        self.group = group or settings.AGENT_STREAM_GROUP
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        # Stream entry IDs of messages consumed but not yet acknowledged, by message ID
+        self._pending: Dict[str, str] = {}
+        self._backlog = 0
+    
+    async def publish(self, message: Message):
+        await self.redis.xadd(
+            self.stream,
+            {"message": encode_message(message)},
+            maxlen=settings.AGENT_STREAM_MAXLEN,
+            approximate=True
+        )
+        await self._refresh_backlog()
+    
+    async def consume(self, deliver: Callable[[Message], Awaitable[None]], wait_idle: Callable[[], Awaitable[None]]):
+        await self._ensure_group()
+        await self._claim_stale(deliver)
+        
+        while True:
+            response = await self.redis.xreadgroup(
+                self.group,
+                self.consumer,
+                {self.stream: ">"},
+                count=settings.AGENT_STREAM_BATCH,
+                block=1000
+            )
+            
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    await self._deliver_entry(entry_id, fields, deliver)
+            
+            await wait_idle()
+    
+    async def ack(self, message: Message):
+        entry_id = self._pending.pop(message.message_id, None)
+        if entry_id:
+            await self.redis.xack(self.stream, self.group, entry_id)
+    
+    def backlog(self) -> int:
+        return self._backlog
+    
+    async def close(self):
+        await self.redis.aclose()
+    
+    async def _deliver_entry(self, entry_id: str, fields: Dict[str, str], deliver: Callable[[Message], Awaitable[None]]):
+        try:
+            message = decode_message(fields["message"])
+        except Exception as e:
+            # A malformed entry can never be processed; drop it instead of redelivering forever
+            logger.error(f"Dropping unreadable stream entry {entry_id}: {str(e)}")
+            await self.redis.xack(self.stream, self.group, entry_id)
+            return
+        
+        self._pending[message.message_id] = entry_id
+        await deliver(message)
+    
+    async def _ensure_group(self):
+        from redis.exceptions import ResponseError
+        
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    async def _claim_stale(self, deliver: Callable[[Message], Awaitable[None]]):
+        """Take over entries that a crashed consumer read but never acknowledged."""
+        try:
+            _, entries, *_ = await self.redis.xautoclaim(
+                self.stream, self.group, self.consumer, min_idle_time=CLAIM_IDLE_MS, start_id="0-0"
+            )
+        except Exception as e:
+            logger.warning(f"Could not claim stale stream entries: {str(e)}")
+            return
+        
+        if entries:
+            logger.info(f"Claimed {len(entries)} stale stream entries")
+        
+        for entry_id, fields in entries:
+            # Entries trimmed from the stream since they were read come back without fields
+            if fields:
+                await self._deliver_entry(entry_id, fields, deliver)
+            else:
+                await self.redis.xack(self.stream, self.group, entry_id)
+    
+    async def _refresh_backlog(self):
+        """Update the cached count of entries not yet acknowledged by any consumer."""
+        try:
+            for group in await self.redis.xinfo_groups(self.stream):
+                if group.get("name") == self.group:
+                    self._backlog = (group.get("lag") or 0) + (group.get("pending") or 0)
+                    return
+        except Exception:
+            # Backlog is advisory; admission control falls back to local queues
+            pass
+
+
+def create_transport() -> MessageTransport:
+    """Create the transport selected by settings (Redis Streams when USE_REDIS is enabled)."""
+    if settings.USE_REDIS:
+        return RedisStreamsTransport()
+    return InMemoryTransport()
@@ -6,21 +6,16 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 import asyncio
+import time
 
 from app.core.db import get_db
 from app.core.dependencies import get_agent_system_dependency
 from app.agents.agent_system import AgentSystem
 from app.services.ai.groq_client import GroqClient
-from app.core.config import settings
 from pydantic import BaseModel
 
 router = APIRouter()
 
-# Initialize the agent system
-groq_client = GroqClient(api_key=settings.GROQ_API_KEY)
-agent_system = AgentSystem(llm_client=groq_client)
-agent_system.initialize_agents()
-
 # Store for active debugging sessions
 active_sessions = {}
 
@@ -84,7 +79,8 @@ async def start_agent_debug(
     code: str,
     language: str,
     error_message: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    agent_system: AgentSystem = Depends(get_agent_system_dependency)
 ):
     """
     Start an agent-based debugging session.
@@ -125,7 +121,10 @@ async def get_debug_status(session_id: str):
     return active_sessions[session_id]
 
 @router.post("/agent-debug/{session_id}/start")
-async def start_agent_system(background_tasks: BackgroundTasks):
+async def start_agent_system(
+    background_tasks: BackgroundTasks,
+    agent_system: AgentSystem = Depends(get_agent_system_dependency)
+):
     """
     Start the agent system in the background.
     """
@@ -133,7 +132,7 @@ async def start_agent_system(background_tasks: BackgroundTasks):
     return {"status": "started", "message": "Agent system started in the background"}
 
 @router.post("/agent-debug/{session_id}/stop")
-async def stop_agent_system():
+async def stop_agent_system(agent_system: AgentSystem = Depends(get_agent_system_dependency)):
     """
     Stop the agent system.
     """
@@ -162,13 +161,12 @@ async def test_full_workflow(
         
         # Wait for completion (shorter timeout for testing)
         max_wait_time = 30  # 30 seconds timeout
-        poll_interval = 2   # Check every 2 seconds
-        waited_time = 0
+        started = time.monotonic()
         
-        while waited_time < max_wait_time:
-            # Check if the session has completed
-            session_data = getattr(coordinator, 'active_sessions', {}).get(session_id)
-            if session_data and session_data.get("state") == "completed":
+        try:
+            session_data = await agent_system.wait_for_session(session_id, timeout=max_wait_time)
+            
+            if session_data.get("state") == "completed":
                 # Extract results from the session
                 issues = session_data.get("issues", [])
                 fixes = session_data.get("fixes", [])
@@ -182,18 +180,15 @@ async def test_full_workflow(
                     "fixes": fixes[:1] if fixes else []  # Show first fix
                 }
             
-            elif session_data and session_data.get("state") == "error":
-                # Analysis failed
-                error_msg = session_data.get("error", "Unknown error occurred")
-                return {
-                    "status": "error",
-                    "session_id": session_id,
-                    "error": error_msg
-                }
-            
-            # Wait before checking again
-            await asyncio.sleep(poll_interval)
-            waited_time += poll_interval
+            # Analysis failed
+            error_msg = session_data.get("error", "Unknown error occurred")
+            return {
+                "status": "error",
+                "session_id": session_id,
+                "error": error_msg
+            }
+        except asyncio.TimeoutError:
+            waited_time = round(time.monotonic() - started, 1)
         
         # Timeout occurred - but let's see the current state
         session_data = getattr(coordinator, 'active_sessions', {}).get(session_id, {})
@@ -292,6 +287,9 @@ async def debug_agent_system(
             "agents_count": len(agent_system.agents),
             "agents": list(agent_system.agents.keys()),
             "message_queue_size": agent_system.message_queue.qsize(),
+            "pools": agent_system.get_pool_stats(),
+            "queues": agent_system.get_queue_stats(),
+            "sessions": agent_system.get_session_stats(),
             "coordinator_id": "coordinator_1" in agent_system.agents,
             "coordinator_attrs": dir(agent_system.agents.get("coordinator_1", {})) if "coordinator_1" in agent_system.agents else []
         }
@@ -501,14 +499,13 @@ async def check_session_status(
             session_data = coordinator.active_sessions.get(session_id, {})
             
             max_wait = 30  # 30 seconds timeout
-            waited = 0
+            started = time.monotonic()
             
-            while waited < max_wait:
-                session_data = getattr(coordinator, 'active_sessions', {}).get(session_id, {})
-                if session_data.get("state") in ["completed", "error"]:
-                    break
-                await asyncio.sleep(1)
-                waited += 1
+            try:
+                session_data = await coordinator.wait_for_session(session_id, timeout=max_wait)
+            except asyncio.TimeoutError:
+                session_data = coordinator.active_sessions.get(session_id, {})
+            waited = round(time.monotonic() - started, 1)
             
             return {
                 "status": "ok",
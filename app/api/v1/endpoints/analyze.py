@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
 
 from app.core.db import get_db
+from app.core.request_context import PRIORITY_BACKGROUND, request_context
 from app.models.schemas.analysis import (
     AnalysisRequestCreate, AnalysisRequestResponse, AnalysisResult, CodeIssue
 )
@@ -13,6 +14,7 @@ from app.services.analysis_service import (
     get_analysis_requests_by_user, analyze_code_with_agents, analyze_code_direct
 )
 from app.agents.agent_system import AgentSystem
+from app.agents.message_queue import AgentOverloadedError
 
 router = APIRouter()
 
@@ -23,10 +25,12 @@ from app.core.dependencies import get_agent_system_dependency
 async def analyze_code_background(db: Session, analysis_id: str, agent_system: AgentSystem = None):
     """Background task to analyze code"""
     try:
-        if agent_system and agent_system.running:
-            await analyze_code_with_agents(db, analysis_id, agent_system)
-        else:
-            await analyze_code_direct(db, analysis_id)
+        # Queued analyses yield LLM capacity to interactive callers and outlive the request's deadline
+        with request_context(priority=PRIORITY_BACKGROUND, detached=True):
+            if agent_system and agent_system.running:
+                await analyze_code_with_agents(db, analysis_id, agent_system)
+            else:
+                await analyze_code_direct(db, analysis_id)
     except Exception as e:
         print(f"Background analysis failed: {e}")
 
@@ -52,6 +56,10 @@ async def create_analysis(
             detail="Authentication required. Please provide a valid API key."
         )
     
+    # Refuse up front rather than accepting work the agents cannot take on
+    if agent_system and agent_system.running:
+        agent_system.check_admission(PRIORITY_BACKGROUND)
+    
     # Create the analysis request
     analysis = await create_analysis_request(db, analysis_data, user_id)
     
@@ -188,6 +196,8 @@ async def run_analysis(
             error=updated_analysis.error,
         )
     
+    except AgentOverloadedError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=HTTP_400_BAD_REQUEST,
@@ -227,57 +237,51 @@ async def quick_analysis(
             # Wait for analysis to complete (with timeout)
             import asyncio
             
-            coordinator = agent_system.agents.get("coordinator_1")
-            if coordinator:
-                max_wait = 30  # 30 seconds timeout
-                waited = 0
-                while waited < max_wait:
-                    session_data = coordinator.get_session_status(session_id)
-                    if session_data and session_data.get("state") in ["completed", "error"]:
-                        issues = []
-                        for issue_data in session_data.get("issues", []):
-                            issues.append(CodeIssue(
-                                id=issue_data.get("id", "unknown"),
-                                type=issue_data.get("type", "unknown"),
-                                message=issue_data.get("message", ""),
-                                line_start=issue_data.get("line_start", 1),
-                                line_end=issue_data.get("line_end"),
-                                column_start=issue_data.get("column_start"),
-                                column_end=issue_data.get("column_end"),
-                                code_snippet=issue_data.get("code_snippet", ""),
-                                severity=issue_data.get("severity", "medium")
-                            ))
-                        
-                        from app.models.db.analysis import AnalysisStatus
-                        status_enum = AnalysisStatus.COMPLETED if session_data.get("state") == "completed" else AnalysisStatus.FAILED
-                        
-                        return AnalysisResult(
-                            request_id=session_id,
-                            status=status_enum,
-                            issues=issues,
-                            error=session_data.get("error"),
-                        )
-                    
-                    await asyncio.sleep(1)
-                    waited += 1
-                
-                # Timeout occurred
+            if "coordinator_1" not in agent_system.agents:
                 raise HTTPException(
                     status_code=HTTP_400_BAD_REQUEST,
-                    detail="Analysis timed out"
+                    detail="Agent system coordinator not available"
                 )
-            else:
+            
+            try:
+                session_data = await agent_system.wait_for_session(session_id, timeout=30)  # 30 seconds timeout
+            except asyncio.TimeoutError:
+                # Timeout occurred
                 raise HTTPException(
                     status_code=HTTP_400_BAD_REQUEST,
-                    detail="Agent system coordinator not available"
+                    detail="Analysis timed out"
                 )
+            
+            issues = []
+            for issue_data in session_data.get("issues", []):
+                issues.append(CodeIssue(
+                    id=issue_data.get("id", "unknown"),
+                    type=issue_data.get("type", "unknown"),
+                    message=issue_data.get("message", ""),
+                    line_start=issue_data.get("line_start", 1),
+                    line_end=issue_data.get("line_end"),
+                    column_start=issue_data.get("column_start"),
+                    column_end=issue_data.get("column_end"),
+                    code_snippet=issue_data.get("code_snippet", ""),
+                    severity=issue_data.get("severity", "medium")
+                ))
+            
+            from app.models.db.analysis import AnalysisStatus
+            status_enum = AnalysisStatus.COMPLETED if session_data.get("state") == "completed" else AnalysisStatus.FAILED
+            
+            return AnalysisResult(
+                request_id=session_id,
+                status=status_enum,
+                issues=issues,
+                error=session_data.get("error"),
+            )
         else:
             raise HTTPException(
                 status_code=HTTP_400_BAD_REQUEST,
                 detail="Agent system not available"
             )
     
-    except HTTPException:
+    except (HTTPException, AgentOverloadedError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from starlette.status import HTTP_400_BAD_REQUEST
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_503_SERVICE_UNAVAILABLE
 
 from app.core.db import get_db
 from app.services.ai.groq_client import GroqClient
+from app.services.ai.resilience import CircuitOpenError
+from app.utils.streaming import sse_response
 from app.models.schemas.explain import ErrorExplanationRequest, ErrorExplanationResponse, ExplanationLevels, LearningResource
 
 router = APIRouter()
@@ -56,8 +58,36 @@ async def explain_error(
             status_code=HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after or 1)))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while generating the explanation: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.post("/stream")
+async def stream_explain_error(
+    request: Request,
+    explanation_data: ErrorExplanationRequest,
+):
+    """
+    Stream an error explanation as Server-Sent Events
+    
+    Emits "delta" events with text as the model generates it, then a "result"
+    event with the parsed explanation levels, then "done". Failures after the
+    stream has started are reported as an "error" event.
+    """
+    groq_client = GroqClient()
+    
+    return sse_response(groq_client.stream_error_explanation(
+        error_message=explanation_data.error_trace,
+        code=explanation_data.code_context,
+        language=explanation_data.language,
+        user_level=explanation_data.user_level
+    ))
@@ -6,12 +6,15 @@ from sqlalchemy.orm import Session
 from starlette.status import HTTP_404_NOT_FOUND, HTTP_400_BAD_REQUEST
 
 from app.core.db import get_db
+from app.core.request_context import PRIORITY_BACKGROUND, request_context
 from app.models.schemas.fix import FixRequestCreate, FixRequestResponse, FixResult
 from app.services.fix_service import (
     get_fix_request, 
     get_fix_requests_by_user, get_fix_requests_by_analysis,
     generate_fix, process_fix_with_agents, process_fix_direct
 )
+from app.services.ai.groq_client import stream_fix_from_groq
+from app.utils.streaming import sse_response
 from app.agents.agent_system import AgentSystem
 from app.core.dependencies import get_agent_system_dependency
 
@@ -34,13 +37,15 @@ async def process_fix_background(db: Session, fix_id: str, agent_system: AgentSy
         db.commit()
         
         try:
-            # Try to use the agent system for comprehensive fix generation
-            if agent_system:
-                fix_result = await process_fix_with_agents(db, db_fix_request, agent_system)
-            else:
-                # Fallback to direct Groq if agent system is not available
-                print("Agent system not provided for fix generation, falling back to direct fix")
-                fix_result = await process_fix_direct(db_fix_request)
+            # Queued fix jobs yield LLM capacity to interactive callers and outlive the request's deadline
+            with request_context(priority=PRIORITY_BACKGROUND, detached=True):
+                # Try to use the agent system for comprehensive fix generation
+                if agent_system:
+                    fix_result = await process_fix_with_agents(db, db_fix_request, agent_system)
+                else:
+                    # Fallback to direct Groq if agent system is not available
+                    print("Agent system not provided for fix generation, falling back to direct fix")
+                    fix_result = await process_fix_direct(db_fix_request)
             
             # Simple validation (just check if we got a fix)
             is_valid = bool(fix_result.get("fixed_code"))
@@ -86,6 +91,10 @@ async def create_fix(
             detail="User ID not found in request. API key authentication failed."
         )
     
+    # Refuse up front rather than accepting work the agents cannot take on
+    if agent_system and agent_system.running:
+        agent_system.check_admission(PRIORITY_BACKGROUND)
+    
     # Create the fix request directly in the database
     from app.models.db.fix import FixRequest, FixStatus
     
@@ -109,6 +118,26 @@ async def create_fix(
     return FixRequestResponse.model_validate(db_fix_request)
 
 
+@router.post("/stream")
+async def stream_fix(
+    fix_request: FixRequestCreate,
+    request: Request,
+):
+    """
+    Stream a fix as Server-Sent Events
+    
+    Unlike POST /, the fix is not stored: "delta" events carry text as the model
+    generates it, then a "result" event carries fixed_code and explanation,
+    then "done".
+    """
+    return sse_response(stream_fix_from_groq(
+        code=fix_request.code,
+        language=fix_request.language,
+        error_message=fix_request.error_message,
+        context=fix_request.context
+    ))
+
+
 @router.get("/{fix_id}", response_model=FixRequestResponse)
 async def get_fix(
     fix_id: UUID,
@@ -4,6 +4,12 @@ from datetime import datetime
 
 from app.core.db import get_db
 from app.core.config import settings
+from app.services.ai.fragment_cache import fragment_cache
+from app.services.ai.governor import llm_governor
+from app.services.ai.resilience import get_resilience_stats
+from app.services.ai.response_cache import response_cache
+from app.services.ai.single_flight import llm_single_flight
+from app.utils.parsing.parse_cache import parse_cache
 
 router = APIRouter()
 
@@ -17,4 +23,23 @@ async def health_check(db: Session = Depends(get_db)):
         "timestamp": datetime.utcnow().isoformat(),
         "version": settings.VERSION,
         "environment": settings.ENVIRONMENT
-    } 
\ No newline at end of file
+    }
+
+@router.get("/metrics")
+async def runtime_metrics():
+    """
+    Runtime counters used to size caches, pools and limits
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "llm": {
+            "cache": response_cache.get_stats(),
+            "fragments": fragment_cache.get_stats(),
+            "single_flight": llm_single_flight.get_stats(),
+            "governor": llm_governor.get_stats(),
+            **get_resilience_stats()
+        },
+        "parsing": {
+            "cache": parse_cache.get_stats()
+        }
+    }
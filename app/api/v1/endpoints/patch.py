@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from starlette.status import HTTP_400_BAD_REQUEST
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_503_SERVICE_UNAVAILABLE
 
 from app.core.db import get_db
 from app.services.ai.groq_client import GroqClient
+from app.services.ai.resilience import CircuitOpenError
+from app.utils.streaming import sse_response
 from app.models.schemas.patch import PatchRequest, PatchResponse
 
 router = APIRouter()
@@ -48,8 +50,36 @@ async def generate_patch(
             status_code=HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after or 1)))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while generating the patch: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.post("/stream")
+async def stream_generate_patch(
+    request: Request,
+    patch_data: PatchRequest,
+):
+    """
+    Stream patch generation as Server-Sent Events
+    
+    Emits "delta" events with text as the model generates it, then a "result"
+    event with the parsed patch, then "done". Failures after the stream has
+    started are reported as an "error" event.
+    """
+    groq_client = GroqClient()
+    
+    return sse_response(groq_client.stream_patch(
+        original_code=patch_data.original_code,
+        language=patch_data.language,
+        issue_description=patch_data.issue_description,
+        context=patch_data.context
+    ))
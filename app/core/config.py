@@ -108,6 +108,76 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama3-70b-8192")
     
+    # LLM HTTP transport (shared keep-alive connection pool)
+    GROQ_HTTP2: bool = os.getenv("GROQ_HTTP2", "false").lower() == "true"  # requires the 'h2' package
+    GROQ_MAX_CONNECTIONS: int = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    GROQ_KEEPALIVE_EXPIRY: float = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))  # seconds
+    GROQ_CONNECT_TIMEOUT: float = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))  # seconds
+    GROQ_TIMEOUT: float = float(os.getenv("GROQ_TIMEOUT", "60"))  # seconds
+    
+    # LLM response cache (memory LRU + optional SQLite tier)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_DB_PATH: str = os.getenv("LLM_CACHE_DB_PATH", "")  # SQLite file for the disk tier (e.g. /var/lib/agentlogger/llm_cache.db); empty disables it
+    LLM_CACHE_MAX_DISK_MB: int = int(os.getenv("LLM_CACHE_MAX_DISK_MB", "100"))
+    LLM_CACHE_MAX_TEMPERATURE: float = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2"))  # only near-deterministic calls are cached
+    
+    # LLM governor (process-wide concurrency and provider rate limits; 0 disables a bucket)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "60000"))
+    
+    # LLM retries and circuit breaker
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))  # per call
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # seconds
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))  # seconds; longer Retry-After fails fast
+    LLM_RETRY_BUDGET_PER_SESSION: int = int(os.getenv("LLM_RETRY_BUDGET_PER_SESSION", "6"))
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    LLM_CIRCUIT_RESET_SECONDS: float = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Code analysis (larger files are split into concurrently analyzed chunks)
+    LLM_ANALYSIS_CHUNK_TOKENS: int = int(os.getenv("LLM_ANALYSIS_CHUNK_TOKENS", "3000"))  # estimated prompt tokens per chunk
+    PARSE_CACHE_MAX_ENTRIES: int = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "64"))  # parsed modules shared by analysis and validation; 0 disables
+    FRAGMENT_CACHE_MAX_ENTRIES: int = int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "2048"))  # per-function LLM results reused on resubmission; 0 disables
+    
+    # Request deadlines (X-Request-Timeout header, in seconds)
+    REQUEST_MAX_TIMEOUT: float = float(os.getenv("REQUEST_MAX_TIMEOUT", "300"))  # longer client timeouts are capped
+    
+    # Agent worker pools (concurrent sessions each agent type can serve)
+    AGENT_ANALYZER_WORKERS: int = int(os.getenv("AGENT_ANALYZER_WORKERS", "4"))
+    AGENT_FIX_GENERATOR_WORKERS: int = int(os.getenv("AGENT_FIX_GENERATOR_WORKERS", "4"))
+    AGENT_MAX_BACKLOG: int = int(os.getenv("AGENT_MAX_BACKLOG", "100"))  # queued requests before new ones are refused
+    AGENT_OVERLOAD_RETRY_AFTER: int = int(os.getenv("AGENT_OVERLOAD_RETRY_AFTER", "5"))  # seconds
+    
+    # Agent processes (with USE_REDIS, API and worker processes share a Redis stream and session store)
+    AGENT_SYSTEM_ROLE: str = os.getenv("AGENT_SYSTEM_ROLE", "all")  # all, api or worker
+    AGENT_STREAM_NAME: str = os.getenv("AGENT_STREAM_NAME", "agentlogger:agent-messages")
+    AGENT_STREAM_GROUP: str = os.getenv("AGENT_STREAM_GROUP", "agent-workers")
+    AGENT_STREAM_MAXLEN: int = int(os.getenv("AGENT_STREAM_MAXLEN", "10000"))  # approximate stream trim length
+    AGENT_STREAM_BATCH: int = int(os.getenv("AGENT_STREAM_BATCH", "8"))  # entries read per call
+    
+    # Coordinator session store (finished sessions expire; in-flight ones only if abandoned)
+    SESSION_TTL_SECONDS: float = float(os.getenv("SESSION_TTL_SECONDS", "900"))  # after completion
+    SESSION_ACTIVE_TTL_SECONDS: float = float(os.getenv("SESSION_ACTIVE_TTL_SECONDS", "3600"))  # since last update
+    SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+    SESSION_REAP_INTERVAL: float = float(os.getenv("SESSION_REAP_INTERVAL", "60"))  # seconds
+    
+    # Analyzer agent stage timeouts (stages run concurrently; a slow stage is dropped, not awaited forever)
+    ANALYZER_STATIC_TIMEOUT: float = float(os.getenv("ANALYZER_STATIC_TIMEOUT", "10"))  # seconds
+    ANALYZER_SANDBOX_GRACE: float = float(os.getenv("ANALYZER_SANDBOX_GRACE", "5"))  # seconds beyond EXECUTION_TIMEOUT
+    ANALYZER_LLM_TIMEOUT: float = float(os.getenv("ANALYZER_LLM_TIMEOUT", "120"))  # seconds
+    ANALYZER_LLM_POLICY: str = os.getenv("ANALYZER_LLM_POLICY", "always")  # always | fallback (only when static rules find nothing) | never
+    
+    # Fix generation (batched multi-issue prompts, per-issue fallback)
+    FIX_BATCH_ENABLED: bool = os.getenv("FIX_BATCH_ENABLED", "true").lower() == "true"
+    FIX_BATCH_MAX_ISSUES: int = int(os.getenv("FIX_BATCH_MAX_ISSUES", "8"))  # issues per batched call
+    FIX_BATCH_MAX_CODE_CHARS: int = int(os.getenv("FIX_BATCH_MAX_CODE_CHARS", "24000"))  # larger files are fixed per issue
+    FIX_BATCH_MAX_TOKENS: int = int(os.getenv("FIX_BATCH_MAX_TOKENS", "4000"))
+    FIX_MAX_CONCURRENCY: int = int(os.getenv("FIX_MAX_CONCURRENCY", "4"))  # concurrent fix calls per session
+    LOCAL_FIX_BUDGET_MS: float = float(os.getenv("LOCAL_FIX_BUDGET_MS", "10"))  # time local fixers may spend per request before the LLM; 0 disables
+    
     # GitHub integration
     GITHUB_ACCESS_TOKEN: Optional[str] = os.getenv("GITHUB_ACCESS_TOKEN", "")
     GITHUB_CLIENT_ID: str = os.getenv("GITHUB_CLIENT_ID", "")
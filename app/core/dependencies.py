@@ -30,15 +30,15 @@ def get_db() -> Generator[Session, None, None]:
 def get_agent_system() -> AgentSystem:
     """Get the global agent system instance"""
     global _agent_system, _agent_system_task
-
+    
     if _agent_system is None:
         # Initialize the Groq client
         groq_client = GroqClient(api_key=settings.GROQ_API_KEY)
-
+        
         # Create and initialize the agent system
         _agent_system = AgentSystem(llm_client=groq_client)
         _agent_system.initialize_agents()
-
+        
         # Start the agent system in the background if not already running
         if _agent_system_task is None or _agent_system_task.done():
             try:
@@ -49,7 +49,7 @@ def get_agent_system() -> AgentSystem:
             except RuntimeError:
                 # If no event loop is running, the task will be created when needed
                 _agent_system_task = None
-
+    
     return _agent_system
 
 
@@ -62,10 +62,13 @@ async def cleanup_agent_system():
     """Cleanup function to properly stop the agent system"""
     if _agent_system:
         await _agent_system.stop()
-
+    
     if _agent_system_task and not _agent_system_task.done():
         _agent_system_task.cancel()
         try:
             await _agent_system_task
         except asyncio.CancelledError:
             pass
+    
+    if _agent_system:
+        await _agent_system.transport.close()
@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse, Response
 
 from app.core.config import settings
 from app.core.db import SessionLocal
+from app.core.request_context import request_context
 from app.services.api_key_service import validate_api_key
 from app.services.monitoring_service import monitoring_service
 
@@ -51,7 +52,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         # In a production environment, use Redis or another distributed cache
         self.cache: Dict[str, Dict] = {}
-        
+    
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Get client identifier (API key or IP)
         client_host = request.client.host if request.client else "unknown"
@@ -205,6 +206,38 @@ class AnalyticsMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class DeadlineMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware honouring the X-Request-Timeout header (seconds)
+    
+    The header becomes an absolute deadline in the request context; agent
+    sessions, sandbox runs and LLM calls made for the request inherit it and
+    are abandoned once it passes.
+    """
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        header = request.headers.get("X-Request-Timeout")
+        if not header:
+            return await call_next(request)
+        
+        try:
+            timeout = float(header)
+        except ValueError:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "X-Request-Timeout must be a number of seconds"}
+            )
+        
+        if timeout <= 0:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "X-Request-Timeout must be positive"}
+            )
+        
+        timeout = min(timeout, settings.REQUEST_MAX_TIMEOUT)
+        with request_context(deadline=time.time() + timeout):
+            return await call_next(request)
+
+
 def add_middlewares(app: FastAPI) -> None:
     """
     Add middlewares to the FastAPI app
@@ -219,6 +252,9 @@ def add_middlewares(app: FastAPI) -> None:
     # Add API key middleware
     app.add_middleware(APIKeyMiddleware)
     
+    # Add request deadline middleware
+    app.add_middleware(DeadlineMiddleware)
+    
     # Add timing middleware for debugging using decorator pattern
     @app.middleware("http")
     async def add_process_time_header(request: Request, call_next: Callable) -> Response:
@@ -0,0 +1,176 @@
+"""
+Per-request context propagated implicitly to downstream calls.
+
+Values are stored in ContextVars so that they follow a request through
+awaits and into tasks it spawns (e.g. the LLM client reads the priority
+without every call site having to pass it along).
+
+A request may also carry an absolute deadline (wall-clock seconds, so it
+stays meaningful in other processes) and a cancellation token; long-running
+work checks them so abandoned requests stop consuming capacity.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+# Priority classes, highest first
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH)
+
+_current_priority: ContextVar[str] = ContextVar("current_priority", default=PRIORITY_INTERACTIVE)
+_current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+_current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+_current_cancel_token: ContextVar[Optional["CancellationToken"]] = ContextVar("current_cancel_token", default=None)
+
+
+class RequestCancelledError(Exception):
+    """
+    Raised when work is abandoned because its request was cancelled or its deadline passed
+    """
+    pass
+
+
+class CancellationToken:
+    """
+    Flag shared by everything working on behalf of one request or session.
+    
+    Cancelling a token also cancels the tokens derived from it with child().
+    """
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event: Optional[asyncio.Event] = None
+        self._children: List["CancellationToken"] = []
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+    
+    def cancel(self, reason: str = "Request cancelled"):
+        """Cancel the token and its children (the first reason wins)."""
+        if self.cancelled:
+            return
+        
+        self.reason = reason
+        if self._event is not None:
+            self._event.set()
+        for child in self._children:
+            child.cancel(reason)
+    
+    def child(self) -> "CancellationToken":
+        """Create a token that is cancelled together with this one."""
+        token = CancellationToken()
+        if self.cancelled:
+            token.cancel(self.reason)
+        else:
+            self._children.append(token)
+        return token
+    
+    async def wait(self):
+        """Wait until the token is cancelled."""
+        if self._event is None:
+            self._event = asyncio.Event()
+            if self.cancelled:
+                self._event.set()
+        await self._event.wait()
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    """Map an arbitrary priority value onto a known priority class."""
+    if priority in PRIORITIES:
+        return priority
+    return PRIORITY_INTERACTIVE
+
+
+def get_priority() -> str:
+    """Get the priority class of the current request."""
+    return _current_priority.get()
+
+
+def get_session_id() -> Optional[str]:
+    """Get the agent session the current work belongs to, if any."""
+    return _current_session_id.get()
+
+
+def get_deadline() -> Optional[float]:
+    """Get the absolute deadline (time.time() seconds) of the current request, if any."""
+    return _current_deadline.get()
+
+
+def get_cancel_token() -> Optional[CancellationToken]:
+    """Get the cancellation token of the current request, if any."""
+    return _current_cancel_token.get()
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline (None if it has none)."""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+
+def bounded_timeout(timeout: float) -> float:
+    """Shorten a timeout so it does not run past the current request's deadline."""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    return min(timeout, remaining)
+
+
+def check_cancelled():
+    """
+    Stop work for a request that was cancelled or ran out of time
+    
+    Raises:
+        RequestCancelledError: If the current request's token is cancelled or its deadline passed
+    """
+    token = _current_cancel_token.get()
+    if token is not None and token.cancelled:
+        raise RequestCancelledError(token.reason)
+    
+    if time_remaining() == 0.0:
+        raise RequestCancelledError("Deadline exceeded")
+
+
+@contextmanager
+def request_context(
+    priority: Optional[str] = None,
+    session_id: Optional[str] = None,
+    deadline: Optional[float] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    detached: bool = False
+) -> Iterator[None]:
+    """
+    Set request context values for the duration of the block
+    
+    Args:
+        priority: Priority class (interactive, background or batch); unchanged if None
+        session_id: Agent session ID; unchanged if None
+        deadline: Absolute deadline in time.time() seconds; unchanged if None
+        cancel_token: Cancellation token; unchanged if None
+        detached: Drop the caller's deadline and cancellation token, for work
+            (such as background tasks) that outlives the request that started it
+    """
+    if detached:
+        deadline_token = _current_deadline.set(deadline)
+        cancel_context_token = _current_cancel_token.set(cancel_token)
+    else:
+        deadline_token = _current_deadline.set(deadline) if deadline is not None else None
+        cancel_context_token = _current_cancel_token.set(cancel_token) if cancel_token is not None else None
+    priority_token = _current_priority.set(normalize_priority(priority)) if priority is not None else None
+    session_token = _current_session_id.set(session_id) if session_id is not None else None
+    try:
+        yield
+    finally:
+        if session_token is not None:
+            _current_session_id.reset(session_token)
+        if priority_token is not None:
+            _current_priority.reset(priority_token)
+        if cancel_context_token is not None:
+            _current_cancel_token.reset(cancel_context_token)
+        if deadline_token is not None:
+            _current_deadline.reset(deadline_token)
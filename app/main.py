@@ -1,5 +1,6 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import time
 import logging
@@ -11,6 +12,8 @@ from app.core.config import settings
 from app.core.middleware import add_middlewares
 from app.api.v1.router import api_router
 from app.core.dependencies import get_agent_system, cleanup_agent_system
+from app.agents.message_queue import AgentOverloadedError
+from app.services.ai.http_transport import open_http_client, close_http_client
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +38,12 @@ if settings.SENTRY_DSN:
 async def lifespan(app: FastAPI):
     """Manage the lifespan of the application"""
     # Startup
+    try:
+        # Open the shared, pooled HTTP transport used by every GroqClient
+        await open_http_client()
+    except Exception as e:
+        logger.error(f"Failed to open LLM HTTP transport: {str(e)}")
+    
     try:
         # Initialize the agent system (this will start it automatically)
         agent_sys = get_agent_system()
@@ -47,7 +56,7 @@ async def lifespan(app: FastAPI):
             logger.info("Agent system started successfully")
         else:
             logger.warning("Agent system may not have started properly")
-            
+    
     except Exception as e:
         logger.error(f"Failed to start agent system: {str(e)}")
     
@@ -59,6 +68,11 @@ async def lifespan(app: FastAPI):
         logger.info("Agent system stopped")
     except Exception as e:
         logger.error(f"Error stopping agent system: {str(e)}")
+    
+    try:
+        await close_http_client()
+    except Exception as e:
+        logger.error(f"Error closing LLM HTTP transport: {str(e)}")
 
 # Create FastAPI app
 app = FastAPI(
@@ -85,6 +99,15 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router)
 
+# Overloaded agent system: tell clients when to retry instead of failing the request
+@app.exception_handler(AgentOverloadedError)
+async def agent_overloaded_handler(request: Request, exc: AgentOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))}
+    )
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -104,9 +127,11 @@ async def health_check():
         agent_sys = get_agent_system()
         agent_status = "running" if agent_sys.running else "stopped"
         agent_count = len(agent_sys.agents)
+        agent_backlog = agent_sys.backlog()
     except Exception as e:
         agent_status = f"error: {str(e)}"
         agent_count = 0
+        agent_backlog = 0
     
     return {
         "status": "ok",
@@ -115,7 +140,8 @@ async def health_check():
         "environment": settings.ENVIRONMENT,
         "agent_system": {
             "status": agent_status,
-            "agent_count": agent_count
+            "agent_count": agent_count,
+            "backlog": agent_backlog
         }
     }
 
@@ -0,0 +1,93 @@
+"""
+Per-fragment cache of LLM analysis results.
+
+Issues found in a top-level fragment of a file (see
+app.utils.parsing.fragments) are stored with line numbers relative to the
+fragment, keyed by language, model and the fragment's fingerprint. When a
+file is resubmitted, unchanged fragments are served from here and only the
+changed ones are sent to the model; cached issues are remapped onto the
+fragments' new positions.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+FragmentKey = Tuple[str, str, str]
+
+
+class FragmentCache:
+    """
+    LRU cache of fragment-relative issues keyed by (language, model, fingerprint)
+    
+    An empty list is a valid entry: the fragment was analyzed and had no issues.
+    """
+    
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[FragmentKey, List[Dict[str, Any]]]" = OrderedDict()
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+    
+    def get(self, key: FragmentKey) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the issues cached for a fragment
+        
+        Args:
+            key: (language, model, fingerprint)
+        
+        Returns:
+            Copies of the fragment-relative issue dicts, or None on a miss
+        """
+        if self.max_entries <= 0:
+            return None
+        
+        issues = self._entries.get(key)
+        if issues is None:
+            self.stats["misses"] += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return [dict(issue) for issue in issues]
+    
+    def set(self, key: FragmentKey, issues: List[Dict[str, Any]]):
+        """
+        Store the issues found in a fragment
+        
+        Args:
+            key: (language, model, fingerprint)
+            issues: Issue dicts with line numbers relative to the fragment
+        """
+        if self.max_entries <= 0:
+            return
+        
+        self._entries[key] = [dict(issue) for issue in issues]
+        self._entries.move_to_end(key)
+        self.stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def clear(self):
+        """Drop every cached fragment."""
+        self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and the current size."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Create a global instance of the fragment cache
+fragment_cache = FragmentCache(max_entries=settings.FRAGMENT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,223 @@
+"""
+Process-wide concurrency and rate governor for LLM calls.
+
+Every provider request acquires a slot from the governor first. Slots are
+bounded by a concurrency limit and by token buckets for requests per minute
+and tokens per minute, and are handed out strictly by priority class
+(interactive > background > batch), FIFO within a class.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.request_context import PRIORITIES, normalize_priority
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per minute
+    
+    A capacity of 0 disables the bucket.
+    """
+    
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = float(capacity_per_minute)
+        self.tokens = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.updated_at = time.monotonic()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def time_until_available(self, amount: float) -> float:
+        """Seconds until amount tokens can be taken (amount is capped at capacity)."""
+        if not self.enabled:
+            return 0.0
+        
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def consume(self, amount: float):
+        """Take tokens; the balance may go negative when actual usage exceeds the estimate."""
+        if self.enabled:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+    
+    def adjust(self, delta: float):
+        """Debit (positive) or refund (negative) tokens after the real cost is known."""
+        if self.enabled:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class GovernorSlot:
+    """
+    A granted slot; report actual token usage through record_usage()
+    """
+    
+    def __init__(self, priority: str, estimated_tokens: int, wait_seconds: float):
+        self.priority = priority
+        self.estimated_tokens = estimated_tokens
+        self.wait_seconds = wait_seconds
+        self.actual_tokens: Optional[int] = None
+    
+    def record_usage(self, total_tokens: Optional[int]):
+        """Record the token count reported in the provider's usage block."""
+        if total_tokens is not None:
+            self.actual_tokens = int(total_tokens)
+
+
+class LLMGovernor:
+    """
+    Admission control for provider calls with priority lanes
+    """
+    
+    def __init__(self, max_concurrency: int, requests_per_minute: int, tokens_per_minute: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        
+        self.lane_stats: Dict[str, Dict[str, float]] = {
+            priority: {"granted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for priority in PRIORITIES
+        }
+    
+    @asynccontextmanager
+    async def acquire(self, priority: Optional[str] = None, estimated_tokens: int = 0) -> AsyncIterator[GovernorSlot]:
+        """
+        Wait for a slot in the given priority lane
+        
+        Args:
+            priority: Priority class of the call
+            estimated_tokens: Expected prompt + completion tokens, reconciled on release
+            
+        Yields:
+            The granted GovernorSlot
+        """
+        priority = normalize_priority(priority)
+        started = time.monotonic()
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (PRIORITIES.index(priority), next(self._sequence), future, estimated_tokens)
+        )
+        self._schedule()
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the waiter was cancelled
+            if future.done() and not future.cancelled():
+                self._release(estimated_tokens, None)
+            raise
+        
+        slot = GovernorSlot(priority, estimated_tokens, time.monotonic() - started)
+        self._record_wait(slot)
+        
+        try:
+            yield slot
+        finally:
+            self._release(estimated_tokens, slot.actual_tokens)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, concurrency and per-lane queue-wait metrics."""
+        waiting = {priority: 0 for priority in PRIORITIES}
+        for lane, _, future, _ in self._waiters:
+            if not future.done():
+                waiting[PRIORITIES[lane]] += 1
+        
+        lanes = {}
+        for priority, stats in self.lane_stats.items():
+            granted = stats["granted"]
+            lanes[priority] = {
+                "waiting": waiting[priority],
+                "granted": granted,
+                "avg_wait_seconds": round(stats["total_wait_seconds"] / granted, 4) if granted else 0.0,
+                "max_wait_seconds": round(stats["max_wait_seconds"], 4),
+            }
+        
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": int(self.request_bucket.capacity),
+            "tokens_per_minute": int(self.token_bucket.capacity),
+            "lanes": lanes,
+        }
+    
+    def _schedule(self):
+        """Grant slots to the highest-priority waiters while capacity allows."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        
+        while self._waiters and self._active < self.max_concurrency:
+            _, _, future, estimated_tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            
+            delay = max(
+                self.request_bucket.time_until_available(1),
+                self.token_bucket.time_until_available(estimated_tokens)
+            )
+            if delay > 0:
+                # Head of line waits for the buckets; lower lanes must not overtake it
+                loop = asyncio.get_running_loop()
+                self._wakeup = loop.call_later(delay, self._schedule)
+                return
+            
+            heapq.heappop(self._waiters)
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(estimated_tokens)
+            self._active += 1
+            future.set_result(None)
+    
+    def _release(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Free a slot and reconcile the token estimate with actual usage."""
+        self._active -= 1
+        if actual_tokens is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+        self._schedule()
+    
+    def _record_wait(self, slot: GovernorSlot):
+        stats = self.lane_stats[slot.priority]
+        stats["granted"] += 1
+        stats["total_wait_seconds"] += slot.wait_seconds
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], slot.wait_seconds)
+
+
+def estimate_payload_tokens(payload: Dict[str, Any]) -> int:
+    """
+    Rough upper bound of the tokens a completion will consume
+    
+    Uses ~4 characters per prompt token plus the requested completion budget.
+    """
+    prompt_chars = sum(len(message.get("content") or "") for message in payload.get("messages", []))
+    return prompt_chars // 4 + int(payload.get("max_tokens") or 0)
+
+
+# Create a global instance of the governor
+llm_governor = LLMGovernor(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE
+)
@@ -1,23 +1,66 @@
+import asyncio
+import bisect
 import json
-from typing import Any, Dict, List, Optional
+import logging
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
 from app.core.config import settings
+from app.core.request_context import RequestCancelledError, check_cancelled, get_priority, time_remaining
 from app.models.schemas.analysis import CodeIssue
+from app.services.ai.fragment_cache import fragment_cache
+from app.services.ai.governor import estimate_payload_tokens, llm_governor
+from app.services.ai.http_transport import get_http_client
+from app.services.ai.resilience import (
+    GroqAPIError, call_with_resilience, llm_circuit_breaker, parse_retry_after
+)
+from app.services.ai.response_cache import make_cache_key, response_cache
+from app.services.ai.single_flight import llm_single_flight
+from app.utils.parsing.chunking import CodeChunk, pack_blocks
+from app.utils.parsing.fragments import Fragment, split_fragments
+from app.utils.parsing.parsed_module import ParsedModule
+from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.patching import PatchApplyError, apply_hunks, hunks_from_edits, number_lines, parse_unified_diff
+
+logger = logging.getLogger(__name__)
+
+# Shared response format for edit-based fixes; the model returns only the lines it changes
+EDITS_FORMAT = """
+    "edits": [
+        {
+            "start_line": first line number replaced (or the line to insert before),
+            "end_line": last line number replaced (start_line - 1 for a pure insertion),
+            "original": "the exact original lines being replaced, without line numbers (an empty string for one blank line)",
+            "replacement": "the new lines (an empty string deletes the original lines, a single \\n is one blank line)"
+        }
+    ]"""
 
 
 class GroqClient:
     """
     Client for interacting with Groq LLM API
     """
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key or settings.GROQ_API_KEY
         self.model = settings.GROQ_MODEL
         self.base_url = "https://api.groq.com/openai/v1"
         
         if not self.api_key:
             raise ValueError("Groq API key not provided")
+        
+        # Explicit client (e.g. for tests); otherwise the process-wide pooled client is used
+        self._http_client = http_client
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The HTTP client used for API calls (shared across all GroqClient instances)."""
+        return self._http_client or get_http_client()
     
     async def generate_completion(
         self, 
@@ -29,11 +72,6 @@ class GroqClient:
         """
         Generate a completion using the Groq API
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         messages = []
         
         # Add system message if provided
@@ -50,18 +88,7 @@ class GroqClient:
             "temperature": temperature
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Groq API error: {response.status_code} - {response.text}")
-            
-            return response.json()
+        return await self._call_api("chat/completions", payload)
     
     async def generate_text(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7) -> str:
         """
@@ -73,18 +100,188 @@ class GroqClient:
             prompt: The prompt to generate text from
             max_tokens: Maximum number of tokens to generate
             temperature: Temperature for text generation (higher = more random)
-            
+        
         Returns:
             The generated text content
         """
         response = await self.generate_completion(prompt, max_tokens, temperature)
         return response["choices"][0]["message"]["content"]
-            
-    async def analyze_code(self, code: str, language: str) -> List[CodeIssue]:
+    
+    async def stream_completion(
+        self,
+        prompt: str,
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        system_message: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a completion with stream=True and yield content chunks as they arrive
+        
+        Args:
+            prompt: The prompt to generate text from
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for text generation (higher = more random)
+            system_message: Optional system message
+        
+        Yields:
+            Content deltas in order
+        """
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        messages.append({"role": "user", "content": prompt})
+        
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        
+        async for delta in self._stream_api("chat/completions", payload):
+            yield delta
+    
+    async def analyze_code(
+        self,
+        code: str,
+        language: str,
+        bypass_cache: bool = False,
+        module: Optional[ParsedModule] = None
+    ) -> List[CodeIssue]:
         """
         Analyze code for bugs and issues
+        
+        The code is split into top-level fragments (functions, classes and the
+        module-level code between them) and issues are cached per fragment, so a
+        resubmitted file only sends the fragments that changed; cached issues are
+        moved to the lines their fragment now starts at. Changed fragments beyond
+        LLM_ANALYSIS_CHUNK_TOKENS are split into chunks that are analyzed
+        concurrently, and their issues are merged back with line numbers relative
+        to the full file.
+        Set bypass_cache to force fresh completions instead of cached ones;
+        pass module when the caller has already parsed the code.
         """
-        prompt = self._get_analysis_prompt(code, language)
+        if module is None:
+            module = get_parser_for_language(language).parse_module(code)
+        
+        issues: List[CodeIssue] = []
+        pending: List[Fragment] = []
+        for fragment in split_fragments(code, module):
+            cached = None if bypass_cache else fragment_cache.get(self._fragment_key(language, fragment))
+            if cached is None:
+                pending.append(fragment)
+                continue
+            for data in cached:
+                data["line_start"] = fragment.to_file_line(data["line_start"])
+                if data.get("line_end") is not None:
+                    data["line_end"] = fragment.to_file_line(data["line_end"])
+                issues.append(CodeIssue(**data))
+        
+        if pending:
+            lines = code.split("\n")
+            chunks = pack_blocks(
+                lines,
+                [(fragment.start_line, fragment.end_line) for fragment in pending],
+                settings.LLM_ANALYSIS_CHUNK_TOKENS
+            )
+            if len(chunks) == 1 and len(chunks[0].lines) == len(lines):
+                fresh = await self._analyze_chunk(code, language, bypass_cache)
+                failed: List[CodeChunk] = []
+            else:
+                fresh, failed = await self._analyze_chunks(chunks, language, bypass_cache)
+            
+            self._cache_fragment_issues(
+                language,
+                [
+                    fragment for fragment in pending
+                    if not any(chunk.start_line <= fragment.end_line and fragment.start_line <= chunk.end_line for chunk in failed)
+                ],
+                fresh
+            )
+            issues.extend(fresh)
+        
+        # Models number issues from 1 in every completion
+        seen_ids = set()
+        for index, issue in enumerate(issues):
+            if issue.id in seen_ids:
+                issues[index] = issue = issue.model_copy(update={"id": f"{issue.id}-{index + 1}"})
+            seen_ids.add(issue.id)
+        
+        return sorted(issues, key=lambda issue: issue.line_start)
+    
+    async def _analyze_chunks(
+        self,
+        chunks: List[CodeChunk],
+        language: str,
+        bypass_cache: bool
+    ) -> Tuple[List[CodeIssue], List[CodeChunk]]:
+        """
+        Analyze chunks concurrently
+        
+        Returns:
+            The merged issues of the chunks that succeeded and the chunks that failed
+        """
+        results = await asyncio.gather(
+            *(self._analyze_chunk(chunk.text, language, bypass_cache, chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if len(failures) == len(results):
+            raise failures[0]
+        if failures:
+            logger.warning(f"{len(failures)} of {len(chunks)} analysis chunks failed: {failures[0]}")
+        
+        issues = self._merge_chunk_issues([
+            (chunk, chunk_issues) for chunk, chunk_issues in zip(chunks, results)
+            if not isinstance(chunk_issues, BaseException)
+        ])
+        failed = [chunk for chunk, result in zip(chunks, results) if isinstance(result, BaseException)]
+        return issues, failed
+    
+    def _fragment_key(self, language: str, fragment: Fragment) -> Tuple[str, str, str]:
+        """
+        Build the fragment cache key; results depend on the model as well as the code
+        """
+        return language.lower(), self.model, fragment.fingerprint
+    
+    def _cache_fragment_issues(self, language: str, fragments: List[Fragment], issues: List[CodeIssue]):
+        """
+        Store freshly found issues per fragment, with fragment-relative line numbers
+        
+        Each issue belongs to the fragment containing its first line; fragments
+        without issues are stored too so that they are not analyzed again.
+        """
+        if not fragments:
+            return
+        
+        starts = [fragment.start_line for fragment in fragments]
+        by_fragment: Dict[int, List[Dict[str, Any]]] = {index: [] for index in range(len(fragments))}
+        for issue in issues:
+            index = bisect.bisect_right(starts, issue.line_start) - 1
+            if index < 0 or issue.line_start > fragments[index].end_line:
+                continue
+            fragment = fragments[index]
+            data = issue.model_dump()
+            data["line_start"] = fragment.to_fragment_line(issue.line_start)
+            if issue.line_end is not None:
+                data["line_end"] = fragment.to_fragment_line(issue.line_end)
+            by_fragment[index].append(data)
+        
+        for index, fragment in enumerate(fragments):
+            fragment_cache.set(self._fragment_key(language, fragment), by_fragment[index])
+    
+    async def _analyze_chunk(
+        self,
+        code: str,
+        language: str,
+        bypass_cache: bool,
+        chunk: Optional[CodeChunk] = None
+    ) -> List[CodeIssue]:
+        """
+        Analyze one piece of code in a single completion
+        """
+        prompt = self._get_analysis_prompt(code, language, chunk)
         
         payload = {
             "model": self.model,
@@ -97,7 +294,7 @@ class GroqClient:
             "response_format": {"type": "json_object"}
         }
         
-        response = await self._call_api("chat/completions", payload)
+        response = await self._call_api("chat/completions", payload, use_cache=not bypass_cache)
         content = response["choices"][0]["message"]["content"]
         
         try:
@@ -107,12 +304,54 @@ class GroqClient:
         except (json.JSONDecodeError, KeyError) as e:
             raise ValueError(f"Failed to parse LLM response: {str(e)}")
     
-    async def fix_issue(self, code: str, language: str, issue: CodeIssue) -> Dict[str, str]:
+    def _merge_chunk_issues(self, chunk_results: List[Any]) -> List[CodeIssue]:
         """
-        Generate a fix for a specific issue
+        Remap chunk-relative line numbers to the full file and merge issues in line order
+        """
+        merged = []
+        seen_ids = set()
+        
+        for index, (chunk, issues) in enumerate(chunk_results):
+            for issue in issues:
+                updates = {"line_start": chunk.to_file_line(issue.line_start)}
+                if issue.line_end is not None:
+                    updates["line_end"] = chunk.to_file_line(issue.line_end)
+                
+                # Models number issues from 1 in every chunk
+                if issue.id in seen_ids:
+                    updates["id"] = f"{issue.id}-chunk{index + 1}"
+                seen_ids.add(updates.get("id", issue.id))
+                
+                merged.append(issue.model_copy(update=updates))
+        
+        return sorted(merged, key=lambda issue: issue.line_start)
+    
+    async def fix_issue(self, code: str, language: str, issue: CodeIssue, bypass_cache: bool = False) -> Dict[str, str]:
         """
-        prompt = self._get_fix_prompt(code, language, issue)
+        Generate a fix for a specific issue
         
+        The model is asked for line-anchored edits, which are validated and applied
+        locally. If the edits do not apply, the whole fixed file is requested instead.
+        Set bypass_cache to force a fresh completion instead of a cached one.
+        """
+        try:
+            result = await self._request_fix(self._get_fix_prompt(code, language, issue), bypass_cache)
+            return {
+                "fixed_code": apply_fix_result(code, result),
+                "explanation": result.get("explanation", "")
+            }
+        except PatchApplyError:
+            # Fall back to whole-file output
+            result = await self._request_fix(self._get_whole_file_fix_prompt(code, language, issue), bypass_cache)
+            return {
+                "fixed_code": result.get("fixed_code", ""),
+                "explanation": result.get("explanation", "")
+            }
+    
+    async def _request_fix(self, prompt: str, bypass_cache: bool) -> Dict[str, Any]:
+        """
+        Request a fix completion and decode its JSON body
+        """
         payload = {
             "model": self.model,
             "messages": [
@@ -124,16 +363,12 @@ class GroqClient:
             "response_format": {"type": "json_object"}
         }
         
-        response = await self._call_api("chat/completions", payload)
+        response = await self._call_api("chat/completions", payload, use_cache=not bypass_cache)
         content = response["choices"][0]["message"]["content"]
         
         try:
-            result = json.loads(content)
-            return {
-                "fixed_code": result.get("fixed_code", ""),
-                "explanation": result.get("explanation", "")
-            }
-        except (json.JSONDecodeError, KeyError) as e:
+            return json.loads(content)
+        except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse LLM response: {str(e)}")
     
     async def explain_error(self, error_message: str, code: str, language: str, user_level: str = "intermediate") -> Dict[str, Any]:
@@ -145,13 +380,40 @@ class GroqClient:
             code: The code that generated the error
             language: The programming language of the code
             user_level: User experience level (beginner, intermediate, advanced)
-            
+        
         Returns:
             Dictionary with explanations at different levels and learning resources
         """
+        payload = self._get_explanation_payload(error_message, code, language, user_level)
+        
+        response = await self._call_api("chat/completions", payload)
+        return self._parse_explanation(response["choices"][0]["message"]["content"])
+    
+    async def stream_error_explanation(
+        self,
+        error_message: str,
+        code: str,
+        language: str,
+        user_level: str = "intermediate"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an error explanation
+        
+        Yields {"type": "delta", "content": ...} events as text arrives, then a final
+        {"type": "result", "result": ...} event with the same shape as explain_error().
+        """
+        payload = self._get_explanation_payload(error_message, code, language, user_level)
+        
+        async for event in self._stream_events(payload, self._parse_explanation):
+            yield event
+    
+    def _get_explanation_payload(self, error_message: str, code: str, language: str, user_level: str) -> Dict[str, Any]:
+        """
+        Build the completion payload for an error explanation
+        """
         prompt = self._get_error_explanation_prompt(error_message, code, language, user_level)
         
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": "You are an expert at explaining code errors at multiple levels of detail."},
@@ -161,12 +423,13 @@ class GroqClient:
             "max_tokens": 2500,
             "response_format": {"type": "json_object"}
         }
-        
-        response = await self._call_api("chat/completions", payload)
-        content = response["choices"][0]["message"]["content"]
-        
+    
+    def _parse_explanation(self, content: str) -> Dict[str, Any]:
+        """
+        Parse an error explanation completion, falling back to the raw text
+        """
         try:
-            result = json.loads(content)
+            result = json.loads(extract_json_text(content))
             return {
                 "simple": result.get("simple", ""),
                 "detailed": result.get("detailed", ""),
@@ -174,7 +437,7 @@ class GroqClient:
                 "learning_resources": result.get("learning_resources", []),
                 "related_concepts": result.get("related_concepts", [])
             }
-        except (json.JSONDecodeError, KeyError) as e:
+        except (json.JSONDecodeError, KeyError, AttributeError) as e:
             # If JSON parsing fails, create a fallback response
             return {
                 "simple": "Failed to parse the explanation response.",
@@ -189,7 +452,8 @@ class GroqClient:
         original_code: str, 
         language: str, 
         issue_description: str,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Generate a patch for a code issue
@@ -199,13 +463,48 @@ class GroqClient:
             language: The programming language of the code
             issue_description: Description of the issue to fix
             context: Additional context about the code or issue
-            
+            bypass_cache: Force a fresh completion instead of a cached one
+        
         Returns:
             Dictionary with the patch, explanation, and whether it can be auto-applied
+            (only if the diff applies cleanly to original_code)
+        """
+        payload = self._get_patch_payload(original_code, language, issue_description, context)
+        
+        response = await self._call_api("chat/completions", payload, use_cache=not bypass_cache)
+        return self._parse_patch(response["choices"][0]["message"]["content"], original_code)
+    
+    async def stream_patch(
+        self,
+        original_code: str,
+        language: str,
+        issue_description: str,
+        context: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream patch generation
+        
+        Yields {"type": "delta", "content": ...} events as text arrives, then a final
+        {"type": "result", "result": ...} event with the same shape as generate_patch().
+        """
+        payload = self._get_patch_payload(original_code, language, issue_description, context)
+        
+        async for event in self._stream_events(payload, lambda content: self._parse_patch(content, original_code)):
+            yield event
+    
+    def _get_patch_payload(
+        self,
+        original_code: str,
+        language: str,
+        issue_description: str,
+        context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the completion payload for patch generation
         """
         prompt = self._get_patch_prompt(original_code, language, issue_description, context)
         
-        payload = {
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": "You are an expert at generating patches for code issues."},
@@ -215,32 +514,60 @@ class GroqClient:
             "max_tokens": 4000,
             "response_format": {"type": "json_object"}
         }
+    
+    def _parse_patch(self, content: str, original_code: str) -> Dict[str, Any]:
+        """
+        Parse a patch completion, falling back to an empty, non-applicable patch
         
-        response = await self._call_api("chat/completions", payload)
-        content = response["choices"][0]["message"]["content"]
-        
+        The model's can_auto_apply claim only stands if its unified diff parses
+        and every hunk applies to the original code.
+        """
         try:
-            result = json.loads(content)
+            result = json.loads(extract_json_text(content))
+            patch = result.get("patch", "")
             return {
-                "patch": result.get("patch", ""),
+                "patch": patch,
                 "explanation": result.get("explanation", ""),
-                "can_auto_apply": result.get("can_auto_apply", False)
+                "can_auto_apply": bool(result.get("can_auto_apply", False)) and diff_applies(original_code, patch)
             }
-        except (json.JSONDecodeError, KeyError) as e:
+        except (json.JSONDecodeError, KeyError, AttributeError) as e:
             # If JSON parsing fails, create a fallback response
             return {
                 "patch": "",
                 "explanation": f"Failed to generate patch: {str(e)}",
                 "can_auto_apply": False
             }
-            
-    def _get_analysis_prompt(self, code: str, language: str) -> str:
+    
+    async def _stream_events(
+        self,
+        payload: Dict[str, Any],
+        parse: Callable[[str], Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a completion as delta events followed by one parsed result event
+        """
+        chunks = []
+        async for delta in self._stream_api("chat/completions", payload):
+            chunks.append(delta)
+            yield {"type": "delta", "content": delta}
+        
+        yield {"type": "result", "result": parse("".join(chunks))}
+    
+    def _get_analysis_prompt(self, code: str, language: str, chunk: Optional[CodeChunk] = None) -> str:
         """
         Generate the prompt for code analysis
         """
+        scope = ""
+        if chunk:
+            scope = f"""
+        This is an excerpt (lines {chunk.start_line}-{chunk.end_line}) of a larger file. Names may be
+        defined in the omitted parts; do not report them as undefined. Report line numbers
+        relative to the excerpt, starting at 1.
+        """
+        
         return f"""
         Analyze the following {language} code for bugs, issues, and potential improvements:
-        
+        {scope}
         ```{language}
         {code}
         ```
@@ -273,7 +600,29 @@ class GroqClient:
     
     def _get_fix_prompt(self, code: str, language: str, issue: CodeIssue) -> str:
         """
-        Generate the prompt for fixing a specific issue
+        Generate the prompt for fixing a specific issue as line-anchored edits
+        """
+        return f"""
+        Fix the following issue in this {language} code (line numbers are shown for reference):
+        
+        ```{language}
+        {number_lines(code)}
+        ```
+        
+        Issue:
+        - Type: {issue.type}
+        - Message: {issue.message}
+        - Line: {issue.line_start}
+        
+        Return only the lines that change, as a JSON object with the following structure:
+        {{{EDITS_FORMAT},
+            "explanation": "explanation of what was wrong and how you fixed it"
+        }}
+        """
+    
+    def _get_whole_file_fix_prompt(self, code: str, language: str, issue: CodeIssue) -> str:
+        """
+        Generate the fallback prompt that asks for the complete fixed file
         """
         return f"""
         Fix the following issue in this {language} code:
@@ -303,7 +652,7 @@ class GroqClient:
             code: The code that generated the error
             language: The programming language of the code
             user_level: User experience level (beginner, intermediate, advanced)
-            
+        
         Returns:
             Prompt string for the LLM
         """
@@ -362,7 +711,7 @@ class GroqClient:
             language: The programming language of the code
             issue_description: Description of the issue to fix
             context: Additional context about the code or issue
-            
+        
         Returns:
             Prompt string for the LLM
         """
@@ -383,7 +732,7 @@ class GroqClient:
             Additional context:
             {context}
             """
-            
+        
         prompt += """
         
         Please generate a patch in unified diff format that fixes the issue.
@@ -399,56 +748,274 @@ class GroqClient:
         
         return prompt
     
-    async def _call_api(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _call_api(self, endpoint: str, payload: Dict[str, Any], use_cache: bool = False) -> Dict[str, Any]:
         """
-        Call the Groq API
+        Call the Groq API using the shared pooled HTTP client
+        
+        When use_cache is set and the payload is low-temperature, identical payloads
+        are served from the response cache instead of the provider. Identical calls
+        that are already in flight are coalesced into a single provider request.
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        cache_key = make_cache_key(payload)
+        cacheable = use_cache and self._is_cacheable(payload)
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/{endpoint}",
-                headers=headers,
-                json=payload,
-                timeout=60.0
-            )
+        if cacheable:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return await llm_single_flight.do(
+            f"{endpoint}:{cache_key}",
+            lambda: self._fetch(endpoint, payload, cache_key if cacheable else None)
+        )
+    
+    async def _fetch(self, endpoint: str, payload: Dict[str, Any], cache_key: Optional[str]) -> Dict[str, Any]:
+        """
+        Perform the provider call for a single flight and populate the cache
+        """
+        result = await self._post(endpoint, payload)
+        
+        if cache_key is not None:
+            await response_cache.set(cache_key, result)
+        
+        return result
+    
+    def _is_cacheable(self, payload: Dict[str, Any]) -> bool:
+        """Only near-deterministic (low-temperature) completions are worth caching."""
+        return (
+            settings.LLM_CACHE_ENABLED
+            and payload.get("temperature", 1.0) <= settings.LLM_CACHE_MAX_TEMPERATURE
+        )
+    
+    async def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request to the Groq API, retrying transient failures
+        behind the circuit breaker
+        """
+        return await call_with_resilience(lambda: self._send(endpoint, payload))
+    
+    async def _send(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Make a single attempt once the governor grants a slot in the
+        current request's priority lane
+        """
+        async with llm_governor.acquire(get_priority(), estimate_payload_tokens(payload)) as slot:
+            # Waiting for the slot may have used up the request's time
+            check_cancelled()
+            try:
+                response = await self.http_client.post(
+                    f"{self.base_url}/{endpoint}",
+                    headers=self.headers,
+                    json=payload,
+                    timeout=self._request_timeout()
+                )
+            except httpx.TimeoutException as e:
+                if time_remaining() == 0.0:
+                    raise RequestCancelledError("Deadline exceeded") from e
+                raise GroqAPIError(f"Groq API request failed: {str(e)}") from e
+            except httpx.TransportError as e:
+                raise GroqAPIError(f"Groq API request failed: {str(e)}") from e
             
             if response.status_code != 200:
-                raise Exception(f"Groq API error: {response.status_code} - {response.text}")
+                raise GroqAPIError(
+                    f"Groq API error: {response.status_code} - {response.text}",
+                    status_code=response.status_code,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                )
             
-            return response.json()
+            result = response.json()
+            slot.record_usage(result.get("usage", {}).get("total_tokens"))
+            return result
+    
+    def _request_timeout(self):
+        """Per-request timeout: the client's own, shortened to the current request's deadline."""
+        remaining = time_remaining()
+        if remaining is None:
+            return httpx.USE_CLIENT_DEFAULT
+        
+        timeout = self.http_client.timeout
+        return httpx.Timeout(
+            connect=min(timeout.connect or remaining, remaining),
+            read=min(timeout.read or remaining, remaining),
+            write=min(timeout.write or remaining, remaining),
+            pool=min(timeout.pool or remaining, remaining)
+        )
+    
+    async def _stream_api(self, endpoint: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Call the Groq API with stream=True and yield content deltas from the SSE response
+        
+        Streams hold a governor slot until they finish. They are not retried, since
+        partial output may already have reached the caller, but they do respect
+        and feed the circuit breaker.
+        """
+        # JSON mode is not available for streamed completions; prompts still ask for JSON
+        payload = {key: value for key, value in payload.items() if key != "response_format"}
+        payload["stream"] = True
+        
+        check_cancelled()
+        llm_circuit_breaker.before_call()
+        
+        try:
+            async with llm_governor.acquire(get_priority(), estimate_payload_tokens(payload)) as slot:
+                async with self.http_client.stream(
+                    "POST",
+                    f"{self.base_url}/{endpoint}",
+                    headers=self.headers,
+                    json=payload,
+                    timeout=self._request_timeout()
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode(errors="replace")
+                        raise GroqAPIError(
+                            f"Groq API error: {response.status_code} - {body}",
+                            status_code=response.status_code,
+                            retry_after=parse_retry_after(response.headers.get("Retry-After"))
+                        )
+                    
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        
+                        chunk = json.loads(data)
+                        usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+                        if usage:
+                            slot.record_usage(usage.get("total_tokens"))
+                        
+                        for choice in chunk.get("choices", []):
+                            delta = choice.get("delta", {}).get("content")
+                            if delta:
+                                yield delta
+        except httpx.TransportError as e:
+            llm_circuit_breaker.record_failure()
+            raise GroqAPIError(f"Groq API request failed: {str(e)}") from e
+        except GroqAPIError as e:
+            if e.retryable:
+                llm_circuit_breaker.record_failure()
+            else:
+                llm_circuit_breaker.record_success()
+            raise
+        except BaseException:
+            # Consumer went away (or the stream was otherwise aborted) before an outcome
+            llm_circuit_breaker.abandon_call()
+            raise
+        
+        llm_circuit_breaker.record_success()
 
 
-async def get_fix_from_groq(
+def diff_applies(code: str, diff: str) -> bool:
+    """
+    Check whether a unified diff applies cleanly to code
+    
+    Args:
+        code: The code the diff was generated against
+        diff: Unified diff text
+    
+    Returns:
+        True if every hunk of the diff matches the code
+    """
+    try:
+        apply_hunks(code, parse_unified_diff(diff))
+    except PatchApplyError:
+        return False
+    return True
+
+
+def extract_json_text(content: str) -> str:
+    """
+    Extract the JSON object from a completion that may wrap it in prose or a code fence
+    
+    Args:
+        content: Raw completion text
+    
+    Returns:
+        The JSON text (or the original content if no JSON block was found)
+    """
+    if content.strip().startswith("{"):
+        return content
+    
+    # First try to find JSON block in code fence
+    json_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", content)
+    if json_match:
+        return json_match.group(1)
+    
+    # Try to find any JSON-like structure
+    json_match = re.search(r"\{[\s\S]*\}", content)
+    if json_match:
+        return json_match.group(0)
+    
+    return content
+
+def apply_fix_result(code: str, result: Dict[str, Any]) -> str:
+    """
+    Produce the fixed code from a decoded fix response
+    
+    Edits are validated against the original code and applied locally; a
+    "fixed_code" field is only used when the response carries no edits.
+    
+    Args:
+        code: The original code
+        result: Decoded JSON response
+    
+    Returns:
+        The fixed code
+    
+    Raises:
+        PatchApplyError: If the edits do not apply, or the response has neither edits nor fixed_code
+    """
+    edits = result.get("edits")
+    if isinstance(edits, list) and edits:
+        return apply_hunks(code, hunks_from_edits(edits))
+    
+    if result.get("fixed_code"):
+        return result["fixed_code"]
+    
+    raise PatchApplyError("Response contains neither edits nor fixed code")
+
+
+def _get_fix_messages(
     code: str,
     language: str,
     error_message: Optional[str] = None,
-    context: Optional[str] = None
-) -> Dict[str, Any]:
+    context: Optional[str] = None,
+    whole_file: bool = False
+) -> Dict[str, str]:
     """
-    Get a fix for code using Groq LLM
-    """
-    client = GroqClient()
+    Build the system message and prompt for a fix
     
-    system_message = """
-    You are an expert programmer tasked with fixing code errors.
-    Analyze the code and error message provided, then generate a fixed version of the code.
-    Also provide a clear explanation of what was wrong and how you fixed it.
-    Return your response in JSON format with the following structure:
+    By default the model is asked for line-anchored edits; whole_file asks for the
+    complete fixed file instead and is only used as a fallback.
+    """
+    if whole_file:
+        response_format = """
     {
         "fixed_code": "the complete fixed code",
         "explanation": "detailed explanation of the issues and fixes"
-    }
+    }"""
+        listing = code
+    else:
+        response_format = """
+    {""" + EDITS_FORMAT + """,
+        "explanation": "detailed explanation of the issues and fixes"
+    }"""
+        listing = number_lines(code)
+    
+    system_message = f"""
+    You are an expert programmer tasked with fixing code errors.
+    Analyze the code and error message provided, then generate a fix.
+    Also provide a clear explanation of what was wrong and how you fixed it.
+    Return your response in JSON format with the following structure:{response_format}
     """
     
     prompt = f"""
     I need help fixing this {language} code:
     
     ```{language}
-    {code}
+    {listing}
     ```
     
     """
@@ -467,58 +1034,129 @@ async def get_fix_from_groq(
         {context}
         """
     
-    prompt += """
-    Please provide the fixed code and an explanation of what was wrong and how you fixed it.
-    Return your response in JSON format with the following structure:
-    {
-        "fixed_code": "the complete fixed code",
-        "explanation": "detailed explanation of the issues and fixes"
+    prompt += f"""
+    Please provide the fix and an explanation of what was wrong and how you fixed it.
+    Return your response in JSON format with the following structure:{response_format}
+    """
+    
+    return {"system_message": system_message, "prompt": prompt}
+
+
+def parse_fix_content(code: str, content: str) -> Dict[str, Any]:
+    """
+    Parse a fix completion, returning the original code unchanged if it cannot be parsed
+    
+    Args:
+        code: The original code
+        content: Raw completion text
+    
+    Returns:
+        Dictionary with fixed_code and explanation
+    
+    Raises:
+        PatchApplyError: If the response is JSON but its edits do not apply
+    """
+    try:
+        result = json.loads(extract_json_text(content))
+    except json.JSONDecodeError:
+        # If JSON parsing fails, create a fallback response
+        return {
+            "fixed_code": code,
+            "explanation": "Failed to parse the AI response. The original code is returned unchanged."
+        }
+    
+    if not isinstance(result, dict) or "explanation" not in result:
+        raise PatchApplyError("Invalid response format from Groq API")
+    
+    return {
+        "fixed_code": apply_fix_result(code, result),
+        "explanation": result["explanation"]
     }
+
+
+async def get_fix_from_groq(
+    code: str,
+    language: str,
+    error_message: Optional[str] = None,
+    context: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get a fix for code using Groq LLM
+    
+    Edits are requested first; the whole fixed file is requested only if they do not apply.
     """
+    client = GroqClient()
     
     try:
-        response = await client.generate_completion(
-            prompt=prompt,
-            system_message=system_message,
-            temperature=0.3,
-            max_tokens=4000
-        )
-        
-        # Extract the content from the response
-        content = response["choices"][0]["message"]["content"]
-        
-        # Parse JSON from the content
-        # Find JSON block in the response if it's not pure JSON
-        if not content.strip().startswith("{"):
-            import re
-            # First try to find JSON block in code fence
-            json_match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", content)
-            if json_match:
-                content = json_match.group(1)
-            else:
-                # Try to find any JSON-like structure
-                json_match = re.search(r"\{[\s\S]*\"fixed_code\"[\s\S]*\"explanation\"[\s\S]*\}", content)
-                if json_match:
-                    content = json_match.group(0)
-        
         try:
-            result = json.loads(content)
-            
-            # Ensure the result has the expected structure
-            if "fixed_code" not in result or "explanation" not in result:
-                raise ValueError("Invalid response format from Groq API")
-        except json.JSONDecodeError:
-            # If JSON parsing fails, create a fallback response
-            return {
-                "fixed_code": code,
-                "explanation": "Failed to parse the AI response. The original code is returned unchanged."
-            }
-        
-        return result
-        
+            return await _request_fix_content(client, code, language, error_message, context)
+        except PatchApplyError:
+            return await _request_fix_content(client, code, language, error_message, context, whole_file=True)
+    
     except Exception as e:
         # Handle errors and provide a fallback response
         return {
             "fixed_code": code,  # Return original code as fallback
             "explanation": f"Error generating fix: {str(e)}"
-        } 
\ No newline at end of file
+        }
+
+
+async def _request_fix_content(
+    client: GroqClient,
+    code: str,
+    language: str,
+    error_message: Optional[str] = None,
+    context: Optional[str] = None,
+    whole_file: bool = False
+) -> Dict[str, Any]:
+    """
+    Request a fix completion and parse it
+    """
+    response = await client.generate_completion(
+        temperature=0.3,
+        max_tokens=4000,
+        **_get_fix_messages(code, language, error_message, context, whole_file=whole_file)
+    )
+    
+    # Extract the content from the response
+    content = response["choices"][0]["message"]["content"]
+    
+    return parse_fix_content(code, content)
+
+
+async def stream_fix_from_groq(
+    code: str,
+    language: str,
+    error_message: Optional[str] = None,
+    context: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a fix for code using Groq LLM
+    
+    Yields {"type": "delta", "content": ...} events as text arrives, then a final
+    {"type": "result", "result": ...} event with the same shape as get_fix_from_groq().
+    If the streamed edits do not apply, the result comes from a whole-file request.
+    """
+    client = GroqClient()
+    
+    chunks = []
+    async for delta in client.stream_completion(
+        temperature=0.3,
+        max_tokens=4000,
+        **_get_fix_messages(code, language, error_message, context)
+    ):
+        chunks.append(delta)
+        yield {"type": "delta", "content": delta}
+    
+    try:
+        result = parse_fix_content(code, "".join(chunks))
+    except PatchApplyError:
+        try:
+            result = await _request_fix_content(client, code, language, error_message, context, whole_file=True)
+        except Exception as e:
+            result = {
+                "fixed_code": code,
+                "explanation": f"Error generating fix: {str(e)}"
+            }
+    
+    yield {"type": "result", "result": result}
@@ -0,0 +1,77 @@
+"""
+Shared HTTP transport for LLM provider calls.
+
+A single long-lived ``httpx.AsyncClient`` is kept per process so that every
+``GroqClient`` reuses pooled keep-alive connections instead of paying for a
+fresh TCP+TLS handshake on each completion.
+"""
+import logging
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client, opened in the application lifespan
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """
+    Build a pooled HTTP client from the transport settings
+    """
+    http2 = settings.GROQ_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("GROQ_HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(settings.GROQ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT)
+
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it lazily if the lifespan hook has not run
+    (e.g. in scripts or background jobs started outside the FastAPI app)
+    """
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+
+    return _http_client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Open the shared HTTP client (called on application startup)."""
+    client = get_http_client()
+    logger.info("LLM HTTP transport opened")
+    return client
+
+
+async def close_http_client():
+    """Close the shared HTTP client and release pooled connections (called on shutdown)."""
+    global _http_client
+
+    if _http_client is not None:
+        if not _http_client.is_closed:
+            await _http_client.aclose()
+        _http_client = None
+        logger.info("LLM HTTP transport closed")
@@ -0,0 +1,277 @@
+"""
+Resilience layer for LLM provider calls.
+
+Transient provider failures (429, 5xx, network errors) are retried with
+jittered exponential backoff that honours ``Retry-After``, limited both per
+call and by a per-session retry budget. A circuit breaker fails fast while
+the provider is degraded instead of queueing more doomed requests.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.request_context import check_cancelled, get_session_id, time_remaining
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient server-side failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class GroqAPIError(Exception):
+    """
+    Error returned by (or while reaching) the Groq API
+    """
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+    
+    @property
+    def retryable(self) -> bool:
+        """Whether the failure is transient (network errors have no status code)."""
+        return self.status_code is None or self.status_code in RETRYABLE_STATUS_CODES
+
+
+class CircuitOpenError(GroqAPIError):
+    """
+    Raised without calling the provider while the circuit breaker is open
+    """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date
+    
+    Args:
+        value: Raw header value
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker
+    
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast. Once reset_timeout has elapsed a single probe call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0}
+    
+    def before_call(self):
+        """
+        Check whether a call may proceed
+        
+        Raises:
+            CircuitOpenError: If the circuit is open (or a half-open probe is already running)
+        """
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(
+                    "Groq API circuit breaker is open; provider is degraded",
+                    status_code=503,
+                    retry_after=remaining
+                )
+            self.state = self.HALF_OPEN
+        
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(
+                    "Groq API circuit breaker is probing the provider",
+                    status_code=503,
+                    retry_after=self.reset_timeout
+                )
+            self._probe_in_flight = True
+    
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        """Count a provider failure and open the circuit when the threshold is reached."""
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+                logger.warning("Groq API circuit breaker opened")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def abandon_call(self):
+        """Forget a call that was cancelled before its outcome was known."""
+        self._probe_in_flight = False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the breaker state metric and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            **self.stats,
+        }
+
+
+class RetryBudgets:
+    """
+    Per-session retry budgets
+    
+    Caps the total number of retries a single debugging session may spend
+    across all of its LLM calls, so one session cannot amplify an outage.
+    """
+    
+    def __init__(self, retries_per_session: int, max_sessions: int = 1024):
+        self.retries_per_session = retries_per_session
+        self.max_sessions = max_sessions
+        self._spent: "OrderedDict[str, int]" = OrderedDict()
+    
+    def try_spend(self, session_id: Optional[str]) -> bool:
+        """
+        Spend one retry from the session's budget
+        
+        Calls outside a session are only limited by the per-call retry count.
+        """
+        if session_id is None:
+            return True
+        
+        spent = self._spent.pop(session_id, 0)
+        if spent >= self.retries_per_session:
+            self._spent[session_id] = spent
+            return False
+        
+        self._spent[session_id] = spent + 1
+        while len(self._spent) > self.max_sessions:
+            self._spent.popitem(last=False)
+        return True
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Delay before the given retry attempt (0-based)
+    
+    Uses full-jitter exponential backoff, but never less than the provider's Retry-After.
+    """
+    ceiling = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+async def call_with_resilience(fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run a provider call behind the circuit breaker with bounded retries
+    
+    Args:
+        fn: Zero-argument coroutine factory performing one attempt
+    
+    Returns:
+        The result of the first successful attempt
+    
+    Raises:
+        GroqAPIError: If the call fails permanently or retries are exhausted
+        RequestCancelledError: If the current request was cancelled or its deadline passed
+    """
+    attempt = 0
+    
+    while True:
+        # Do not start (or retry) a call for a request that was abandoned
+        check_cancelled()
+        llm_circuit_breaker.before_call()
+        
+        try:
+            result = await fn()
+        except GroqAPIError as e:
+            if e.retryable:
+                llm_circuit_breaker.record_failure()
+            else:
+                # Client errors say nothing about provider health
+                llm_circuit_breaker.record_success()
+                raise
+            
+            if attempt >= settings.LLM_MAX_RETRIES:
+                retry_stats["exhausted"] += 1
+                raise
+            
+            if e.retry_after is not None and e.retry_after > settings.LLM_RETRY_MAX_DELAY:
+                retry_stats["exhausted"] += 1
+                raise
+            
+            if not llm_retry_budgets.try_spend(get_session_id()):
+                retry_stats["budget_exhausted"] += 1
+                raise
+            
+            delay = backoff_delay(attempt, e.retry_after)
+            remaining = time_remaining()
+            if remaining is not None and delay >= remaining:
+                retry_stats["exhausted"] += 1
+                raise
+            
+            retry_stats["retries"] += 1
+            logger.warning(f"Retrying Groq API call in {delay:.2f}s after error: {str(e)}")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancellation or an unexpected error says nothing about provider health,
+            # but a half-open probe that ends this way must not wedge the breaker
+            llm_circuit_breaker.abandon_call()
+            raise
+        
+        llm_circuit_breaker.record_success()
+        return result
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """Get circuit breaker state and retry counters."""
+    return {
+        "circuit_breaker": llm_circuit_breaker.get_stats(),
+        "retries": dict(retry_stats),
+    }
+
+
+# Create global instances shared by all GroqClient instances
+llm_circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS
+)
+llm_retry_budgets = RetryBudgets(retries_per_session=settings.LLM_RETRY_BUDGET_PER_SESSION)
+retry_stats = {"retries": 0, "exhausted": 0, "budget_exhausted": 0}
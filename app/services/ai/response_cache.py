@@ -0,0 +1,243 @@
+"""
+Content-addressed cache for LLM responses.
+
+Responses are keyed by a hash of the canonical request payload and stored in
+two tiers: an in-memory LRU for hot entries and an optional on-disk SQLite
+tier that survives restarts and is shared by workers on the same host.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Payload fields that determine the completion; everything else is ignored
+CACHE_KEY_FIELDS = ("model", "messages", "temperature", "max_tokens", "response_format")
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """
+    Build a stable key from the canonical form of a completion payload
+    
+    Args:
+        payload: The chat completion payload sent to the provider
+        
+    Returns:
+        Hex SHA-256 digest of the canonical payload
+    """
+    canonical = {field: payload.get(field) for field in CACHE_KEY_FIELDS}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM responses with TTL and size-based eviction
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: int = 86400,
+        db_path: Optional[str] = None,
+        max_disk_bytes: int = 100 * 1024 * 1024
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_bytes = max_disk_bytes
+        
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._disk_enabled = bool(db_path)
+        
+        self.stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "expirations": 0,
+        }
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Cache key from make_cache_key()
+            
+        Returns:
+            The cached response, or None on a miss
+        """
+        now = time.time()
+        
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return response
+            
+            del self._memory[key]
+            self.stats["expirations"] += 1
+        
+        if self._disk_enabled:
+            disk_entry = await asyncio.to_thread(self._disk_get, key, now)
+            if disk_entry is not None:
+                expires_at, response = disk_entry
+                self._memory_set(key, response, expires_at)
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return response
+        
+        self.stats["misses"] += 1
+        return None
+    
+    async def set(self, key: str, response: Dict[str, Any]):
+        """
+        Store a response in both tiers
+        
+        Args:
+            key: Cache key from make_cache_key()
+            response: The provider response to cache
+        """
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_set(key, response, expires_at)
+        self.stats["stores"] += 1
+        
+        if self._disk_enabled:
+            await asyncio.to_thread(self._disk_set, key, response, expires_at)
+    
+    def clear(self):
+        """Drop all entries from both tiers."""
+        self._memory.clear()
+        
+        if self._disk_enabled:
+            with self._db_lock:
+                db = self._connect()
+                if db is not None:
+                    db.execute("DELETE FROM llm_cache")
+                    db.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and current tier sizes."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "disk_enabled": self._disk_enabled,
+        }
+    
+    def _memory_set(self, key: str, response: Dict[str, Any], expires_at: float):
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier lazily; disable it if the path is not writable."""
+        if self._db is None and self._disk_enabled:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                    "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Disabling on-disk LLM cache at {self.db_path}: {str(e)}")
+                self._db = None
+                self._disk_enabled = False
+        
+        return self._db
+    
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Read an entry from the SQLite tier (runs in a worker thread)."""
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return None
+            
+            try:
+                row = db.execute(
+                    "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                
+                response, expires_at = row
+                if expires_at <= now:
+                    db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    db.commit()
+                    self.stats["expirations"] += 1
+                    return None
+                
+                db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                db.commit()
+                return expires_at, json.loads(response)
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logger.warning(f"LLM cache read failed: {str(e)}")
+                return None
+    
+    def _disk_set(self, key: str, response: Dict[str, Any], expires_at: float):
+        """Write an entry to the SQLite tier and enforce the size budget (runs in a worker thread)."""
+        encoded = json.dumps(response)
+        now = time.time()
+        
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, size, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, encoded, len(encoded), expires_at, now)
+                )
+                db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+                
+                # Evict least recently used rows until the tier fits its byte budget
+                total_size = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+                if total_size > self.max_disk_bytes:
+                    rows = db.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall()
+                    for old_key, size in rows:
+                        if total_size <= self.max_disk_bytes:
+                            break
+                        db.execute("DELETE FROM llm_cache WHERE key = ?", (old_key,))
+                        total_size -= size
+                        self.stats["disk_evictions"] += 1
+                
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache write failed: {str(e)}")
+
+
+# Create a global instance of the response cache
+response_cache = ResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    db_path=settings.LLM_CACHE_DB_PATH or None,
+    max_disk_bytes=settings.LLM_CACHE_MAX_DISK_MB * 1024 * 1024
+)
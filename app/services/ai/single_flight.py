@@ -0,0 +1,135 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+Concurrent callers that ask for the same key share one underlying call
+instead of each issuing their own request to the provider.
+"""
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.request_context import (
+    RequestCancelledError, check_cancelled, get_cancel_token, get_priority, get_session_id, request_context,
+    time_remaining
+)
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+    
+    The first caller for a key starts the call as a separate task; later callers
+    await the same task. Each caller waits through asyncio.shield, so cancelling
+    one waiter never cancels the shared call for the others.
+    
+    The shared call runs detached from the first caller's request context: it
+    keeps the caller's priority and session (so retries are charged to the
+    session's retry budget) but not its deadline or cancellation token. Each
+    waiter's own deadline and token are enforced around its wait, and the call
+    is cancelled once every waiter has given up.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = {
+            "calls": 0,
+            "coalesced": 0,
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+        
+        Args:
+            key: Identity of the call (e.g. the canonical payload hash)
+            fn: Zero-argument coroutine factory performing the call
+        
+        Returns:
+            The shared result of fn
+        """
+        task = self._calls.get(key)
+        
+        if task is None:
+            # A fresh context, so the task does not inherit this caller's deadline or cancellation token
+            task = contextvars.Context().run(
+                asyncio.create_task, self._run_detached(fn, get_priority(), get_session_id())
+            )
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["calls"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await self._wait(task)
+        finally:
+            self._waiters[task] -= 1
+            # Nobody is left to use the result, so stop spending provider capacity on it
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # A caller arriving now must start a new call, not join one being cancelled
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+                    task.cancel()
+    
+    @staticmethod
+    async def _run_detached(fn: Callable[[], Awaitable[Any]], priority: str, session_id: Optional[str]) -> Any:
+        with request_context(priority=priority, session_id=session_id):
+            return await fn()
+    
+    @staticmethod
+    async def _wait(task: asyncio.Task) -> Any:
+        """
+        Wait for a shared call within the current caller's deadline and cancellation token
+        
+        Raises:
+            RequestCancelledError: If the caller is cancelled or runs out of time first
+        """
+        check_cancelled()
+        token = get_cancel_token()
+        timeout = time_remaining()
+        if token is None and timeout is None:
+            return await asyncio.shield(task)
+        
+        shielded = asyncio.shield(task)
+        cancelled = asyncio.ensure_future(token.wait()) if token is not None else None
+        try:
+            await asyncio.wait(
+                [future for future in (shielded, cancelled) if future is not None],
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            if cancelled is not None:
+                cancelled.cancel()
+            # Only this waiter's shield is cancelled; the shared call keeps running
+            if not shielded.done():
+                shielded.cancel()
+        
+        if not shielded.cancelled():
+            return shielded.result()
+        
+        raise RequestCancelledError(token.reason if token is not None and token.cancelled else "Deadline exceeded")
+    
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call/coalesce counters."""
+        return {**self.stats, "in_flight": self.in_flight()}
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        """Drop a finished call and mark its exception as retrieved if every waiter left."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        
+        if not task.cancelled():
+            task.exception()
+
+
+# Create a global instance shared by all GroqClient instances
+llm_single_flight = SingleFlight()
@@ -1,12 +1,16 @@
 from typing import List, Optional
 import asyncio
+import uuid
 
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.db.analysis import AnalysisRequest, AnalysisStatus
 from app.models.schemas.analysis import AnalysisRequestCreate, CodeIssue
 from app.services.ai.groq_client import GroqClient
+from app.utils.issue_merging import merge_issues
 from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.static_analysis.python_rules import rule_engine
 
 
 async def create_analysis_request(
@@ -73,62 +77,49 @@ async def analyze_code_with_agents(db: Session, analysis_id: str, agent_system)
         analysis.session_id = session_id
         db.commit()
         
-        # Get the coordinator agent to access active sessions
-        coordinator = agent_system.agents.get("coordinator_1")
-        if not coordinator:
-            raise Exception("Coordinator agent not found")
-        
         # Wait for the analysis to complete (with timeout)
         max_wait_time = 60  # 60 seconds timeout
-        poll_interval = 2   # Check every 2 seconds
-        waited_time = 0
-        
-        while waited_time < max_wait_time:
-            # Check if the session has completed
-            session_data = getattr(coordinator, 'active_sessions', {}).get(session_id)
-            if session_data and session_data.get("state") == "completed":
-                # Extract issues from the session
-                issues = session_data.get("issues", [])
-                
-                # Convert to CodeIssue objects
-                code_issues = []
-                for i, issue in enumerate(issues):
-                    code_issues.append(CodeIssue(
-                        id=f"issue_{i}",
-                        type=issue.get("type", "unknown"),
-                        message=issue.get("message", ""),
-                        line_start=issue.get("line_start", 1),
-                        line_end=issue.get("line_end"),
-                        column_start=issue.get("column_start"),
-                        column_end=issue.get("column_end"),
-                        severity=issue.get("severity", "medium")
-                    ))
-                
-                # Update the analysis request with the issues
-                analysis.issues = [issue.dict() for issue in code_issues]
-                analysis.status = AnalysisStatus.COMPLETED.value
-                db.commit()
-                
-                return code_issues
-            
-            elif session_data and session_data.get("state") == "error":
-                # Analysis failed
-                error_msg = session_data.get("error", "Unknown error occurred")
-                analysis.status = AnalysisStatus.FAILED.value
-                analysis.error = error_msg
-                db.commit()
-                raise Exception(error_msg)
-            
-            # Wait before checking again
-            await asyncio.sleep(poll_interval)
-            waited_time += poll_interval
-        
-        # Timeout occurred
-        analysis.status = AnalysisStatus.FAILED.value
-        analysis.error = "Analysis timed out"
+        try:
+            session_data = await agent_system.wait_for_session(session_id, timeout=max_wait_time)
+        except asyncio.TimeoutError:
+            # Timeout occurred
+            analysis.status = AnalysisStatus.FAILED.value
+            analysis.error = "Analysis timed out"
+            db.commit()
+            raise Exception("Analysis timed out after 60 seconds")
+        
+        if session_data.get("state") == "error":
+            # Analysis failed
+            error_msg = session_data.get("error", "Unknown error occurred")
+            analysis.status = AnalysisStatus.FAILED.value
+            analysis.error = error_msg
+            db.commit()
+            raise Exception(error_msg)
+        
+        # Extract issues from the session
+        issues = session_data.get("issues", [])
+        
+        # Convert to CodeIssue objects
+        code_issues = []
+        for i, issue in enumerate(issues):
+            code_issues.append(CodeIssue(
+                id=f"issue_{i}",
+                type=issue.get("type", "unknown"),
+                message=issue.get("message", ""),
+                line_start=issue.get("line_start", 1),
+                line_end=issue.get("line_end"),
+                column_start=issue.get("column_start"),
+                column_end=issue.get("column_end"),
+                severity=issue.get("severity", "medium")
+            ))
+        
+        # Update the analysis request with the issues
+        analysis.issues = [issue.dict() for issue in code_issues]
+        analysis.status = AnalysisStatus.COMPLETED.value
         db.commit()
-        raise Exception("Analysis timed out after 60 seconds")
         
+        return code_issues
+    
     except Exception as e:
         # Update status to failed
         analysis.status = AnalysisStatus.FAILED.value
@@ -152,7 +143,7 @@ async def analyze_code(db: Session, analysis_id: str, agent_system=None) -> List
 
 async def analyze_code_direct(db: Session, analysis_id: str) -> List[CodeIssue]:
     """
-    Analyze code directly using LLM (fallback method)
+    Analyze code directly with local rule checks and the LLM (fallback method)
     """
     # Get the analysis request
     analysis = await get_analysis_request(db, analysis_id)
@@ -170,9 +161,19 @@ async def analyze_code_direct(db: Session, analysis_id: str) -> List[CodeIssue]:
         # Pre-process the code if needed
         preprocessed_code = parser.preprocess(analysis.code)
         
-        # Analyze the code using the LLM
-        groq_client = GroqClient()
-        issues = await groq_client.analyze_code(preprocessed_code, analysis.language)
+        # Parse once; the rule checks and the LLM analysis (to chunk large files) reuse the module
+        module = parser.parse_module(preprocessed_code)
+        
+        # Local rule checks take milliseconds
+        issues = [CodeIssue(id=str(uuid.uuid4()), **finding.to_issue()) for finding in rule_engine.run(module)]
+        
+        # Analyze the code using the LLM, unless the policy says the static findings are enough
+        policy = settings.ANALYZER_LLM_POLICY
+        if policy == "always" or (policy == "fallback" and not issues):
+            groq_client = GroqClient()
+            issues.extend(await groq_client.analyze_code(preprocessed_code, analysis.language, module=module))
+            # The LLM often restates rule findings; merged issues keep the rule finding's id
+            issues = [CodeIssue(**issue) for issue in merge_issues([issue.model_dump() for issue in issues])]
         
         # Post-process the issues if needed
         processed_issues = parser.process_analysis_results(issues)
@@ -9,7 +9,7 @@ from app.models.schemas.fix import (
     FixRequestResponse
 )
 from app.services.ai.groq_client import get_fix_from_groq
-from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.parsing.parser_factory import get_parser_for_language, is_supported_language
 from app.utils.sandbox.code_runner import run_code_in_sandbox
 
 # Define types for clarity
@@ -155,48 +155,35 @@ async def process_fix_with_agents(db: Session, fix_request: FixRequest, agent_sy
     fix_request.session_id = session_id
     db.commit()
     
-    # Get the coordinator agent to access active sessions
-    coordinator = agent_system.agents.get("coordinator_1")
-    if not coordinator:
-        raise Exception("Coordinator agent not found")
-    
     # Wait for the fix to complete (with timeout)
     max_wait_time = 90  # 90 seconds timeout for fix generation
-    poll_interval = 3   # Check every 3 seconds
-    waited_time = 0
+    try:
+        session_data = await agent_system.wait_for_session(session_id, timeout=max_wait_time)
+    except asyncio.TimeoutError:
+        # Timeout occurred
+        raise Exception("Fix generation timed out after 90 seconds")
     
-    while waited_time < max_wait_time:
-        # Check if the session has completed
-        session_data = getattr(coordinator, 'active_sessions', {}).get(session_id)
-        if session_data and session_data.get("state") == "completed":
-            # Extract fixes from the session
-            fixes = session_data.get("fixes", [])
-            
-            if fixes:
-                # Use the first (best) fix
-                best_fix = fixes[0]
-                return {
-                    "fixed_code": best_fix.get("fixed_code", ""),
-                    "explanation": best_fix.get("explanation", "")
-                }
-            else:
-                # No fixes generated
-                return {
-                    "fixed_code": fix_request.code,  # Return original code
-                    "explanation": "No fixes were generated by the agent system"
-                }
-        
-        elif session_data and session_data.get("state") == "error":
-            # Fix generation failed
-            error_msg = session_data.get("error", "Unknown error occurred")
-            raise Exception(f"Agent system error: {error_msg}")
-        
-        # Wait before checking again
-        await asyncio.sleep(poll_interval)
-        waited_time += poll_interval
+    if session_data.get("state") == "error":
+        # Fix generation failed
+        error_msg = session_data.get("error", "Unknown error occurred")
+        raise Exception(f"Agent system error: {error_msg}")
+    
+    # Extract fixes from the session
+    fixes = session_data.get("fixes", [])
     
-    # Timeout occurred
-    raise Exception("Fix generation timed out after 90 seconds")
+    if fixes:
+        # Non-overlapping fixes are merged into one file by the fix generator
+        fixed_code = session_data.get("fixed_code") or fixes[0].get("code_after", "")
+        return {
+            "fixed_code": fixed_code,
+            "explanation": "\n\n".join(fix.get("explanation", "") for fix in fixes if fix.get("explanation"))
+        }
+    else:
+        # No fixes generated
+        return {
+            "fixed_code": fix_request.code,  # Return original code
+            "explanation": "No fixes were generated by the agent system"
+        }
 
 async def process_fix_direct(fix_request: FixRequest) -> Dict[str, str]:
     """
@@ -214,8 +201,15 @@ async def process_fix_direct(fix_request: FixRequest) -> Dict[str, str]:
 
 async def validate_fix(original_code: str, fixed_code: str, language: str) -> ValidationResult:
     """
-    Validate a fix by running it in a sandbox
+    Validate a fix by parsing it, then running it in a sandbox
     """
+    # A fix that does not parse can be rejected without running it (only languages with a parser can be checked)
+    if is_supported_language(language):
+        module = get_parser_for_language(language).parse_module(fixed_code)
+        if not module.ok:
+            line = module.error.get("line")
+            return False, f"Fixed code has a syntax error at line {line}: {module.error.get('message')}"
+    
     # Skip validation if sandbox is disabled
     if not settings.USE_DOCKER_SANDBOX:
         return True, "Sandbox validation skipped"
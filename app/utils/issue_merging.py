@@ -0,0 +1,179 @@
+"""
+Semantic deduplication of analysis issues.
+
+Static analysis, the sandbox, error messages and the LLM often report the same
+bug in different words ("Division by zero always raises ZeroDivisionError",
+"Runtime error: ZeroDivisionError: division by zero"). Issues are merged when
+their line ranges overlap and their fingerprints (normalized message tokens
+and type) are similar enough. Overlaps are found with a sweep over issues
+sorted by first line, so each issue is only compared with the groups still
+open at its line instead of with every other issue.
+"""
+import heapq
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+SEVERITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
+
+# Types that say nothing about the kind of bug; they are compatible with any type
+GENERIC_TYPES = {"bug", "error", "logic", "runtime", "issue", "warning", "other"}
+
+# Token overlap needed to merge issues of compatible and of different types
+SIMILARITY_THRESHOLD = 0.5
+CROSS_TYPE_SIMILARITY_THRESHOLD = 0.8
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "be", "been", "was", "to", "of", "in", "on", "at", "by", "for", "and", "or",
+    "this", "that", "it", "its", "as", "with", "when", "which", "will", "may", "can", "could", "might", "should",
+    "always", "possible", "potential", "potentially", "line", "lines", "code", "error", "runtime", "raise", "raises",
+}
+
+_WORD = re.compile(r"[A-Za-z0-9]+")
+# Splits CamelCase words: ZeroDivisionError -> Zero, Division, Error
+_WORD_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def message_tokens(message: str) -> FrozenSet[str]:
+    """
+    Normalize a message to its set of meaningful tokens
+    
+    Words are split at underscores and CamelCase humps, lowercased and
+    de-pluralized; numbers and stopwords are dropped.
+    """
+    tokens = set()
+    for word in _WORD.findall(message or ""):
+        for part in _WORD_PART.findall(word):
+            token = part.lower()
+            if token.isdigit() or token in _STOPWORDS:
+                continue
+            if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.add(token)
+    return frozenset(tokens)
+
+
+def issue_fingerprint(issue: Dict[str, Any]) -> Tuple[str, FrozenSet[str]]:
+    """Fingerprint an issue as its normalized type and message tokens."""
+    return (issue.get("type") or "").lower(), message_tokens(issue.get("message", ""))
+
+
+def similarity(first: Tuple[str, FrozenSet[str]], second: Tuple[str, FrozenSet[str]]) -> float:
+    """
+    Overlap coefficient of two fingerprints' tokens
+    
+    The coefficient is relative to the smaller set, so a terse static finding
+    still matches a wordier LLM description of the same bug.
+    """
+    first_tokens, second_tokens = first[1], second[1]
+    if not first_tokens or not second_tokens:
+        return 0.0
+    return len(first_tokens & second_tokens) / min(len(first_tokens), len(second_tokens))
+
+
+def _types_compatible(first: str, second: str) -> bool:
+    return first == second or first in GENERIC_TYPES or second in GENERIC_TYPES
+
+
+def _interval(issue: Dict[str, Any]) -> Tuple[int, int]:
+    start = issue.get("line_start") or 1
+    end = issue.get("line_end") or start
+    return start, max(start, end)
+
+
+class _Group:
+    """Issues merged so far and the union of their line ranges"""
+    
+    def __init__(self, index: int, interval: Tuple[int, int]):
+        self.members = [index]
+        self.start, self.end = interval
+
+
+def _merge_group(issues: List[Dict[str, Any]], members: List[int]) -> Dict[str, Any]:
+    """
+    Merge a group of issues into one
+    
+    The first reported issue provides the message and type, the narrowest
+    line range is kept, severity is the highest reported and confidences
+    are combined as independent evidence.
+    """
+    merged = dict(issues[members[0]])
+    if len(members) == 1:
+        return merged
+    
+    group = [issues[index] for index in members]
+    narrowest = min(group, key=lambda issue: _interval(issue)[1] - _interval(issue)[0])
+    for field in ("line_start", "line_end", "column_start", "column_end"):
+        if field in narrowest:
+            merged[field] = narrowest[field]
+    
+    merged["severity"] = min(
+        (issue.get("severity", "info") for issue in group),
+        key=lambda severity: SEVERITY_ORDER.get(severity, len(SEVERITY_ORDER))
+    )
+    
+    confidences = [issue["confidence"] for issue in group if issue.get("confidence") is not None]
+    if confidences:
+        doubt = 1.0
+        for confidence in confidences:
+            doubt *= 1.0 - min(max(confidence, 0.0), 1.0)
+        merged["confidence"] = round(1.0 - doubt, 4)
+    
+    return merged
+
+
+def merge_issues(issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge issues that describe the same problem
+    
+    Issues are merged when their line ranges overlap (directly or through
+    other merged issues) and their fingerprints are similar: a token overlap
+    of at least SIMILARITY_THRESHOLD for compatible types, or
+    CROSS_TYPE_SIMILARITY_THRESHOLD otherwise. Identical messages on
+    different lines (an unused variable in two functions) stay separate.
+    
+    Args:
+        issues: Issue dicts in the order they were reported
+    
+    Returns:
+        One merged issue per group, in order of each group's first report
+    """
+    fingerprints = [issue_fingerprint(issue) for issue in issues]
+    intervals = [_interval(issue) for issue in issues]
+    
+    groups: List[_Group] = []
+    # Groups whose range reaches the current line; ends are kept in a heap so closed groups drop out
+    open_groups = set()
+    ends: List[Tuple[int, int]] = []
+    
+    for index in sorted(range(len(issues)), key=lambda i: (intervals[i][0], i)):
+        start, end = intervals[index]
+        while ends and ends[0][0] < start:
+            _, group_index = heapq.heappop(ends)
+            # Entries are stale when the group has grown since they were pushed
+            if groups[group_index].end < start:
+                open_groups.discard(group_index)
+        
+        best: Optional[int] = None
+        best_score = 0.0
+        for group_index in open_groups:
+            for member in groups[group_index].members:
+                same_type = _types_compatible(fingerprints[index][0], fingerprints[member][0])
+                score = similarity(fingerprints[index], fingerprints[member])
+                threshold = SIMILARITY_THRESHOLD if same_type else CROSS_TYPE_SIMILARITY_THRESHOLD
+                if score >= threshold and (score > best_score or (score == best_score and group_index < best)):
+                    best, best_score = group_index, score
+        
+        if best is None:
+            groups.append(_Group(index, (start, end)))
+            best = len(groups) - 1
+            open_groups.add(best)
+        else:
+            group = groups[best]
+            group.members.append(index)
+            if end <= group.end:
+                continue
+            group.end = end
+        heapq.heappush(ends, (groups[best].end, best))
+    
+    merged_groups = sorted(groups, key=lambda group: min(group.members))
+    return [_merge_group(issues, sorted(group.members)) for group in merged_groups]
@@ -1,6 +1,8 @@
 from typing import Dict, List, Any
 
 from app.models.schemas.analysis import CodeIssue
+from app.utils.parsing.parse_cache import parse_cache
+from app.utils.parsing.parsed_module import ParsedModule
 
 
 class BaseParser:
@@ -11,13 +13,36 @@ class BaseParser:
     default implementations for common methods.
     """
     
+    language = "text"
+    
+    def parse_module(self, code: str) -> ParsedModule:
+        """
+        Parse code once into an immutable module, through the shared parse cache
+        
+        Args:
+            code: Source code to parse
+        
+        Returns:
+            The parsed module, shared with every other consumer of the same code
+        """
+        return parse_cache.get_or_parse(self.language, code, self._parse_module)
+    
+    def _parse_module(self, code: str) -> ParsedModule:
+        """
+        Parse code into a module without the cache
+        
+        Parsers that build the module in a single pass override this; the
+        default wraps the result of parse().
+        """
+        return ParsedModule.from_dict(self.language, self.parse(code))
+    
     def parse(self, code: str) -> Dict[str, Any]:
         """
         Parse code and extract structure information
         
         Args:
             code: Source code to parse
-            
+        
         Returns:
             Dictionary with parsed information
         """
@@ -34,7 +59,7 @@ class BaseParser:
         
         Args:
             code: Source code to analyze
-            
+        
         Returns:
             List of dictionaries with function information
         """
@@ -47,7 +72,7 @@ class BaseParser:
         
         Args:
             code: Source code to analyze
-            
+        
         Returns:
             List of dictionaries with class information
         """
@@ -60,7 +85,7 @@ class BaseParser:
         
         Args:
             code: Source code to analyze
-            
+        
         Returns:
             List of import statements
         """
@@ -73,7 +98,7 @@ class BaseParser:
         
         Args:
             code: Source code to preprocess
-            
+        
         Returns:
             Preprocessed code
         """
@@ -94,20 +119,20 @@ class BaseParser:
         
         Args:
             fixed_code: Generated fixed code
-            
+        
         Returns:
             Processed fixed code
         """
         # Base implementation returns code unchanged
         return fixed_code
-
+    
     def get_syntax_issues(self, parsed_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extract syntax issues from parsed data
         
         Args:
             parsed_data: Dictionary with parsed information from parse() method
-            
+        
         Returns:
             List of syntax issues found in the code
         """
@@ -0,0 +1,169 @@
+import math
+from typing import List, Optional, Set, Tuple
+
+from app.utils.parsing.parsed_module import ParsedModule
+from app.utils.parsing.parser_factory import get_parser_for_language
+
+# Rough average for source code; matches the estimate used by the LLM governor
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in a piece of text
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class CodeChunk:
+    """
+    A contiguous range of source lines analyzed on its own
+    """
+    
+    def __init__(self, start_line: int, lines: List[str]):
+        self.start_line = start_line
+        self.lines = lines
+    
+    @property
+    def end_line(self) -> int:
+        return self.start_line + len(self.lines) - 1
+    
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+    
+    def to_file_line(self, chunk_line: int) -> int:
+        """
+        Map a 1-based line number within the chunk to a line number in the full file
+        """
+        chunk_line = min(max(chunk_line, 1), len(self.lines))
+        return self.start_line + chunk_line - 1
+    
+    def __repr__(self) -> str:
+        return f"CodeChunk(lines {self.start_line}-{self.end_line})"
+
+
+def _definition_boundaries(lines: List[str], module: ParsedModule) -> Set[int]:
+    """
+    Find 1-based lines where a top-level function or class starts
+    
+    Boundaries come from the parsed module; decorators directly above a
+    definition are kept with it.
+    """
+    boundaries = set()
+    for definition in module.definitions:
+        line = definition.line
+        if not line or line > len(lines):
+            continue
+        
+        # Only split at top-level definitions so methods stay with their class
+        text = lines[line - 1]
+        if text[:1].isspace():
+            continue
+        
+        while line > 1 and lines[line - 2].startswith("@"):
+            line -= 1
+        boundaries.add(line)
+    
+    return boundaries
+
+
+def top_level_blocks(lines: List[str], module: ParsedModule) -> List[Tuple[int, int]]:
+    """
+    Split lines into top-level blocks as inclusive (start, end) line ranges
+    
+    Each top-level function or class (with its decorators) starts a block that
+    runs up to the next one; code before the first definition is a block of
+    its own.
+    """
+    starts = sorted(_definition_boundaries(lines, module) | {1})
+    return [
+        (start, (starts[i + 1] - 1) if i + 1 < len(starts) else len(lines))
+        for i, start in enumerate(starts)
+    ]
+
+
+def pack_blocks(lines: List[str], blocks: List[Tuple[int, int]], max_tokens: int) -> List[CodeChunk]:
+    """
+    Pack line blocks into chunks of at most max_tokens
+    
+    Blocks are packed together while they are adjacent and within the budget.
+    A single block larger than the budget is split at line boundaries.
+    
+    Args:
+        lines: Lines of the full file
+        blocks: Inclusive (start, end) line ranges in file order
+        max_tokens: Token budget per chunk
+    
+    Returns:
+        Chunks covering every line of the blocks, in order
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[CodeChunk] = []
+    current: List[str] = []
+    current_start = 1
+    current_chars = 0
+    
+    def flush():
+        nonlocal current, current_chars
+        if current:
+            chunks.append(CodeChunk(current_start, current))
+        current, current_chars = [], 0
+    
+    for block_start, block_end in blocks:
+        block = lines[block_start - 1:block_end]
+        block_chars = sum(len(line) + 1 for line in block)
+        
+        if current and (current_chars + block_chars > max_chars or block_start != current_start + len(current)):
+            flush()
+        
+        if not current:
+            current_start = block_start
+        
+        if block_chars <= max_chars:
+            current.extend(block)
+            current_chars += block_chars
+            continue
+        
+        # Oversized block: fall back to splitting by lines
+        for offset, line in enumerate(block):
+            if current and current_chars + len(line) + 1 > max_chars:
+                flush()
+                current_start = block_start + offset
+            current.append(line)
+            current_chars += len(line) + 1
+    
+    flush()
+    return chunks
+
+
+def chunk_code(code: str, language: str, max_tokens: int, module: Optional[ParsedModule] = None) -> List[CodeChunk]:
+    """
+    Split code into chunks of at most max_tokens along function and class boundaries
+    
+    Consecutive top-level blocks are packed together until the budget is reached.
+    A single block larger than the budget is split at line boundaries.
+    
+    Args:
+        code: Source code to split
+        language: The programming language of the code
+        max_tokens: Token budget per chunk
+        module: The code already parsed by the caller (parsed here if omitted)
+    
+    Returns:
+        Chunks covering every line of the code, in order
+    """
+    lines = code.split("\n")
+    if estimate_tokens(code) <= max_tokens:
+        return [CodeChunk(1, lines)]
+    
+    if module is None:
+        module = get_parser_for_language(language).parse_module(code)
+    
+    return pack_blocks(lines, top_level_blocks(lines, module), max_tokens)
@@ -0,0 +1,63 @@
+"""
+Top-level fragments of a source file.
+
+A fragment is a top-level function or class (with its decorators), or a run
+of module-level code between them. Fragments are fingerprinted by content so
+that analysis results can be reused for the parts of a file that did not
+change between submissions, wherever they moved to.
+"""
+import hashlib
+from typing import List
+
+from app.utils.parsing.chunking import top_level_blocks
+from app.utils.parsing.parsed_module import ParsedModule
+
+
+class Fragment:
+    """
+    A top-level block of a file and the fingerprint of its content
+    """
+    
+    def __init__(self, start_line: int, lines: List[str]):
+        self.start_line = start_line
+        self.lines = lines
+        # Trailing blank lines only separate blocks, so they do not change the fingerprint
+        self.fingerprint = hashlib.sha256("\n".join(lines).rstrip().encode("utf-8")).hexdigest()
+    
+    @property
+    def end_line(self) -> int:
+        return self.start_line + len(self.lines) - 1
+    
+    def to_file_line(self, fragment_line: int) -> int:
+        """
+        Map a 1-based line number within the fragment to a line number in the full file
+        """
+        fragment_line = min(max(fragment_line, 1), len(self.lines))
+        return self.start_line + fragment_line - 1
+    
+    def to_fragment_line(self, file_line: int) -> int:
+        """
+        Map a line number in the full file to a 1-based line number within the fragment
+        """
+        return min(max(file_line - self.start_line + 1, 1), len(self.lines))
+    
+    def __repr__(self) -> str:
+        return f"Fragment(lines {self.start_line}-{self.end_line}, {self.fingerprint[:12]})"
+
+
+def split_fragments(code: str, module: ParsedModule) -> List[Fragment]:
+    """
+    Split code into top-level fragments
+    
+    Args:
+        code: Source code to split
+        module: The parsed code
+    
+    Returns:
+        Fragments covering every line of the code, in order
+    """
+    lines = code.split("\n")
+    return [
+        Fragment(start, lines[start - 1:end])
+        for start, end in top_level_blocks(lines, module)
+    ]
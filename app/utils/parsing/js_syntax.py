@@ -0,0 +1,680 @@
+"""
+Tokenizer and structural parser for JavaScript.
+
+The tokenizer makes a single scan over the source. It understands comments,
+strings, template literals (including nested substitutions) and regular
+expression literals, so nothing inside them is mistaken for code. The
+structural parser then makes linear passes over the tokens:
+- one pairs brackets;
+- one checks the shape of function and class headings;
+- one extracts functions, classes, methods and imports.
+
+Syntax errors are reported with their line and column. Only errors visible
+at this level are detected: unterminated strings, comments, templates and
+regular expressions, unbalanced brackets, and malformed function and class
+headings. Expressions are not parsed.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.parsing.source_index import LineIndex
+
+# Token kinds
+NAME = "name"
+NUMBER = "number"
+STRING = "string"
+TEMPLATE = "template"
+REGEX = "regex"
+PUNCT = "punct"
+
+OPENING = {"(": ")", "[": "]", "{": "}"}
+CLOSING = {")": "(", "]": "[", "}": "{"}
+
+KEYWORDS = {
+    "break", "case", "catch", "class", "const", "continue", "debugger", "default", "delete",
+    "do", "else", "export", "extends", "finally", "for", "function", "if", "import", "in",
+    "instanceof", "let", "new", "return", "super", "switch", "this", "throw", "try", "typeof",
+    "var", "void", "while", "with", "yield", "await"
+}
+
+# After these a "/" starts a regular expression rather than a division
+_REGEX_AFTER_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case",
+    "do", "else", "yield", "await"
+}
+_DIVISION_AFTER_PUNCT = {")", "]", "}"}
+_INCREMENT = {"++", "--"}
+
+# Tokens that can precede the name of an object or class method
+_MEMBER_PREFIX = {"{", ",", ";", "}", "static", "async", "get", "set", "*"}
+
+_STRING = {
+    '"': re.compile(r'"(?:[^"\\\n]|\\.|\\\n)*"'),
+    "'": re.compile(r"'(?:[^'\\\n]|\\.|\\\n)*'"),
+}
+_TEMPLATE_CHARS = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.S)
+_REGEX = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# One alternation for everything that can start a token; strings, template
+# literals and regular expressions are then scanned on their own. An
+# unterminated block comment matches as a bare "/*".
+_TOKEN = re.compile(
+    r"(?P<space>\s+)"
+    r"|(?P<comment>//[^\n]*|/\*.*?\*/|/\*)"
+    r"|(?P<name>(?:[^\W\d]|\$)[\w$]*)"
+    r"|(?P<number>0[xX][0-9a-fA-F_]+n?|0[bB][01_]+n?|0[oO][0-7_]+n?"
+    r"|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?)"
+    r"|(?P<punct>>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|&&=|\|\|=|\?\?="
+    r"|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|\*\*|<<|>>"
+    r"|[{}()\[\];,<>+\-*/%&|^!~?:=.@#'\"`])",
+    re.S
+)
+
+
+class JSSyntaxError(Exception):
+    """
+    A syntax error found while scanning or parsing JavaScript
+    """
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": "SyntaxError",
+            "message": f"{self.message} (line {self.line}, column {self.column})",
+            "line": self.line,
+            "column": self.column
+        }
+
+
+class Token:
+    """
+    A token with its [start, end) character offsets in the source
+    """
+    __slots__ = ("kind", "value", "start", "end")
+    
+    def __init__(self, kind: str, value: str, start: int, end: int):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+    
+    def is_punct(self, value: str) -> bool:
+        return self.kind == PUNCT and self.value == value
+    
+    def is_name(self, value: Optional[str] = None) -> bool:
+        return self.kind == NAME and (value is None or self.value == value)
+    
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.value!r}, {self.start})"
+
+
+def _ends_operand(token: Token) -> bool:
+    """Whether a token can be the last token of an operand."""
+    if token.kind == NAME:
+        return token.value not in KEYWORDS
+    if token.kind == TEMPLATE:
+        return not token.value.endswith("${")
+    if token.kind == PUNCT:
+        return token.value in _DIVISION_AFTER_PUNCT
+    return True
+
+
+class Tokenizer:
+    """
+    Single-scan JavaScript tokenizer that recovers from errors
+    
+    The first error is kept in error; scanning continues past it (an
+    unterminated string ends at the end of its line) so structure can still be
+    extracted from code that does not parse.
+    """
+    
+    def __init__(self, code: str, index: Optional[LineIndex] = None):
+        self.code = code
+        self.index = index or LineIndex(code)
+        self.tokens: List[Token] = []
+        self.error: Optional[JSSyntaxError] = None
+        # "{" for a block or object, "${" for a template substitution
+        self._braces: List[str] = []
+    
+    def fail(self, message: str, offset: int):
+        """Record an error at a character offset, keeping only the first one."""
+        if self.error is None:
+            line, column = self.index.position(offset)
+            self.error = JSSyntaxError(message, line, column)
+    
+    def tokenize(self) -> List[Token]:
+        code = self.code
+        length = len(code)
+        tokens = self.tokens
+        position = 0
+        
+        # A hashbang line is only allowed at the very start
+        if code.startswith("#!"):
+            position = code.find("\n")
+            position = length if position == -1 else position
+        
+        while position < length:
+            match = _TOKEN.match(code, position)
+            if match is None:
+                self.fail(f"Invalid or unexpected token '{code[position]}'", position)
+                position += 1
+                continue
+            
+            kind = match.lastgroup
+            value = match.group()
+            
+            if kind == "space":
+                position = match.end()
+            elif kind == NAME or kind == NUMBER:
+                tokens.append(Token(kind, value, position, match.end()))
+                position = match.end()
+            elif kind == "comment":
+                if value == "/*":
+                    self.fail("Unterminated comment", position)
+                    break
+                position = match.end()
+            elif value == "/" or value == "/=":
+                if self._regex_allowed():
+                    position = self._scan_regex(position)
+                else:
+                    tokens.append(Token(PUNCT, value, position, match.end()))
+                    position = match.end()
+            elif value in _STRING:
+                position = self._scan_string(position, value)
+            elif value == "`":
+                position = self._scan_template(position + 1, position)
+            elif value == "}" and self._braces and self._braces[-1] == "${":
+                # End of a template substitution: the template continues
+                self._braces.pop()
+                position = self._scan_template(position + 1, position)
+            else:
+                if value == "{":
+                    self._braces.append("{")
+                elif value == "}" and self._braces:
+                    self._braces.pop()
+                tokens.append(Token(PUNCT, value, position, match.end()))
+                position = match.end()
+        
+        return tokens
+    
+    def _regex_allowed(self) -> bool:
+        """Decide whether a "/" starts a regular expression from the previous token."""
+        if not self.tokens:
+            return True
+        previous = self.tokens[-1]
+        if previous.kind == NAME:
+            return previous.value in _REGEX_AFTER_KEYWORDS
+        if previous.kind == TEMPLATE:
+            # Start of a template substitution
+            return previous.value.endswith("${")
+        if previous.kind == PUNCT:
+            if previous.value in _INCREMENT:
+                # A postfix increment ends an operand ("a++ / 2"); a prefix one starts it
+                return len(self.tokens) < 2 or not _ends_operand(self.tokens[-2])
+            return previous.value not in _DIVISION_AFTER_PUNCT
+        return False
+    
+    def _scan_regex(self, position: int) -> int:
+        match = _REGEX.match(self.code, position)
+        if not match:
+            self.fail("Invalid regular expression: missing /", position)
+            end = self.code.find("\n", position)
+            return len(self.code) if end == -1 else end
+        
+        self.tokens.append(Token(REGEX, match.group(), position, match.end()))
+        return match.end()
+    
+    def _scan_string(self, position: int, quote: str) -> int:
+        match = _STRING[quote].match(self.code, position)
+        if match:
+            self.tokens.append(Token(STRING, match.group(), position, match.end()))
+            return match.end()
+        
+        self.fail("Unterminated string constant", position)
+        end = self.code.find("\n", position)
+        end = len(self.code) if end == -1 else end
+        self.tokens.append(Token(STRING, self.code[position:end], position, end))
+        return end
+    
+    def _scan_template(self, position: int, start: int) -> int:
+        """Scan template characters up to the closing backtick or the next substitution."""
+        end = _TEMPLATE_CHARS.match(self.code, position).end()
+        
+        if self.code.startswith("`", end):
+            self.tokens.append(Token(TEMPLATE, self.code[start:end + 1], start, end + 1))
+            return end + 1
+        
+        if self.code.startswith("${", end):
+            self._braces.append("${")
+            self.tokens.append(Token(TEMPLATE, self.code[start:end + 2], start, end + 2))
+            return end + 2
+        
+        self.fail("Unterminated template literal", start)
+        return len(self.code)
+
+
+class StructureParser:
+    """
+    Pairs brackets and extracts functions, classes and imports from tokens
+    """
+    
+    def __init__(self, code: str, tokens: List[Token], index: LineIndex):
+        self.code = code
+        self.tokens = tokens
+        self.index = index
+        self.error: Optional[JSSyntaxError] = None
+        # Token index of every opening bracket mapped to its closing bracket, and back
+        self.pairs: Dict[int, int] = {}
+    
+    def fail(self, message: str, offset: int):
+        """Record an error at a character offset, keeping only the first one."""
+        if self.error is None:
+            line, column = self.index.position(offset)
+            self.error = JSSyntaxError(message, line, column)
+    
+    def line_of(self, token: Token) -> int:
+        return self.index.line_of(token.start)
+    
+    def _token(self, position: int) -> Optional[Token]:
+        return self.tokens[position] if 0 <= position < len(self.tokens) else None
+    
+    def _text(self, first: int, last: int) -> str:
+        """Source text from token first to token last, inclusive."""
+        return self.code[self.tokens[first].start:self.tokens[last].end]
+    
+    def match_brackets(self):
+        """Pair brackets and report the first one that is unexpected or never closed."""
+        stack: List[int] = []
+        
+        for position, token in enumerate(self.tokens):
+            if token.kind != PUNCT:
+                continue
+            
+            if token.value in OPENING:
+                stack.append(position)
+            elif token.value in CLOSING:
+                if not stack:
+                    self.fail(f"Unexpected token '{token.value}'", token.start)
+                    continue
+                
+                opener = self.tokens[stack[-1]]
+                if opener.value != CLOSING[token.value]:
+                    line, column = self.index.position(opener.start)
+                    self.fail(
+                        f"Unexpected token '{token.value}': '{opener.value}' opened at line {line}, column {column} is not closed",
+                        token.start
+                    )
+                    continue
+                
+                opened = stack.pop()
+                self.pairs[opened] = position
+                self.pairs[position] = opened
+        
+        if stack:
+            opener = self.tokens[stack[-1]]
+            self.fail(f"Unexpected end of input: '{opener.value}' is never closed", opener.start)
+    
+    def split_params(self, open_paren: int) -> List[str]:
+        """Get the parameters between a "(" and its matching ")" as source text."""
+        close = self.pairs.get(open_paren)
+        if close is None or close == open_paren + 1:
+            return []
+        
+        params = []
+        first = open_paren + 1
+        position = first
+        while position < close:
+            token = self.tokens[position]
+            if token.kind == PUNCT and token.value in OPENING and position in self.pairs:
+                position = self.pairs[position] + 1
+                continue
+            if token.is_punct(","):
+                if position > first:
+                    params.append(self._text(first, position - 1))
+                first = position + 1
+            position += 1
+        
+        if first < close:
+            params.append(self._text(first, close - 1))
+        return params
+    
+    def _end_line(self, open_brace: Optional[int]) -> Optional[int]:
+        close = self.pairs.get(open_brace) if open_brace is not None else None
+        return self.line_of(self.tokens[close]) if close is not None else None
+    
+    def extract(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[str]]:
+        """Extract functions, classes and imports in one pass over the tokens."""
+        functions: List[Dict[str, Any]] = []
+        classes: List[Dict[str, Any]] = []
+        imports: List[str] = []
+        # Token indexes of the brackets enclosing the current token
+        enclosing: List[int] = []
+        # Class records by the token index of their body's "{"
+        class_bodies: Dict[int, Dict[str, Any]] = {}
+        tokens = self.tokens
+        
+        for position, token in enumerate(tokens):
+            if token.kind == PUNCT:
+                if token.value in OPENING:
+                    enclosing.append(position)
+                elif token.value in CLOSING and enclosing and self.pairs.get(position) == enclosing[-1]:
+                    enclosing.pop()
+                elif token.value == "=>":
+                    arrow = self._arrow_function(position, enclosing)
+                    if arrow:
+                        functions.append(arrow)
+                continue
+            
+            if token.kind != NAME:
+                continue
+            
+            previous = self._token(position - 1)
+            # Names after "." are properties, never keywords
+            if previous is not None and (previous.is_punct(".") or previous.is_punct("?.")):
+                continue
+            
+            if token.value == "function":
+                function = self._function(position, enclosing)
+                if function:
+                    functions.append(function)
+            elif token.value == "class":
+                body = self._class_body(position)
+                cls = self._class(position, body, enclosing) if body is not None else None
+                if cls:
+                    classes.append(cls)
+                    class_bodies[body] = cls
+            elif token.value == "import" and not enclosing:
+                statement = self._import(position)
+                if statement:
+                    imports.append(statement)
+            elif token.value == "require":
+                statement = self._require(position)
+                if statement:
+                    imports.append(statement)
+            else:
+                method = self._method(position, enclosing, class_bodies)
+                if method:
+                    functions.append(method)
+        
+        return functions, classes, imports
+    
+    def check_headings(self):
+        """Report function and class headings that cannot be valid."""
+        tokens = self.tokens
+        for position, token in enumerate(tokens):
+            if token.kind != NAME or token.value not in ("function", "class"):
+                continue
+            previous = self._token(position - 1)
+            following = self._token(position + 1)
+            # Property names (obj.class, { function: 1 }) are not headings
+            if previous is not None and (previous.is_punct(".") or previous.is_punct("?.")):
+                continue
+            if following is not None and following.is_punct(":"):
+                continue
+            
+            if token.value == "function":
+                following = position + 1
+                if self._token(following) is not None and self._token(following).is_punct("*"):
+                    following += 1
+                name = self._token(following)
+                if name is not None and name.kind == NAME:
+                    following += 1
+                paren = self._token(following)
+                if paren is None or not paren.is_punct("("):
+                    offset = paren.start if paren is not None else len(self.code)
+                    self.fail("Unexpected token: expected '(' after function name", offset)
+            else:
+                body = self._class_body(position)
+                if body is None:
+                    following = self._token(position + 1)
+                    offset = following.start if following is not None else len(self.code)
+                    self.fail("Unexpected token: expected '{' to start the class body", offset)
+    
+    def _declared_name(self, position: int) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Get the name a value starting at position is assigned to
+        
+        Returns:
+            The name and the token index where the declaration starts (the
+            const/let/var keyword if any), or (None, None)
+        """
+        equals = self._token(position - 1)
+        name = self._token(position - 2)
+        if equals is None or name is None or name.kind != NAME:
+            return None, None
+        if not (equals.is_punct("=") or equals.is_punct(":")):
+            return None, None
+        
+        keyword = self._token(position - 3)
+        if keyword is not None and keyword.value in ("const", "let", "var") and keyword.kind == NAME:
+            return name.value, position - 3
+        return name.value, position - 2
+    
+    def _function(self, position: int, enclosing: List[int]) -> Optional[Dict[str, Any]]:
+        following = position + 1
+        generator = self._token(following)
+        if generator is not None and generator.is_punct("*"):
+            following += 1
+        
+        name_token = self._token(following)
+        if name_token is not None and name_token.kind == NAME:
+            name = name_token.value
+            following += 1
+        else:
+            # Function expression: use the name it is assigned to
+            start = position - 1 if self._token(position - 1) is not None and self._token(position - 1).is_name("async") else position
+            name, _ = self._declared_name(start)
+        
+        paren = self._token(following)
+        if not name or paren is None or not paren.is_punct("("):
+            return None
+        
+        close = self.pairs.get(following)
+        body = close + 1 if close is not None else None
+        body_token = self._token(body) if body is not None else None
+        return {
+            "name": name,
+            "line": self.line_of(self.tokens[position]),
+            "end_line": self._end_line(body if body_token is not None and body_token.is_punct("{") else None),
+            "args": self.split_params(following),
+            "type": "function",
+            "top_level": not enclosing
+        }
+    
+    def _arrow_function(self, position: int, enclosing: List[int]) -> Optional[Dict[str, Any]]:
+        params_end = self._token(position - 1)
+        if params_end is None:
+            return None
+        
+        if params_end.is_punct(")"):
+            params_start = self.pairs.get(position - 1)
+            if params_start is None:
+                return None
+            args = self.split_params(params_start)
+        elif params_end.kind == NAME:
+            params_start = position - 1
+            args = [params_end.value]
+        else:
+            return None
+        
+        head = params_start
+        if self._token(head - 1) is not None and self._token(head - 1).is_name("async"):
+            head -= 1
+        
+        name, declaration = self._declared_name(head)
+        # Only const/let/var declarations are reported, as by the regex parser
+        if not name or self.tokens[declaration].value not in ("const", "let", "var"):
+            return None
+        
+        body = self._token(position + 1)
+        return {
+            "name": name,
+            "line": self.line_of(self.tokens[declaration]),
+            "end_line": self._end_line(position + 1) if body is not None and body.is_punct("{") else self.line_of(self.tokens[position]),
+            "args": args,
+            "type": "arrow",
+            "top_level": len(enclosing) == 0
+        }
+    
+    def _class_body(self, position: int) -> Optional[int]:
+        """Get the token index of a class's body "{", skipping its name and heritage."""
+        following = position + 1
+        name = self._token(following)
+        if name is not None and name.kind == NAME and name.value != "extends":
+            following += 1
+        
+        heritage = self._token(following)
+        if heritage is not None and heritage.is_name("extends"):
+            following += 1
+            # The superclass is an expression; skip to the "{" that starts the body
+            while following < len(self.tokens):
+                token = self.tokens[following]
+                if token.is_punct("{"):
+                    break
+                if token.kind == PUNCT and token.value in ("(", "[") and following in self.pairs:
+                    following = self.pairs[following]
+                following += 1
+        
+        body = self._token(following)
+        return following if body is not None and body.is_punct("{") else None
+    
+    def _class(self, position: int, body: int, enclosing: List[int]) -> Optional[Dict[str, Any]]:
+        name_token = self._token(position + 1)
+        if name_token is not None and name_token.kind == NAME and name_token.value != "extends":
+            name = name_token.value
+        else:
+            name, _ = self._declared_name(position)
+        if not name:
+            return None
+        
+        parent = None
+        for heritage in range(position + 1, body):
+            if self.tokens[heritage].is_name("extends") and heritage + 1 < body:
+                parent = self._text(heritage + 1, body - 1)
+                break
+        
+        return {
+            "name": name,
+            "line": self.line_of(self.tokens[position]),
+            "end_line": self._end_line(body),
+            "parent": parent,
+            "methods": [],
+            "top_level": not enclosing
+        }
+    
+    def _method(
+        self,
+        position: int,
+        enclosing: List[int],
+        class_bodies: Dict[int, Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Recognize `name(params) {` at the start of a class or object member."""
+        token = self.tokens[position]
+        paren = self._token(position + 1)
+        if paren is None or not paren.is_punct("(") or token.value in KEYWORDS:
+            return None
+        if not enclosing or not self.tokens[enclosing[-1]].is_punct("{"):
+            return None
+        
+        previous = self._token(position - 1)
+        if previous is None or previous.value not in _MEMBER_PREFIX:
+            return None
+        
+        close = self.pairs.get(position + 1)
+        body = self._token(close + 1) if close is not None else None
+        if body is None or not body.is_punct("{"):
+            return None
+        
+        owner = class_bodies.get(enclosing[-1])
+        if owner is not None:
+            owner["methods"].append(token.value)
+        
+        method = {
+            "name": token.value,
+            "line": self.line_of(token),
+            "end_line": self._end_line(close + 1),
+            "args": self.split_params(position + 1),
+            "type": "method",
+            "top_level": False
+        }
+        if owner is not None:
+            method["class"] = owner["name"]
+        return method
+    
+    def _import(self, position: int) -> Optional[str]:
+        """Get an import statement's text up to and including its module string."""
+        following = self._token(position + 1)
+        # import(...) and import.meta are expressions
+        if following is None or following.is_punct("(") or following.is_punct("."):
+            return None
+        
+        for end in range(position + 1, len(self.tokens)):
+            token = self.tokens[end]
+            if token.kind == STRING:
+                return self._text(position, end)
+            if token.is_punct(";"):
+                return None
+        return None
+    
+    def _require(self, position: int) -> Optional[str]:
+        """Get `require("module")`, including the declaration it is assigned in."""
+        paren = self._token(position + 1)
+        module = self._token(position + 2)
+        close = self._token(position + 3)
+        if paren is None or not paren.is_punct("(") or module is None or module.kind != STRING:
+            return None
+        if close is None or not close.is_punct(")"):
+            return None
+        
+        start = position
+        # const x = require(...) / const { a, b } = require(...)
+        equals = self._token(position - 1)
+        if equals is not None and equals.is_punct("="):
+            target = position - 2
+            target_token = self._token(target)
+            if target_token is not None and target_token.is_punct("}") and target in self.pairs:
+                target = self.pairs[target]
+            keyword = self._token(target - 1)
+            if keyword is not None and keyword.kind == NAME and keyword.value in ("const", "let", "var"):
+                start = target - 1
+        return self._text(start, position + 3)
+
+
+def parse_javascript(code: str, index: Optional[LineIndex] = None) -> Dict[str, Any]:
+    """
+    Tokenize and parse JavaScript
+    
+    Args:
+        code: JavaScript source code
+        index: Line index of the code (built here if omitted)
+    
+    Returns:
+        Dictionary with "functions", "classes" and "imports", plus "error"
+        when the code has a syntax error (the first one found)
+    """
+    index = index or LineIndex(code)
+    tokenizer = Tokenizer(code, index)
+    tokens = tokenizer.tokenize()
+    
+    parser = StructureParser(code, tokens, index)
+    parser.match_brackets()
+    parser.check_headings()
+    functions, classes, imports = parser.extract()
+    
+    result: Dict[str, Any] = {
+        "functions": functions,
+        "classes": classes,
+        "imports": imports
+    }
+    
+    # Report whichever error comes first in the source
+    errors = [error for error in (tokenizer.error, parser.error) if error is not None]
+    if errors:
+        first = min(errors, key=lambda error: (error.line, error.column))
+        result["error"] = first.to_dict()
+    
+    return result
@@ -0,0 +1,95 @@
+"""
+Content-addressed cache of parsed modules.
+
+Parsed modules are immutable, so one parse of a piece of code can be shared by
+every consumer in a session: the analyzer's static stage, LLM chunking, the
+analysis service and fix validation. Entries are keyed by language and the
+SHA-256 of the code and evicted in LRU order.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.utils.parsing.parsed_module import ParsedModule
+
+
+def parse_cache_key(language: str, code: str) -> Tuple[str, str]:
+    """Build the cache key for a piece of code."""
+    return language, hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    LRU cache of parsed modules keyed by (language, sha256(code))
+    
+    Parsing runs in worker threads (the analyzer parses off the event loop),
+    so access to the LRU is locked; two threads missing on the same code at
+    once may both parse it.
+    """
+    
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], ParsedModule]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+    
+    def get_or_parse(self, language: str, code: str, parse: Callable[[str], ParsedModule]) -> ParsedModule:
+        """
+        Get the parsed module for code, parsing it on a miss
+        
+        Args:
+            language: Language the code is parsed as
+            code: Source code
+            parse: Parses the code when it is not cached
+        
+        Returns:
+            The parsed module (shared; it must not be modified)
+        """
+        if self.max_entries <= 0:
+            return parse(code)
+        
+        key = parse_cache_key(language, code)
+        with self._lock:
+            module = self._entries.get(key)
+            if module is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return module
+            self.stats["misses"] += 1
+        
+        module = parse(code)
+        
+        with self._lock:
+            self._entries[key] = module
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        
+        return module
+    
+    def clear(self):
+        """Drop every cached module."""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and the current size."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+# Create a global instance of the parse cache
+parse_cache = ParseCache(max_entries=settings.PARSE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,211 @@
+"""
+Immutable results of parsing a module.
+
+A parser produces one ParsedModule per piece of code; the analyzer, the
+analysis service, chunking and fix validation all read from it instead of
+re-parsing the code for each piece of structure they need.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _Frozen:
+    """
+    Base for objects whose attributes are set once in __init__
+    """
+    __slots__ = ()
+    
+    def _init(self, **values: Any):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class Definition(_Frozen):
+    """
+    A function or class found in a module
+    
+    Lines are 1-based; line is the line of the def/class keyword and
+    end_line the last line of its body (None when the parser cannot tell).
+    """
+    __slots__ = (
+        "kind", "name", "line", "end_line", "args", "decorators", "methods",
+        "bases", "docstring", "is_async", "top_level", "parent"
+    )
+    
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        line: int,
+        end_line: Optional[int] = None,
+        args: Iterable[str] = (),
+        decorators: Iterable[str] = (),
+        methods: Iterable[str] = (),
+        bases: Iterable[str] = (),
+        docstring: Optional[str] = None,
+        is_async: bool = False,
+        top_level: bool = True,
+        parent: Optional[str] = None
+    ):
+        self._init(
+            kind=kind,
+            name=name,
+            line=line,
+            end_line=end_line,
+            args=tuple(args),
+            decorators=tuple(decorators),
+            methods=tuple(methods),
+            bases=tuple(bases),
+            docstring=docstring,
+            is_async=is_async,
+            top_level=top_level,
+            parent=parent
+        )
+    
+    @property
+    def span(self) -> Tuple[int, int]:
+        """First and last line of the definition."""
+        return self.line, self.end_line if self.end_line is not None else self.line
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary format returned by the parsers' extract_* methods."""
+        if self.kind == "class":
+            return {
+                "name": self.name,
+                "line": self.line,
+                "methods": list(self.methods),
+                "bases": list(self.bases)
+            }
+        return {
+            "name": self.name,
+            "line": self.line,
+            "args": list(self.args),
+            "decorators": list(self.decorators)
+        }
+    
+    @classmethod
+    def from_dict(cls, kind: str, data: Dict[str, Any]) -> "Definition":
+        """Build a definition from a parser's extract_* dictionary."""
+        return cls(
+            kind=kind,
+            name=data.get("name", ""),
+            line=data.get("line", 1),
+            end_line=data.get("end_line"),
+            args=data.get("args", ()),
+            decorators=data.get("decorators", ()),
+            methods=data.get("methods", ()),
+            # JavaScript classes name their superclass "parent"
+            bases=data.get("bases") or ([data["parent"]] if data.get("parent") else ()),
+            top_level=data.get("top_level", True),
+            parent=data.get("class")
+        )
+    
+    def __repr__(self) -> str:
+        return f"Definition({self.kind} {self.name}, lines {self.span[0]}-{self.span[1]})"
+
+
+class ParsedModule(_Frozen):
+    """
+    Structure of one module: definitions, imports, docstring and syntax error
+    
+    tree holds the language's syntax tree when the parser builds one (the
+    Python ast.Module); it must be treated as read-only since the module may
+    be shared.
+    """
+    __slots__ = (
+        "language", "line_count", "char_count", "functions", "classes",
+        "imports", "docstring", "error", "tree"
+    )
+    
+    def __init__(
+        self,
+        language: str,
+        line_count: int,
+        char_count: int,
+        functions: Iterable[Definition] = (),
+        classes: Iterable[Definition] = (),
+        imports: Iterable[str] = (),
+        docstring: Optional[str] = None,
+        error: Optional[Dict[str, Any]] = None,
+        tree: Any = None
+    ):
+        self._init(
+            language=language,
+            line_count=line_count,
+            char_count=char_count,
+            functions=tuple(functions),
+            classes=tuple(classes),
+            imports=tuple(imports),
+            docstring=docstring,
+            error=dict(error) if error else None,
+            tree=tree
+        )
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the code parsed without a syntax error."""
+        return self.error is None
+    
+    @property
+    def definitions(self) -> Tuple[Definition, ...]:
+        """Functions and classes ordered by line."""
+        return tuple(sorted(self.functions + self.classes, key=lambda definition: definition.line))
+    
+    @property
+    def top_level_definitions(self) -> Tuple[Definition, ...]:
+        """Module-level functions and classes ordered by line."""
+        return tuple(definition for definition in self.definitions if definition.top_level)
+    
+    def syntax_issues(self) -> List[Dict[str, Any]]:
+        """Get the syntax error, if any, in the format returned by get_syntax_issues."""
+        if self.error is None:
+            return []
+        return [{
+            "message": self.error.get("message", "Syntax error"),
+            "line": self.error.get("line") or 1,
+            "column": self.error.get("column") or 1,
+            "type": self.error.get("type", "SyntaxError")
+        }]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary format returned by the parsers' parse method."""
+        result: Dict[str, Any] = {
+            "lines": self.line_count,
+            "chars": self.char_count,
+            "tokens": []
+        }
+        
+        if self.error is not None:
+            result["error"] = dict(self.error)
+            if self.imports:
+                result["imports"] = list(self.imports)
+            return result
+        
+        result["functions"] = [function.to_dict() for function in self.functions]
+        result["classes"] = [cls.to_dict() for cls in self.classes]
+        result["imports"] = list(self.imports)
+        if self.tree is not None:
+            result["ast_type"] = type(self.tree).__name__
+        return result
+    
+    @classmethod
+    def from_dict(cls, language: str, data: Dict[str, Any]) -> "ParsedModule":
+        """Build a parsed module from a parser's parse dictionary."""
+        return cls(
+            language=language,
+            line_count=data.get("lines", 0),
+            char_count=data.get("chars", 0),
+            functions=[Definition.from_dict("function", function) for function in data.get("functions", [])],
+            classes=[Definition.from_dict("class", cls_data) for cls_data in data.get("classes", [])],
+            imports=data.get("imports", []),
+            error=data.get("error")
+        )
+    
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error at line {self.error.get('line')}"
+        return f"ParsedModule({self.language}, {self.line_count} lines, {state})"
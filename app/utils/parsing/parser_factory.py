@@ -11,28 +11,38 @@ _parsers: Dict[str, Type[BaseParser]] = {
     # Add more parsers as they are implemented
 }
 
+# Shared parser instances; parsers are stateless, so one per class serves every caller
+_instances: Dict[Type[BaseParser], BaseParser] = {}
+
+def is_supported_language(language: str) -> bool:
+    """
+    Check whether a language has its own parser
+    
+    get_parser_for_language() falls back to the Python parser for other
+    languages, so its syntax checks only mean something for these.
+    """
+    return (language or "").lower() in _parsers
+
 def get_parser_for_language(language: str) -> BaseParser:
     """
     Get a parser for the specified programming language
     
     Args:
         language: The programming language to get a parser for
-        
+    
     Returns:
-        An instance of the appropriate parser
-        
-    Raises:
-        ValueError: If no parser is available for the language
+        The shared instance of the appropriate parser
     """
     language = language.lower()
     
-    # Check if we have a parser for this language
-    if language in _parsers:
-        return _parsers[language]()
-    
     # Fall back to a default parser for unknown languages
     # In a real implementation, you might want to raise an error instead
-    return PythonParser()  # Default to Python parser
+    parser_class = _parsers.get(language, PythonParser)
+    
+    parser = _instances.get(parser_class)
+    if parser is None:
+        parser = _instances.setdefault(parser_class, parser_class())
+    return parser
 
 # Alias for backward compatibility
 get_parser = get_parser_for_language 
\ No newline at end of file
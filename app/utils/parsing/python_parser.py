@@ -1,9 +1,89 @@
 import ast
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 from app.models.schemas.analysis import CodeIssue
 from app.utils.parsing.base_parser import BaseParser
+from app.utils.parsing.parsed_module import Definition, ParsedModule
+
+
+IMPORT_PATTERN = r"^\s*(from\s+[\w.]+\s+import\s+[\w.*,\s]+|import\s+[\w.,\s]+)"
+
+
+def _unparse(node: ast.AST) -> str:
+    # ast.unparse is Python 3.9+
+    return ast.unparse(node) if hasattr(ast, "unparse") else ""
+
+
+class _ModuleVisitor(ast.NodeVisitor):
+    """
+    Collects definitions and imports in a single pass over a module's tree
+    """
+    
+    def __init__(self):
+        self.functions: List[Definition] = []
+        self.classes: List[Definition] = []
+        self.imports: List[str] = []
+        # Enclosing function and class nodes of the node being visited
+        self._scopes: List[ast.AST] = []
+    
+    def _parent_class(self) -> Optional[str]:
+        if self._scopes and isinstance(self._scopes[-1], ast.ClassDef):
+            return self._scopes[-1].name
+        return None
+    
+    def _visit_scope(self, node: ast.AST):
+        self._scopes.append(node)
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    def _visit_function(self, node: ast.AST, is_async: bool):
+        self.functions.append(Definition(
+            kind="function",
+            name=node.name,
+            line=node.lineno,
+            end_line=node.end_lineno,
+            args=[arg.arg for arg in node.args.args],
+            decorators=[_unparse(decorator) for decorator in node.decorator_list],
+            docstring=ast.get_docstring(node),
+            is_async=is_async,
+            top_level=not self._scopes,
+            parent=self._parent_class()
+        ))
+        self._visit_scope(node)
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._visit_function(node, is_async=False)
+    
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._visit_function(node, is_async=True)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.append(Definition(
+            kind="class",
+            name=node.name,
+            line=node.lineno,
+            end_line=node.end_lineno,
+            methods=[
+                child.name for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ],
+            bases=[_unparse(base) for base in node.bases],
+            decorators=[_unparse(decorator) for decorator in node.decorator_list],
+            docstring=ast.get_docstring(node),
+            top_level=not self._scopes,
+            parent=self._parent_class()
+        ))
+        self._visit_scope(node)
+    
+    def visit_Import(self, node: ast.Import):
+        for name in node.names:
+            self.imports.append(f"import {name.name}")
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module or ""
+        for name in node.names:
+            self.imports.append(f"from {module} import {name.name}")
 
 
 class PythonParser(BaseParser):
@@ -11,40 +91,62 @@ class PythonParser(BaseParser):
     Parser for Python code
     """
     
-    def parse(self, code: str) -> Dict[str, Any]:
+    language = "python"
+    
+    def _parse_module(self, code: str) -> ParsedModule:
         """
-        Parse Python code and extract structure information
+        Parse Python code with a single ast.parse and a single pass over the tree
         
         Args:
             code: Python source code to parse
-            
+        
         Returns:
-            Dictionary with parsed information
+            The parsed module; on a syntax error it has no tree or definitions,
+            and imports are found line by line
         """
-        result = super().parse(code)
+        lines = len(code.splitlines())
         
         try:
-            # Parse the code using ast
             tree = ast.parse(code)
-            
-            # Extract functions and classes
-            result["functions"] = self.extract_functions(code)
-            result["classes"] = self.extract_classes(code)
-            result["imports"] = self.identify_imports(code)
-            
-            # Add more Python-specific information
-            result["ast_type"] = type(tree).__name__
-            
         except SyntaxError as e:
-            # Handle syntax errors
-            result["error"] = {
-                "type": "SyntaxError",
-                "message": str(e),
-                "line": e.lineno,
-                "column": e.offset
-            }
+            return ParsedModule(
+                language=self.language,
+                line_count=lines,
+                char_count=len(code),
+                imports=[line.strip() for line in code.splitlines() if re.match(IMPORT_PATTERN, line)],
+                error={
+                    "type": "SyntaxError",
+                    "message": str(e),
+                    "line": e.lineno,
+                    "column": e.offset
+                }
+            )
+        
+        visitor = _ModuleVisitor()
+        visitor.visit(tree)
+        
+        return ParsedModule(
+            language=self.language,
+            line_count=lines,
+            char_count=len(code),
+            functions=visitor.functions,
+            classes=visitor.classes,
+            imports=visitor.imports,
+            docstring=ast.get_docstring(tree),
+            tree=tree
+        )
+    
+    def parse(self, code: str) -> Dict[str, Any]:
+        """
+        Parse Python code and extract structure information
+        
+        Args:
+            code: Python source code to parse
         
-        return result
+        Returns:
+            Dictionary with parsed information
+        """
+        return self.parse_module(code).to_dict()
     
     def extract_functions(self, code: str) -> List[Dict[str, Any]]:
         """
@@ -52,32 +154,11 @@ class PythonParser(BaseParser):
         
         Args:
             code: Python source code to analyze
-            
+        
         Returns:
-            List of dictionaries with function information
+            List of dictionaries with function information (empty on a syntax error)
         """
-        functions = []
-        
-        try:
-            tree = ast.parse(code)
-            
-            # Find all function definitions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    functions.append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "args": [arg.arg for arg in node.args.args],
-                        "decorators": [
-                            ast.unparse(decorator) for decorator in node.decorator_list
-                        ] if hasattr(ast, "unparse") else []  # ast.unparse is Python 3.9+
-                    })
-        
-        except SyntaxError:
-            # If there's a syntax error, return an empty list
-            pass
-        
-        return functions
+        return [function.to_dict() for function in self.parse_module(code).functions]
     
     def extract_classes(self, code: str) -> List[Dict[str, Any]]:
         """
@@ -85,38 +166,11 @@ class PythonParser(BaseParser):
         
         Args:
             code: Python source code to analyze
-            
+        
         Returns:
-            List of dictionaries with class information
+            List of dictionaries with class information (empty on a syntax error)
         """
-        classes = []
-        
-        try:
-            tree = ast.parse(code)
-            
-            # Find all class definitions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    # Get methods in the class
-                    methods = []
-                    for child in node.body:
-                        if isinstance(child, ast.FunctionDef):
-                            methods.append(child.name)
-                    
-                    classes.append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "methods": methods,
-                        "bases": [
-                            ast.unparse(base) for base in node.bases
-                        ] if hasattr(ast, "unparse") else []  # ast.unparse is Python 3.9+
-                    })
-        
-        except SyntaxError:
-            # If there's a syntax error, return an empty list
-            pass
-        
-        return classes
+        return [cls.to_dict() for cls in self.parse_module(code).classes]
     
     def identify_imports(self, code: str) -> List[str]:
         """
@@ -124,32 +178,11 @@ class PythonParser(BaseParser):
         
         Args:
             code: Python source code to analyze
-            
+        
         Returns:
             List of import statements
         """
-        imports = []
-        
-        try:
-            tree = ast.parse(code)
-            
-            # Find all import statements
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imports.append(f"import {name.name}")
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for name in node.names:
-                        imports.append(f"from {module} import {name.name}")
-        
-        except SyntaxError:
-            # If there's a syntax error, try regex-based approach
-            import_pattern = r"^\s*(from\s+[\w.]+\s+import\s+[\w.*,\s]+|import\s+[\w.,\s]+)"
-            imports = [line.strip() for line in code.splitlines() 
-                      if re.match(import_pattern, line)]
-        
-        return imports
+        return list(self.parse_module(code).imports)
     
     def preprocess(self, code: str) -> str:
         """
@@ -191,21 +224,20 @@ class PythonParser(BaseParser):
         
         Validates that the fixed code is syntactically valid Python
         """
-        try:
-            # Try to parse the fixed code to ensure it's valid Python
-            ast.parse(fixed_code)
+        # Parse the fixed code to ensure it's valid Python
+        if self.parse_module(fixed_code).ok:
             return fixed_code
-        except SyntaxError:
-            # If the fixed code has syntax errors, add a comment
-            return fixed_code + "\n\n# Note: The fixed code may still contain syntax errors"
-
+        
+        # If the fixed code has syntax errors, add a comment
+        return fixed_code + "\n\n# Note: The fixed code may still contain syntax errors"
+    
     def get_syntax_issues(self, parsed_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Extract Python-specific syntax issues from parsed data
         
         Args:
             parsed_data: Dictionary with parsed information from parse() method
-            
+        
         Returns:
             List of syntax issues found in the Python code
         """
@@ -0,0 +1,45 @@
+"""
+Offset-to-position mapping shared by the parsers and fixers.
+
+Line starts are computed in one pass over the source, so every token or
+match can be mapped to a line without rescanning the code.
+"""
+import bisect
+from typing import Tuple
+
+OPENING = {"(": ")", "[": "]", "{": "}"}
+CLOSING = {")": "(", "]": "[", "}": "{"}
+
+
+class LineIndex:
+    """
+    Start offsets of every line in a piece of source code
+    """
+    
+    def __init__(self, code: str):
+        starts = [0]
+        position = code.find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = code.find("\n", position + 1)
+        self.starts = starts
+        self.length = len(code)
+    
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+    
+    def line_of(self, offset: int) -> int:
+        """Get the 1-based line containing a character offset."""
+        return bisect.bisect_right(self.starts, offset)
+    
+    def position(self, offset: int) -> Tuple[int, int]:
+        """Get the 1-based line and column of a character offset."""
+        line = self.line_of(offset)
+        return line, offset - self.starts[line - 1] + 1
+    
+    def offset(self, line: int, column: int = 1) -> int:
+        """Get the character offset of a 1-based line and column."""
+        line = min(max(line, 1), len(self.starts))
+        return min(self.starts[line - 1] + column - 1, self.length)
+
@@ -0,0 +1,288 @@
+"""
+Line-anchored edit hunks: parsing, validation and application.
+
+Fixes are expressed as hunks that replace a 1-based, inclusive line range
+with new lines. Each hunk carries the original lines it expects to replace;
+they are checked against the source before anything is applied, and a hunk
+whose line numbers are slightly off is relocated to where its original
+lines actually are.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class PatchApplyError(ValueError):
+    """
+    Raised when hunks cannot be applied to the source they were generated for
+    """
+    pass
+
+
+class Hunk:
+    """
+    Replace lines start..end (1-based, inclusive) with replacement lines
+    
+    A pure insertion has end == start - 1 and no original lines; it inserts
+    before line start.
+    """
+    def __init__(self, start: int, original: Sequence[str], replacement: Sequence[str]):
+        self.start = start
+        self.original = list(original)
+        self.replacement = list(replacement)
+    
+    @property
+    def end(self) -> int:
+        return self.start + len(self.original) - 1
+    
+    def shifted(self, start: int) -> "Hunk":
+        """Return a copy of this hunk anchored at a different start line."""
+        return Hunk(start, self.original, self.replacement)
+    
+    def overlaps(self, other: "Hunk") -> bool:
+        """Check whether two hunks touch the same lines (or insert at the same place)."""
+        # Compare as half-open ranges of 0-based line indexes
+        lo, hi = self.start - 1, self.start - 1 + len(self.original)
+        other_lo, other_hi = other.start - 1, other.start - 1 + len(other.original)
+        
+        if lo == hi or other_lo == other_hi:
+            # Insertions conservatively conflict with anything touching their insertion point
+            return lo <= other_hi and other_lo <= hi
+        return lo < other_hi and other_lo < hi
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start_line": self.start,
+            "end_line": self.end,
+            "original": "\n".join(self.original),
+            "replacement": "\n".join(self.replacement),
+        }
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Hunk) and (
+            (self.start, self.original, self.replacement) == (other.start, other.original, other.replacement)
+        )
+    
+    def __repr__(self) -> str:
+        return f"Hunk(start={self.start}, original={self.original!r}, replacement={self.replacement!r})"
+
+
+def _split(text: Optional[str]) -> List[str]:
+    """
+    Split block text into lines
+    
+    Empty text is no lines. One trailing newline only ends the last line, so
+    "\n" is a single blank line.
+    """
+    if not text:
+        return []
+    if text.endswith("\n"):
+        text = text[:-1]
+    return text.split("\n")
+
+
+def hunks_from_edits(edits: Sequence[Dict[str, Any]]) -> List[Hunk]:
+    """
+    Build hunks from LLM edit objects
+    
+    An empty replacement deletes the original lines; "\n" replaces them with
+    one blank line. An empty original is a pure insertion, except that an
+    edit of exactly one line (start_line == end_line) is that line being blank.
+    
+    Args:
+        edits: Dicts with start_line, end_line, original and replacement
+    
+    Returns:
+        List of hunks
+    
+    Raises:
+        PatchApplyError: If an edit is malformed
+    """
+    hunks = []
+    for edit in edits:
+        if not isinstance(edit, dict):
+            raise PatchApplyError(f"Edit must be an object, got {type(edit).__name__}")
+        
+        try:
+            start = int(edit["start_line"])
+        except (KeyError, TypeError, ValueError):
+            raise PatchApplyError(f"Edit is missing a valid start_line: {edit!r}")
+        
+        original = _split(edit.get("original"))
+        end = edit.get("end_line")
+        if not original and end is not None and int(end) >= start:
+            if edit.get("original") != "" or int(end) != start:
+                raise PatchApplyError(f"Edit for lines {start}-{end} does not include the original lines")
+            original = [""]
+        
+        hunks.append(Hunk(start, original, _split(edit.get("replacement"))))
+    
+    return hunks
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """
+    Parse a single-file unified diff into hunks
+    
+    Context lines are folded into both sides of the hunk so they are
+    validated when the hunk is applied.
+    
+    Args:
+        diff: Unified diff text
+    
+    Returns:
+        List of hunks
+    
+    Raises:
+        PatchApplyError: If the diff contains no hunks or a malformed hunk
+    """
+    hunks = []
+    current: Optional[Tuple[int, List[str], List[str]]] = None
+    
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            if current:
+                hunks.append(Hunk(*current))
+            old_start, old_count = int(header.group(1)), header.group(2)
+            # A zero-length old side anchors after the given line
+            if old_count == "0":
+                old_start += 1
+            current = (old_start, [], [])
+        elif current is None or line.startswith(("--- ", "+++ ")):
+            continue
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        elif line.startswith(" ") or line == "":
+            current[1].append(line[1:])
+            current[2].append(line[1:])
+        elif line.startswith("\\"):
+            # "\ No newline at end of file"
+            continue
+        else:
+            raise PatchApplyError(f"Malformed diff line: {line!r}")
+    
+    if current:
+        hunks.append(Hunk(*current))
+    
+    if not hunks:
+        raise PatchApplyError("Diff contains no hunks")
+    
+    return hunks
+
+
+def _matches(lines: List[str], start: int, original: List[str]) -> bool:
+    """Check whether original appears at 1-based line start (ignoring trailing whitespace)."""
+    index = start - 1
+    if index < 0 or index + len(original) > len(lines):
+        return False
+    return all(
+        lines[index + offset].rstrip() == expected.rstrip()
+        for offset, expected in enumerate(original)
+    )
+
+
+def locate_hunk(lines: List[str], hunk: Hunk, fuzz: int = 3) -> Hunk:
+    """
+    Validate a hunk against the source, relocating it by up to fuzz lines
+    
+    Args:
+        lines: Source lines
+        hunk: Hunk to validate
+        fuzz: How far from its stated line a hunk may be found
+    
+    Returns:
+        The hunk anchored at the line where its original lines match
+    
+    Raises:
+        PatchApplyError: If the original lines are not found near the stated line
+    """
+    if not hunk.original:
+        if not 1 <= hunk.start <= len(lines) + 1:
+            raise PatchApplyError(f"Insertion point {hunk.start} is outside the file")
+        return hunk
+    
+    for distance in range(fuzz + 1):
+        for start in ((hunk.start,) if distance == 0 else (hunk.start - distance, hunk.start + distance)):
+            if _matches(lines, start, hunk.original):
+                return hunk if start == hunk.start else hunk.shifted(start)
+    
+    raise PatchApplyError(
+        f"Context mismatch: lines {hunk.start}-{hunk.end} do not match the expected original code"
+    )
+
+
+def apply_hunks(code: str, hunks: Sequence[Hunk], fuzz: int = 3) -> str:
+    """
+    Validate and apply hunks to code
+    
+    Args:
+        code: The original source
+        hunks: Hunks generated against the original source
+        fuzz: How far from its stated line a hunk may be found
+    
+    Returns:
+        The patched source
+    
+    Raises:
+        PatchApplyError: If a hunk does not match the source or hunks overlap
+    """
+    lines = code.split("\n")
+    located = sorted((locate_hunk(lines, hunk, fuzz) for hunk in hunks), key=lambda h: (h.start, h.end))
+    
+    for previous, current in zip(located, located[1:]):
+        if previous.overlaps(current):
+            raise PatchApplyError(f"Overlapping edits at lines {previous.start}-{previous.end} and {current.start}-{current.end}")
+    
+    # Apply bottom-up so earlier line numbers stay valid
+    for hunk in reversed(located):
+        lines[hunk.start - 1:hunk.end] = hunk.replacement
+    
+    return "\n".join(lines)
+
+
+def merge_hunks(code: str, hunk_groups: Sequence[Sequence[Hunk]], fuzz: int = 3) -> Tuple[str, List[int]]:
+    """
+    Merge the hunks of several independent fixes into one result
+    
+    Groups are taken in order; a group that fails validation, or that
+    overlaps a group already accepted, is skipped as a whole.
+    
+    Args:
+        code: The original source
+        hunk_groups: One list of hunks per fix
+        fuzz: How far from its stated line a hunk may be found
+    
+    Returns:
+        Tuple of (merged source, indexes of the groups that were applied)
+    """
+    lines = code.split("\n")
+    accepted: List[Hunk] = []
+    applied = []
+    
+    for index, group in enumerate(hunk_groups):
+        try:
+            located = [locate_hunk(lines, hunk, fuzz) for hunk in group]
+        except PatchApplyError:
+            continue
+        
+        if any(a.overlaps(b) for a in located for b in accepted) or any(
+            a.overlaps(b) for i, a in enumerate(located) for b in located[i + 1:]
+        ):
+            continue
+        
+        accepted.extend(located)
+        applied.append(index)
+    
+    return apply_hunks(code, accepted, fuzz=0), applied
+
+
+def number_lines(code: str) -> str:
+    """
+    Prefix each line with its 1-based line number, for prompts that ask for line-anchored edits
+    """
+    return "\n".join(f"{number:>4} | {line}" for number, line in enumerate(code.split("\n"), start=1))
@@ -5,6 +5,7 @@ import subprocess
 from typing import Dict, Any, Optional
 
 from app.core.config import settings
+from app.core.request_context import bounded_timeout, check_cancelled
 
 class CodeRunner:
     """
@@ -27,13 +28,20 @@ class CodeRunner:
             code: The code to run
             language: The programming language of the code
             timeout: Maximum execution time in seconds
-            
+        
         Returns:
             Dict with execution results including:
             - success: Whether execution was successful
             - output: Output from the execution (if successful)
             - error: Error message (if unsuccessful)
+        
+        Raises:
+            RequestCancelledError: If the current request was cancelled or its deadline passed
         """
+        # Never run past the request's deadline
+        check_cancelled()
+        timeout = bounded_timeout(timeout)
+        
         if self.use_docker:
             return await run_in_docker(code, language, timeout)
         else:
@@ -51,7 +59,7 @@ async def run_code_in_sandbox(
         code: The code to run
         language: The programming language of the code
         timeout: Maximum execution time in seconds
-        
+    
     Returns:
         Dict with execution results including:
         - success: Whether execution was successful
@@ -106,6 +114,10 @@ async def run_locally(code: str, language: str, timeout: int) -> Dict[str, Any]:
                 "success": False,
                 "error": f"Execution timed out after {timeout} seconds"
             }
+        except asyncio.CancelledError:
+            # The caller gave up; do not leave the process running
+            process.kill()
+            raise
     
     finally:
         # Clean up the temporary file
@@ -0,0 +1,543 @@
+"""
+Single-pass rule engine over a parsed Python module.
+
+Rules subscribe to AST node types and are called for each such node during
+one walk over the module's cached tree. The walk also records scopes, name
+bindings and name loads; names are resolved once the walk is done, so rules
+about undefined or unused names read the finished scopes in finish() instead
+of walking the tree again.
+"""
+import ast
+import builtins
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from app.utils.parsing.parsed_module import ParsedModule
+
+# Names available in every module without a binding
+BUILTIN_NAMES = frozenset(dir(builtins)) | {
+    "__file__", "__builtins__", "__cached__", "__path__", "__annotations__",
+    "__class__", "__module__", "__qualname__",
+}
+
+_IMPORT_ERRORS = {"ImportError", "ModuleNotFoundError"}
+
+
+class Finding:
+    """
+    One issue reported by a rule
+    """
+    __slots__ = ("rule", "message", "line", "end_line", "column", "end_column", "severity", "confidence")
+    
+    def __init__(
+        self,
+        rule: str,
+        message: str,
+        line: int,
+        end_line: Optional[int] = None,
+        column: Optional[int] = None,
+        end_column: Optional[int] = None,
+        severity: str = "medium",
+        confidence: float = 0.9
+    ):
+        self.rule = rule
+        self.message = message
+        self.line = line
+        self.end_line = end_line if end_line is not None else line
+        self.column = column
+        self.end_column = end_column
+        self.severity = severity
+        self.confidence = confidence
+    
+    def to_issue(self) -> Dict[str, Any]:
+        """Convert to the issue dict used by the analyzer (the rule id is the issue type)."""
+        return {
+            "type": self.rule,
+            "message": self.message,
+            "line_start": self.line,
+            "line_end": self.end_line,
+            "column_start": self.column,
+            "column_end": self.end_column,
+            "severity": self.severity,
+            "confidence": self.confidence
+        }
+    
+    def __repr__(self) -> str:
+        return f"Finding({self.rule!r}, line={self.line}, message={self.message!r})"
+
+
+class Binding:
+    """
+    A name bound in a scope
+    
+    kind is one of "import", "optional_import" (under "if TYPE_CHECKING:" or
+    in a try that handles ImportError), "assignment", "annotation",
+    "argument", "function", "class", "loop", "exception" or "other"
+    (unpacking, with targets, match captures and the like).
+    """
+    __slots__ = ("name", "kind", "node", "line", "column", "used")
+    
+    def __init__(self, name: str, kind: str, node: ast.AST):
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.line = getattr(node, "lineno", 1)
+        self.column = getattr(node, "col_offset", 0) + 1
+        self.used = False
+
+
+class Scope:
+    """
+    A module, class, function, lambda or comprehension scope
+    """
+    __slots__ = ("kind", "node", "parent", "bindings", "loads", "globals", "nonlocals", "star_import")
+    
+    def __init__(self, kind: str, node: ast.AST, parent: Optional["Scope"] = None):
+        self.kind = kind
+        self.node = node
+        self.parent = parent
+        self.bindings: Dict[str, List[Binding]] = {}
+        self.loads: List[Tuple[str, ast.AST]] = []
+        self.globals: set = set()
+        self.nonlocals: set = set()
+        self.star_import = False
+    
+    @property
+    def is_function(self) -> bool:
+        return self.kind in ("function", "lambda")
+    
+    def bind(self, name: str, kind: str, node: ast.AST) -> Binding:
+        binding = Binding(name, kind, node)
+        self.bindings.setdefault(name, []).append(binding)
+        return binding
+    
+    def resolve(self, name: str) -> Optional["Scope"]:
+        """
+        Find the scope a name loaded in this scope refers to
+        
+        Class bodies are only visible to code directly inside them.
+        """
+        scope: Optional[Scope] = self
+        while scope is not None:
+            if name in scope.bindings and (scope is self or scope.kind != "class"):
+                return scope
+            scope = scope.parent
+        return None
+    
+    def has_star_import(self) -> bool:
+        scope: Optional[Scope] = self
+        while scope is not None:
+            if scope.star_import:
+                return True
+            scope = scope.parent
+        return False
+
+
+class Rule:
+    """
+    Base class for static analysis rules
+    
+    A rule lists the node types it inspects in node_types; visit() is called
+    for each of them during the engine's single walk, with context.scope set
+    to the enclosing scope. finish() runs after the walk, when every scope's
+    bindings and name resolution are complete. A new rule instance is created
+    for every run, so rules may keep per-module state.
+    """
+    rule_id = ""
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    severity = "medium"
+    confidence = 0.9
+    
+    def __init__(self, context: "AnalysisContext"):
+        self.context = context
+        self.findings: List[Finding] = []
+    
+    def visit(self, node: ast.AST):
+        """Inspect one node of a subscribed type."""
+        pass
+    
+    def finish(self):
+        """Report findings that need the whole module."""
+        pass
+    
+    def report(
+        self,
+        node: ast.AST,
+        message: str,
+        severity: Optional[str] = None,
+        confidence: Optional[float] = None,
+        end_node: Optional[ast.AST] = None
+    ):
+        """Record a finding located at node (through end_node, if given)."""
+        end = end_node if end_node is not None else node
+        column = getattr(node, "col_offset", None)
+        end_column = getattr(end, "end_col_offset", None)
+        self.findings.append(Finding(
+            rule=self.rule_id,
+            message=message,
+            line=getattr(node, "lineno", 1),
+            end_line=getattr(end, "end_lineno", None) or getattr(node, "lineno", 1),
+            column=column + 1 if column is not None else None,
+            end_column=end_column + 1 if end_column is not None else None,
+            severity=severity or self.severity,
+            confidence=confidence if confidence is not None else self.confidence
+        ))
+
+
+class AnalysisContext:
+    """
+    State shared by the rules of one run: the module, its scopes and, after
+    the walk, the names that resolved to nothing
+    """
+    def __init__(self, module: ParsedModule):
+        self.module = module
+        self.module_scope = Scope("module", module.tree)
+        self.scope = self.module_scope
+        self.scopes: List[Scope] = [self.module_scope]
+        self.unresolved: List[Tuple[Scope, str, ast.AST]] = []
+    
+    @property
+    def function(self) -> Optional[ast.AST]:
+        """The innermost def enclosing the current node, if it is directly in one."""
+        return self.scope.node if self.scope.kind == "function" else None
+
+
+# Registry of rules run by default, in reporting order
+_rules: Dict[str, Type[Rule]] = {}
+
+
+def register_rule(rule_class: Type[Rule]) -> Type[Rule]:
+    """
+    Register a rule to run by default (usable as a class decorator)
+    
+    Args:
+        rule_class: Rule subclass with a unique rule_id
+    
+    Returns:
+        The rule class
+    """
+    _rules[rule_class.rule_id] = rule_class
+    return rule_class
+
+
+def get_rules() -> List[Type[Rule]]:
+    """Get the registered rules."""
+    return list(_rules.values())
+
+
+class RuleEngine:
+    """
+    Runs a set of rules over a module in a single traversal
+    """
+    def __init__(self, rules: Optional[Sequence[Type[Rule]]] = None):
+        # None runs whatever is registered at the time of each run
+        self.rules = list(rules) if rules is not None else None
+    
+    def run(self, module: ParsedModule) -> List[Finding]:
+        """
+        Run the rules over a parsed module
+        
+        Args:
+            module: Parsed Python module; modules without a tree produce no findings
+        
+        Returns:
+            Findings ordered by line
+        """
+        if module.language != "python" or module.tree is None:
+            return []
+        
+        context = AnalysisContext(module)
+        rules = [rule_class(context) for rule_class in (self.rules if self.rules is not None else get_rules())]
+        dispatch: Dict[Type[ast.AST], List[Rule]] = {}
+        for rule in rules:
+            for node_type in rule.node_types:
+                dispatch.setdefault(node_type, []).append(rule)
+        
+        _Walker(context, dispatch).walk(module.tree)
+        _resolve_names(context)
+        
+        findings: List[Finding] = []
+        for rule in rules:
+            rule.finish()
+            findings.extend(rule.findings)
+        findings.sort(key=lambda finding: (finding.line, finding.column or 0))
+        return findings
+
+
+def _resolve_names(context: AnalysisContext):
+    """Mark the bindings every load refers to; collect loads that refer to nothing."""
+    for scope in context.scopes:
+        for name, node in scope.loads:
+            target = scope.resolve(name)
+            if target is not None:
+                for binding in target.bindings[name]:
+                    binding.used = True
+            elif name not in BUILTIN_NAMES and not scope.has_star_import():
+                context.unresolved.append((scope, name, node))
+
+
+class _Walker:
+    """
+    The single traversal: dispatches nodes to rules and records scopes and names
+    """
+    def __init__(self, context: AnalysisContext, dispatch: Dict[Type[ast.AST], List[Rule]]):
+        self.context = context
+        self.dispatch = dispatch
+        self.store_kind = "other"
+        self.import_kind = "import"
+    
+    def walk(self, node: ast.AST):
+        for rule in self.dispatch.get(type(node), ()):
+            rule.visit(node)
+        
+        handler = getattr(self, "walk_" + type(node).__name__, None)
+        if handler is not None:
+            handler(node)
+        else:
+            self.walk_children(node)
+    
+    def walk_children(self, node: ast.AST):
+        for child in ast.iter_child_nodes(node):
+            self.walk(child)
+    
+    def walk_all(self, nodes: Sequence[Optional[ast.AST]]):
+        for node in nodes:
+            if node is not None:
+                self.walk(node)
+    
+    # Scopes
+    
+    def push(self, kind: str, node: ast.AST) -> Scope:
+        scope = Scope(kind, node, self.context.scope)
+        self.context.scopes.append(scope)
+        self.context.scope = scope
+        return scope
+    
+    def pop(self):
+        self.context.scope = self.context.scope.parent
+    
+    def store(self, name: str, kind: str, node: ast.AST):
+        """Bind a name in the current scope, honouring global and nonlocal declarations."""
+        scope = self.context.scope
+        if name in scope.globals:
+            self.context.module_scope.bind(name, kind, node)
+        elif name in scope.nonlocals:
+            # The binding lives in an enclosing function; assigning to it counts as a use
+            scope.loads.append((name, node))
+        else:
+            scope.bind(name, kind, node)
+    
+    def load(self, name: str, node: ast.AST):
+        self.context.scope.loads.append((name, node))
+    
+    def walk_target(self, target: ast.AST, kind: str):
+        previous, self.store_kind = self.store_kind, kind
+        self.walk(target)
+        self.store_kind = previous
+    
+    def walk_annotation(self, annotation: Optional[ast.AST]):
+        """Walk an annotation, including names inside string annotations."""
+        if annotation is None:
+            return
+        if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+            try:
+                expression = ast.parse(annotation.value, mode="eval").body
+            except SyntaxError:
+                return
+            for node in ast.walk(expression):
+                if isinstance(node, ast.Name):
+                    self.load(node.id, annotation)
+            return
+        self.walk(annotation)
+    
+    def walk_arguments(self, args: ast.arguments):
+        """Bind the parameters of the current function or lambda scope."""
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self.store(arg.arg, "argument", arg)
+    
+    def walk_FunctionDef(self, node: ast.AST):
+        # Decorators, defaults and annotations are evaluated in the enclosing scope
+        self.walk_all(node.decorator_list)
+        self.walk_all(node.args.defaults)
+        self.walk_all(node.args.kw_defaults)
+        for arg in node.args.posonlyargs + node.args.args + node.args.kwonlyargs + [node.args.vararg, node.args.kwarg]:
+            if arg is not None:
+                self.walk_annotation(arg.annotation)
+        self.walk_annotation(node.returns)
+        self.store(node.name, "function", node)
+        
+        self.push("function", node)
+        self.walk_arguments(node.args)
+        self.walk_all(node.body)
+        self.pop()
+    
+    walk_AsyncFunctionDef = walk_FunctionDef
+    
+    def walk_Lambda(self, node: ast.Lambda):
+        self.walk_all(node.args.defaults)
+        self.walk_all(node.args.kw_defaults)
+        
+        self.push("lambda", node)
+        self.walk_arguments(node.args)
+        self.walk(node.body)
+        self.pop()
+    
+    def walk_ClassDef(self, node: ast.ClassDef):
+        self.walk_all(node.decorator_list)
+        self.walk_all(node.bases)
+        self.walk_all(node.keywords)
+        
+        self.push("class", node)
+        self.walk_all(node.body)
+        self.pop()
+        
+        self.store(node.name, "class", node)
+    
+    def walk_comprehension_scope(self, node: ast.AST, elements: Sequence[ast.AST]):
+        # The first iterable is evaluated in the enclosing scope
+        self.walk(node.generators[0].iter)
+        
+        self.push("comprehension", node)
+        for index, generator in enumerate(node.generators):
+            self.walk_target(generator.target, "loop")
+            if index:
+                self.walk(generator.iter)
+            self.walk_all(generator.ifs)
+        self.walk_all(elements)
+        self.pop()
+    
+    def walk_ListComp(self, node: ast.ListComp):
+        self.walk_comprehension_scope(node, [node.elt])
+    
+    walk_SetComp = walk_ListComp
+    walk_GeneratorExp = walk_ListComp
+    
+    def walk_DictComp(self, node: ast.DictComp):
+        self.walk_comprehension_scope(node, [node.key, node.value])
+    
+    # Names
+    
+    def walk_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Store):
+            self.store(node.id, self.store_kind, node)
+        else:
+            # Loads, and deletes, which need the name to exist
+            self.load(node.id, node)
+    
+    def walk_NamedExpr(self, node: ast.NamedExpr):
+        self.walk(node.value)
+        
+        # The target of := binds in the nearest scope that is not a comprehension
+        scope = self.context.scope
+        while scope.kind == "comprehension" and scope.parent is not None:
+            scope = scope.parent
+        scope.bind(node.target.id, "assignment", node.target)
+    
+    def walk_Import(self, node: ast.Import):
+        for alias in node.names:
+            name = alias.asname or alias.name.split(".")[0]
+            self.store(name, self.import_kind, node)
+    
+    def walk_ImportFrom(self, node: ast.ImportFrom):
+        if node.module == "__future__":
+            return
+        for alias in node.names:
+            if alias.name == "*":
+                self.context.scope.star_import = True
+            else:
+                self.store(alias.asname or alias.name, self.import_kind, node)
+    
+    def walk_optional_imports(self, statements: Sequence[ast.AST]):
+        previous, self.import_kind = self.import_kind, "optional_import"
+        self.walk_all(statements)
+        self.import_kind = previous
+    
+    def walk_If(self, node: ast.If):
+        test = node.test
+        if (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+            isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+        ):
+            self.walk(test)
+            self.walk_optional_imports(node.body)
+            self.walk_all(node.orelse)
+        else:
+            self.walk_children(node)
+    
+    def walk_Try(self, node: ast.AST):
+        handled = set()
+        for handler in node.handlers:
+            types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+            handled.update(name.id for name in types if isinstance(name, ast.Name))
+        
+        if handled & _IMPORT_ERRORS:
+            self.walk_optional_imports(node.body)
+        else:
+            self.walk_all(node.body)
+        self.walk_all(node.handlers)
+        self.walk_all(node.orelse)
+        self.walk_all(node.finalbody)
+    
+    walk_TryStar = walk_Try
+    
+    def walk_Global(self, node: ast.Global):
+        self.context.scope.globals.update(node.names)
+    
+    def walk_Nonlocal(self, node: ast.Nonlocal):
+        self.context.scope.nonlocals.update(node.names)
+    
+    def walk_Assign(self, node: ast.Assign):
+        self.walk(node.value)
+        for target in node.targets:
+            self.walk_target(target, "assignment" if isinstance(target, ast.Name) else "other")
+        
+        # Names listed in a module's __all__ are exported, so they count as used
+        if (
+            self.context.scope is self.context.module_scope
+            and any(isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets)
+            and isinstance(node.value, (ast.List, ast.Tuple))
+        ):
+            for element in node.value.elts:
+                if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                    self.load(element.value, element)
+    
+    def walk_AnnAssign(self, node: ast.AnnAssign):
+        self.walk_annotation(node.annotation)
+        if node.value is not None:
+            self.walk(node.value)
+        self.walk_target(node.target, "assignment" if node.value is not None else "annotation")
+    
+    def walk_AugAssign(self, node: ast.AugAssign):
+        self.walk(node.value)
+        if isinstance(node.target, ast.Name):
+            self.load(node.target.id, node.target)
+        self.walk_target(node.target, "other")
+    
+    def walk_For(self, node: ast.For):
+        self.walk(node.iter)
+        self.walk_target(node.target, "loop")
+        self.walk_all(node.body)
+        self.walk_all(node.orelse)
+    
+    walk_AsyncFor = walk_For
+    
+    def walk_ExceptHandler(self, node: ast.ExceptHandler):
+        if node.type is not None:
+            self.walk(node.type)
+        if node.name:
+            self.store(node.name, "exception", node)
+        self.walk_all(node.body)
+    
+    def walk_MatchAs(self, node: ast.AST):
+        if node.pattern is not None:
+            self.walk(node.pattern)
+        if node.name:
+            self.store(node.name, "other", node)
+    
+    def walk_MatchStar(self, node: ast.AST):
+        if node.name:
+            self.store(node.name, "other", node)
+    
+    def walk_MatchMapping(self, node: ast.AST):
+        self.walk_children(node)
+        if node.rest:
+            self.store(node.rest, "other", node)
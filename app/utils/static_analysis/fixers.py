@@ -0,0 +1,562 @@
+"""
+Deterministic local fixers for common issue types.
+
+Fixers are registered per issue type and yield candidate fixes, most likely
+first. A candidate is only accepted if the fixed code parses, so the fix
+generator can try them before asking the LLM and fall back to it when none
+applies. Every fixer works on tokens, lines or the cached AST and returns in
+milliseconds.
+"""
+import ast
+import difflib
+import io
+import re
+import sys
+import time
+import tokenize
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app.utils.parsing.js_syntax import PUNCT, Tokenizer
+from app.utils.parsing.parsed_module import ParsedModule
+from app.utils.parsing.parser_factory import get_parser_for_language, is_supported_language
+from app.utils.parsing.source_index import CLOSING, OPENING, LineIndex
+from app.utils.patching import Hunk, PatchApplyError, apply_hunks
+from app.utils.static_analysis.engine import BUILTIN_NAMES
+
+_NAME_IN_MESSAGE = re.compile(r"name '([A-Za-z_]\w*)'")
+_LEADING_WHITESPACE = re.compile(r"[ \t]*")
+
+# Names importable from a standard library module, for "from module import name"
+_FROM_IMPORTS = {
+    "Any": "typing", "Callable": "typing", "Dict": "typing", "Iterable": "typing", "Iterator": "typing",
+    "List": "typing", "Optional": "typing", "Sequence": "typing", "Set": "typing", "Tuple": "typing",
+    "Type": "typing", "Union": "typing",
+    "Counter": "collections", "OrderedDict": "collections", "defaultdict": "collections",
+    "deque": "collections", "namedtuple": "collections",
+    "dataclass": "dataclasses", "Enum": "enum", "Path": "pathlib", "ABC": "abc", "abstractmethod": "abc",
+    "lru_cache": "functools", "partial": "functools", "reduce": "functools", "wraps": "functools",
+    "deepcopy": "copy", "Decimal": "decimal", "Fraction": "fractions", "timedelta": "datetime",
+}
+
+# Module names that are usually meant as a class of the same name (datetime.now()), so are left alone
+_AMBIGUOUS_MODULES = {"datetime"}
+
+_STDLIB_MODULES = {
+    name for name in getattr(sys, "stdlib_module_names", ())
+    if not name.startswith("_") and name not in _AMBIGUOUS_MODULES
+}
+
+
+class LocalFix:
+    """
+    A candidate fix: hunks against the original code, with a description
+    """
+    __slots__ = ("hunks", "description", "explanation", "confidence", "code_after")
+    
+    def __init__(self, hunks: Sequence[Hunk], description: str, explanation: str = "", confidence: float = 0.8):
+        self.hunks = list(hunks)
+        self.description = description
+        self.explanation = explanation
+        self.confidence = confidence
+        # Set once the fix is verified
+        self.code_after: Optional[str] = None
+
+
+class FixContext:
+    """
+    The code and issue a fixer works on
+    """
+    def __init__(self, code: str, language: str, issue: Dict):
+        self.code = code
+        self.language = (language or "python").lower()
+        self.issue = issue
+        self.lines = code.split("\n")
+        self._module: Optional[ParsedModule] = None
+    
+    @property
+    def module(self) -> ParsedModule:
+        """The parsed code (usually already in the parse cache from analysis)."""
+        if self._module is None:
+            self._module = get_parser_for_language(self.language).parse_module(self.code)
+        return self._module
+    
+    @property
+    def line(self) -> int:
+        return int(self.issue.get("line_start") or 1)
+    
+    @property
+    def message(self) -> str:
+        return self.issue.get("message") or ""
+
+
+Fixer = Callable[[FixContext], Iterator[LocalFix]]
+
+# Registry of fixers by issue type, tried in registration order
+_fixers: Dict[str, List[Fixer]] = {}
+
+
+def register_fixer(*issue_types: str) -> Callable[[Fixer], Fixer]:
+    """
+    Register a fixer for one or more issue types (usable as a decorator)
+    
+    Args:
+        issue_types: Issue types the fixer handles
+    
+    Returns:
+        Decorator that registers the fixer and returns it unchanged
+    """
+    def decorator(fixer: Fixer) -> Fixer:
+        for issue_type in issue_types:
+            _fixers.setdefault(issue_type, []).append(fixer)
+        return fixer
+    return decorator
+
+
+def find_local_fix(code: str, language: str, issue: Dict, deadline: Optional[float] = None) -> Optional[LocalFix]:
+    """
+    Find the first candidate fix for an issue whose result parses
+    
+    Args:
+        code: The full source code
+        language: The programming language of the code
+        issue: Issue reported by the analyzer
+        deadline: time.perf_counter() value after which no more candidates are tried
+    
+    Returns:
+        The verified fix, with code_after set, or None
+    """
+    # Candidates are verified by parsing, which needs a parser for the language
+    fixers = _fixers.get(issue.get("type"), [])
+    if not fixers or not is_supported_language(language):
+        return None
+    
+    context = FixContext(code, language, issue)
+    parser = get_parser_for_language(context.language)
+    for fixer in fixers:
+        try:
+            for fix in fixer(context):
+                if deadline is not None and time.perf_counter() > deadline:
+                    return None
+                try:
+                    code_after = apply_hunks(code, fix.hunks, fuzz=0)
+                except PatchApplyError:
+                    continue
+                if code_after != code and parser.parse_module(code_after).ok:
+                    fix.code_after = code_after
+                    return fix
+        except (SyntaxError, ValueError, tokenize.TokenError):
+            continue
+    return None
+
+
+class LineEdits:
+    """
+    Edits collected against the original lines, turned into one hunk per run of touched lines
+    """
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        # line -> [(column, length, text)], applied right to left
+        self._replacements: Dict[int, List[Tuple[int, int, str]]] = {}
+        # line -> lines inserted after it (0 inserts before the first line)
+        self._inserted: Dict[int, List[str]] = {}
+    
+    def replace(self, line: int, column: int, length: int, text: str) -> "LineEdits":
+        """Replace length characters at a 0-based column of a 1-based line."""
+        self._replacements.setdefault(line, []).append((column, length, text))
+        return self
+    
+    def insert_after(self, line: int, new_lines: Sequence[str]) -> "LineEdits":
+        self._inserted.setdefault(line, []).extend(new_lines)
+        return self
+    
+    def _line(self, line: int) -> str:
+        text = self.lines[line - 1]
+        for column, length, replacement in sorted(self._replacements.get(line, []), reverse=True):
+            text = text[:column] + replacement + text[column + length:]
+        return text
+    
+    def hunks(self) -> List[Hunk]:
+        hunks: List[Hunk] = []
+        if 0 in self._inserted:
+            hunks.append(Hunk(1, [], self._inserted[0]))
+        
+        touched = sorted((set(self._replacements) | set(self._inserted)) - {0})
+        run: List[int] = []
+        for line in touched + [None]:
+            if run and (line is None or line != run[-1] + 1):
+                hunks.append(Hunk(
+                    run[0],
+                    [self.lines[number - 1] for number in run],
+                    [text for number in run for text in [self._line(number)] + self._inserted.get(number, [])]
+                ))
+                run = []
+            if line is not None:
+                run.append(line)
+        return hunks
+
+
+def _indent_of(text: str) -> str:
+    return _LEADING_WHITESPACE.match(text).group()
+
+
+def _indent_unit(lines: List[str]) -> str:
+    """The file's indentation step: a tab, or the most common increase in spaces."""
+    steps: Dict[int, int] = {}
+    previous = 0
+    for text in lines:
+        if not text.strip():
+            continue
+        indent = _indent_of(text)
+        if "\t" in indent:
+            return "\t"
+        if len(indent) > previous:
+            steps[len(indent) - previous] = steps.get(len(indent) - previous, 0) + 1
+        previous = len(indent)
+    return " " * (max(steps, key=steps.get) if steps else 4)
+
+
+def _previous_code_line(lines: List[str], line: int) -> Optional[int]:
+    """The nearest line before line that is neither blank nor a comment."""
+    for number in range(line - 1, 0, -1):
+        stripped = lines[number - 1].strip()
+        if stripped and not stripped.startswith("#"):
+            return number
+    return None
+
+
+def _block_end(lines: List[str], line: int, indent: int) -> int:
+    """The last line of the block starting at line: lines until one (not blank) is indented less than indent."""
+    end = line
+    for number in range(line + 1, len(lines) + 1):
+        text = lines[number - 1]
+        if text.strip():
+            if len(_indent_of(text)) < indent:
+                break
+            end = number
+    return end
+
+
+def _reindent(lines: List[str], first: int, last: int, remove: int, add: str = "") -> LineEdits:
+    """Remove remove leading characters from, then prefix add to, non-blank lines first..last."""
+    edits = LineEdits(lines)
+    for number in range(first, last + 1):
+        if lines[number - 1].strip():
+            edits.replace(number, 0, remove, add)
+    return edits
+
+
+@register_fixer("syntax")
+def fix_indentation(context: FixContext) -> Iterator[LocalFix]:
+    """Repair the indentation errors Python reports, from the indentation of neighbouring lines."""
+    if context.language != "python" or context.line > len(context.lines):
+        return
+    message = context.message
+    lines = context.lines
+    line = context.line
+    indent = len(_indent_of(lines[line - 1]))
+    previous = _previous_code_line(lines, line)
+    previous_indent = len(_indent_of(lines[previous - 1])) if previous else 0
+    
+    if "inconsistent use of tabs and spaces" in message:
+        unit = " " * 4
+        edits = LineEdits(lines)
+        for number, text in enumerate(lines, start=1):
+            leading = _indent_of(text)
+            if "\t" in leading:
+                edits.replace(number, 0, len(leading), leading.replace("\t", unit))
+        yield LocalFix(edits.hunks(), "Replace tabs in indentation with spaces", "Python rejects indentation that mixes tabs and spaces.")
+    
+    elif "unexpected indent" in message:
+        last = _block_end(lines, line, indent)
+        yield LocalFix(
+            _reindent(lines, line, last, indent - previous_indent).hunks(),
+            f"Dedent line {line} to match the code before it",
+            "The line was indented although it does not start a new block."
+        )
+    
+    elif "expected an indented block" in message and previous:
+        unit = _indent_unit(lines)
+        header_indent = _indent_of(lines[previous - 1])
+        explanation = "The statement ending in ':' must be followed by an indented block."
+        if indent <= len(header_indent):
+            yield LocalFix(
+                _reindent(lines, line, line, 0, unit).hunks(),
+                f"Indent line {line} into the block started on line {previous}", explanation
+            )
+            yield LocalFix(
+                _reindent(lines, line, _block_end(lines, line, indent), 0, unit).hunks(),
+                f"Indent lines from {line} into the block started on line {previous}", explanation, confidence=0.6
+            )
+        yield LocalFix(
+            LineEdits(lines).insert_after(previous, [header_indent + unit + "pass"]).hunks(),
+            f"Add 'pass' to the empty block on line {previous}", explanation, confidence=0.5
+        )
+    
+    elif "unindent does not match any outer indentation level" in message:
+        # Indentation levels of the blocks open at the line, and the line that opened each
+        levels = [(0, 0)]
+        for number in range(1, line):
+            text = lines[number - 1]
+            if not text.strip() or text.strip().startswith("#"):
+                continue
+            level = len(_indent_of(text))
+            while len(levels) > 1 and levels[-1][0] > level:
+                levels.pop()
+            if level > levels[-1][0]:
+                levels.append((level, number))
+            else:
+                levels[-1] = (level, number)
+        
+        lower = max(level for level, _ in levels if level < indent)
+        higher = [level for level, _ in levels if level > indent]
+        targets = [lower] + higher[:1]
+        
+        # Dedenting to the level of a def or class would move the line out of its body
+        opener = next(number for level, number in levels if level == lower)
+        if higher and re.match(r"\s*(async\s+def|def|class)\b", lines[opener - 1]):
+            targets.reverse()
+        
+        last = _block_end(lines, line, indent)
+        for level in targets:
+            yield LocalFix(
+                _reindent(lines, line, last, indent, " " * level).hunks(),
+                f"Align line {line} with the enclosing block",
+                "The line was dedented to a level that no enclosing block uses."
+            )
+
+
+def _bracket_tokens(context: FixContext) -> Tuple[List[Tuple[str, int]], Dict[int, int]]:
+    """
+    Brackets outside strings and comments as (char, offset), and the end offset of the last token on each line
+    """
+    brackets: List[Tuple[str, int]] = []
+    line_ends: Dict[int, int] = {}
+    index = LineIndex(context.code)
+    
+    # A closer belongs before a statement's trailing ";"
+    if context.language == "javascript":
+        for token in Tokenizer(context.code, index).tokenize():
+            if not token.is_punct(";"):
+                line_ends[index.line_of(token.start)] = token.end
+            if token.kind == PUNCT and (token.value in OPENING or token.value in CLOSING):
+                brackets.append((token.value, token.start))
+        return brackets, line_ends
+    
+    skip = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER}
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(context.code).readline):
+            if token.type in skip:
+                continue
+            start = index.offset(token.start[0], token.start[1] + 1)
+            if token.string != ";":
+                line_ends[token.end[0]] = index.offset(token.end[0], token.end[1] + 1)
+            if token.type == tokenize.OP and (token.string in OPENING or token.string in CLOSING):
+                brackets.append((token.string, start))
+    except (tokenize.TokenError, IndentationError):
+        # Unclosed brackets end tokenizing at end of input; what was read is enough
+        pass
+    return brackets, line_ends
+
+
+@register_fixer("syntax")
+def fix_brackets(context: FixContext) -> Iterator[LocalFix]:
+    """
+    Balance brackets: drop stray closers, correct mismatched ones and close unclosed openers
+    
+    Unclosed openers are closed at the end of their statement (the last line
+    before the indentation returns to the opener's line), or else at the end
+    of the opener's line; a "{" ending its line gets a closing line after its
+    block. In JavaScript, a bracket left open when an enclosing bracket
+    closes on a later line is closed before its own line's ";"; if it ends
+    its line there is no such place and no fix is offered.
+    """
+    brackets, line_ends = _bracket_tokens(context)
+    index = LineIndex(context.code)
+    lines = context.lines
+    
+    # (line, column, length, text) edits shared by every candidate
+    replacements: List[Tuple[int, int, int, str]] = []
+    stack: List[Tuple[str, int]] = []
+    changes: List[str] = []
+    for char, offset in brackets:
+        if char in OPENING:
+            stack.append((char, offset))
+            continue
+        line, column = index.position(offset)
+        if stack and stack[-1][0] == CLOSING[char]:
+            stack.pop()
+        elif any(opener == CLOSING[char] for opener, _ in stack):
+            # Close the brackets opened inside the one this closes
+            closers = ""
+            statement_closers: Dict[int, str] = {}
+            while stack[-1][0] != CLOSING[char]:
+                opener, opener_offset = stack.pop()
+                opener_line = index.line_of(opener_offset)
+                if context.language != "javascript" or opener_line == line:
+                    closers += OPENING[opener]
+                    continue
+                # A JavaScript statement ends at its own ";" or line end, not at the enclosing closer
+                if line_ends.get(opener_line) == opener_offset + 1:
+                    return
+                statement_closers[opener_line] = statement_closers.get(opener_line, "") + OPENING[opener]
+            stack.pop()
+            for opener_line, text in statement_closers.items():
+                end_column = index.position(line_ends[opener_line])[1] - 1
+                replacements.append((opener_line, end_column, 0, text))
+                changes.append(f"add '{text}' on line {opener_line}")
+            if closers:
+                replacements.append((line, column - 1, 0, closers))
+                changes.append(f"add '{closers}' on line {line}")
+        elif stack:
+            expected = OPENING[stack.pop()[0]]
+            replacements.append((line, column - 1, 1, expected))
+            changes.append(f"replace '{char}' with '{expected}' on line {line}")
+        else:
+            replacements.append((line, column - 1, 1, ""))
+            changes.append(f"remove the unmatched '{char}' on line {line}")
+    
+    if not changes and not stack:
+        return
+    if stack:
+        changes.append(f"close {len(stack)} unclosed bracket(s)")
+    
+    for at_statement_end in (True, False):
+        edits = LineEdits(lines)
+        for replacement in replacements:
+            edits.replace(*replacement)
+        
+        closers: Dict[int, str] = {}
+        for char, offset in reversed(stack):
+            line = index.line_of(offset)
+            indent = _indent_of(lines[line - 1])
+            ends_line = line_ends.get(line) == offset + 1
+            if ends_line and char == "{":
+                edits.insert_after(_block_end(lines, line, len(indent) + 1), [indent + OPENING[char]])
+                continue
+            end = _block_end(lines, line, len(indent) + 1) if at_statement_end or ends_line else line
+            closers[end] = closers.get(end, "") + OPENING[char]
+        
+        for end, text in closers.items():
+            end_offset = line_ends.get(end)
+            column = index.position(end_offset)[1] - 1 if end_offset is not None else len(lines[end - 1])
+            edits.replace(end, column, 0, text)
+        
+        yield LocalFix(
+            edits.hunks(),
+            f"Balance brackets: {'; '.join(changes)}",
+            "Every opening bracket needs a matching closing bracket of the same kind.",
+            confidence=0.7
+        )
+
+
+def _missing_name(context: FixContext) -> Optional[str]:
+    """The undefined name of a NameError or undefined_name issue."""
+    match = _NAME_IN_MESSAGE.search(context.message)
+    return match.group(1) if match else None
+
+
+def _name_column(context: FixContext, name: str) -> Optional[int]:
+    """0-based column of name on the issue's line, preferring the reported column."""
+    if context.line > len(context.lines):
+        return None
+    text = context.lines[context.line - 1]
+    column = context.issue.get("column_start")
+    if column and text[column - 1:column - 1 + len(name)] == name:
+        return column - 1
+    for match in re.finditer(rf"(?<![\w.]){re.escape(name)}(?!\w)", text):
+        return match.start()
+    return None
+
+
+def _bound_names(module: ParsedModule, line: int) -> Set[str]:
+    """Names bound at module level, and anywhere in the top-level statement containing line."""
+    names: Set[str] = set()
+    stack: List[ast.AST] = list(module.tree.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add((node.asname or node.name).split(".")[0])
+        
+        # Only descend into a def or class (or lambda) body when it contains the line
+        scoped = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda))
+        if not scoped or node.lineno <= line <= (node.end_lineno or node.lineno):
+            stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+@register_fixer("undefined_name", "runtime")
+def fix_missing_import(context: FixContext) -> Iterator[LocalFix]:
+    """Import an undefined name that is a standard library module or a well-known standard library name."""
+    name = _missing_name(context)
+    module = context.module if context.language == "python" else None
+    if not name or module is None or module.tree is None:
+        return
+    
+    source = _FROM_IMPORTS.get(name)
+    if source is None and name not in _STDLIB_MODULES:
+        return
+    statement = f"from {source} import {name}" if source else f"import {name}"
+    lines = context.lines
+    body = module.tree.body
+    
+    # Add to an existing one-line "from source import ..." if there is one
+    for node in body:
+        if (
+            source and isinstance(node, ast.ImportFrom) and node.module == source and not node.level
+            and node.lineno == node.end_lineno and "#" not in lines[node.lineno - 1]
+            and not any(alias.name == "*" for alias in node.names)
+        ):
+            text = lines[node.lineno - 1]
+            yield LocalFix(
+                LineEdits(lines).replace(node.lineno, len(text.rstrip()), 0, f", {name}").hunks(),
+                f"Import {name} from {source}",
+                f"'{name}' is used but was not imported.",
+                confidence=0.9
+            )
+            return
+    
+    # Otherwise after the last top-level import, or the module docstring, or leading comments
+    imports = [node for node in body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    if imports:
+        after = max(node.end_lineno for node in imports)
+    elif body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant) and isinstance(body[0].value.value, str):
+        after = body[0].end_lineno
+    else:
+        after = 0
+        while after < len(lines) and lines[after].startswith("#"):
+            after += 1
+    
+    yield LocalFix(
+        LineEdits(lines).insert_after(after, [statement]).hunks(),
+        f"Add '{statement}'",
+        f"'{name}' is used but was not imported.",
+        confidence=0.9
+    )
+
+
+@register_fixer("undefined_name", "runtime")
+def fix_misspelled_name(context: FixContext) -> Iterator[LocalFix]:
+    """Replace an undefined name with the closest name that is defined, for typos."""
+    name = _missing_name(context)
+    module = context.module if context.language == "python" else None
+    if not name or module is None or module.tree is None:
+        return
+    
+    column = _name_column(context, name)
+    if column is None:
+        return
+    
+    candidates = (_bound_names(module, context.line) | BUILTIN_NAMES) - {name}
+    for suggestion in difflib.get_close_matches(name, candidates, n=3, cutoff=0.75):
+        yield LocalFix(
+            LineEdits(context.lines).replace(context.line, column, len(name), suggestion).hunks(),
+            f"Replace '{name}' with '{suggestion}'",
+            f"'{name}' is not defined; '{suggestion}' is the closest defined name.",
+            confidence=0.7
+        )
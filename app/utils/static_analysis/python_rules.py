@@ -0,0 +1,297 @@
+"""
+Built-in Python static analysis rules.
+
+Each rule is registered with the engine and runs during its single walk
+over the cached AST; importing this module registers them.
+"""
+import ast
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.utils.static_analysis.engine import BUILTIN_NAMES, Rule, RuleEngine, register_rule
+
+_TERMINAL_STATEMENTS = {
+    ast.Return: "return",
+    ast.Raise: "raise",
+    ast.Continue: "continue",
+    ast.Break: "break",
+}
+
+_STATEMENT_LIST_NODES = (
+    ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.If, ast.For, ast.AsyncFor,
+    ast.While, ast.With, ast.AsyncWith, ast.Try, ast.ExceptHandler, ast.match_case,
+) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+
+_MUTABLE_CALLS = {"list", "dict", "set", "bytearray"}
+
+# Exceptions whose handlers make a division by a parameter deliberate
+_DIVISION_HANDLERS = {"ZeroDivisionError", "ArithmeticError", "Exception", "BaseException"}
+
+
+def _is_zero(node: ast.AST) -> bool:
+    """Whether node is a numeric zero literal, possibly signed."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        node = node.operand
+    return (
+        isinstance(node, ast.Constant)
+        and type(node.value) in (int, float, complex)
+        and node.value == 0
+    )
+
+
+def _parameters(function: ast.AST) -> List[str]:
+    """Positional parameter names of a def, in order."""
+    return [arg.arg for arg in function.args.posonlyargs + function.args.args]
+
+
+@register_rule
+class UndefinedNameRule(Rule):
+    """
+    Names that are loaded but bound nowhere in scope and are not builtins
+    """
+    rule_id = "undefined_name"
+    severity = "high"
+    
+    def finish(self):
+        reported: Set[Tuple[int, str]] = set()
+        for _, name, node in self.context.unresolved:
+            key = (getattr(node, "lineno", 1), name)
+            if key in reported:
+                continue
+            reported.add(key)
+            self.report(node, f"Undefined name '{name}' raises NameError when this line runs")
+
+
+@register_rule
+class UnusedImportRule(Rule):
+    """
+    Imported names that are never used
+    """
+    rule_id = "unused_import"
+    severity = "low"
+    
+    def finish(self):
+        for scope in self.context.scopes:
+            for name, bindings in scope.bindings.items():
+                for binding in bindings:
+                    if binding.kind == "import" and not binding.used:
+                        self.report(binding.node, f"'{name}' is imported but never used")
+
+
+@register_rule
+class UnusedVariableRule(Rule):
+    """
+    Local variables that are assigned but never read
+    """
+    rule_id = "unused_variable"
+    severity = "low"
+    confidence = 0.8
+    
+    def finish(self):
+        for scope in self.context.scopes:
+            # Variables may be read through locals()
+            if not scope.is_function or any(name == "locals" for name, _ in scope.loads):
+                continue
+            for name, bindings in scope.bindings.items():
+                if name.startswith("_") or any(binding.used for binding in bindings):
+                    continue
+                for binding in bindings:
+                    if binding.kind == "assignment":
+                        self.report(binding.node, f"Local variable '{name}' is assigned but never used")
+                        break
+
+
+@register_rule
+class UnreachableCodeRule(Rule):
+    """
+    Statements after a return, raise, continue or break in the same block
+    """
+    rule_id = "unreachable_code"
+    node_types = _STATEMENT_LIST_NODES
+    
+    def visit(self, node: ast.AST):
+        for field in ("body", "orelse", "finalbody"):
+            statements = getattr(node, field, None)
+            if not isinstance(statements, list):
+                continue
+            for index, statement in enumerate(statements[:-1]):
+                keyword = _TERMINAL_STATEMENTS.get(type(statement))
+                if keyword:
+                    self.report(
+                        statements[index + 1],
+                        f"Unreachable code after '{keyword}' on line {statement.lineno}",
+                        end_node=statements[-1]
+                    )
+                    break
+
+
+@register_rule
+class MutableDefaultRule(Rule):
+    """
+    Default argument values that are mutable and shared between calls
+    """
+    rule_id = "mutable_default"
+    node_types = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+    
+    def visit(self, node: ast.AST):
+        positional = node.args.posonlyargs + node.args.args
+        defaults = list(zip(positional[len(positional) - len(node.args.defaults):], node.args.defaults))
+        defaults += [(arg, default) for arg, default in zip(node.args.kwonlyargs, node.args.kw_defaults) if default is not None]
+        function = getattr(node, "name", "lambda")
+        
+        for arg, default in defaults:
+            if self._is_mutable(default):
+                self.report(
+                    default,
+                    f"Mutable default for '{arg.arg}' in '{function}' is shared between calls; default to None and create it inside"
+                )
+    
+    @staticmethod
+    def _is_mutable(node: ast.AST) -> bool:
+        if isinstance(node, (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)):
+            return True
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _MUTABLE_CALLS
+
+
+@register_rule
+class ShadowedBuiltinRule(Rule):
+    """
+    Names that rebind a builtin
+    
+    Class attributes (model fields named id or type, say) do not shadow
+    anything outside the class body and are not reported.
+    """
+    rule_id = "shadowed_builtin"
+    severity = "low"
+    confidence = 0.8
+    
+    def finish(self):
+        for scope in self.context.scopes:
+            if scope.kind == "class":
+                continue
+            for name, bindings in scope.bindings.items():
+                if name in BUILTIN_NAMES and not name.startswith("_"):
+                    self.report(bindings[0].node, f"'{name}' shadows the builtin of the same name")
+
+
+@register_rule
+class BareExceptRule(Rule):
+    """
+    except: clauses without an exception type
+    """
+    rule_id = "bare_except"
+    node_types = (ast.ExceptHandler,)
+    
+    def visit(self, node: ast.ExceptHandler):
+        if node.type is None:
+            self.report(node, "Bare 'except:' also catches KeyboardInterrupt and SystemExit; catch Exception or something narrower")
+
+
+@register_rule
+class DivisionByZeroRule(Rule):
+    """
+    Divisions that raise ZeroDivisionError: by a zero literal, or by a
+    parameter that a call passes a zero literal for
+    
+    A division by a parameter is ignored when the function compares or tests
+    that parameter, or handles ZeroDivisionError, since it is then guarded.
+    """
+    rule_id = "division_by_zero"
+    severity = "high"
+    node_types = (
+        ast.BinOp, ast.AugAssign, ast.Call, ast.Compare, ast.If, ast.While, ast.IfExp, ast.Assert, ast.ExceptHandler,
+    )
+    
+    def __init__(self, context):
+        super().__init__(context)
+        # def node -> {parameter: first division using it}
+        self.divisors: Dict[ast.AST, Dict[str, ast.AST]] = {}
+        self.guarded: Dict[ast.AST, Set[str]] = {}
+        self.handled: Set[ast.AST] = set()
+        self.calls: List[ast.Call] = []
+    
+    def visit(self, node: ast.AST):
+        if isinstance(node, (ast.BinOp, ast.AugAssign)):
+            self._visit_division(node, node.right if isinstance(node, ast.BinOp) else node.value)
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and (
+                any(_is_zero(arg) for arg in node.args) or any(_is_zero(keyword.value) for keyword in node.keywords)
+            ):
+                self.calls.append(node)
+        elif isinstance(node, ast.ExceptHandler):
+            if self.context.function is not None and self._handles_division(node.type):
+                self.handled.add(self.context.function)
+        else:
+            self._visit_guard(node)
+    
+    def _visit_division(self, node: ast.AST, divisor: ast.AST):
+        if not isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            return
+        # % is also string formatting, so it only counts with a numeric literal on the left
+        if isinstance(node.op, ast.Mod) and not (
+            isinstance(node, ast.BinOp) and isinstance(node.left, ast.Constant) and type(node.left.value) in (int, float)
+        ):
+            return
+        
+        if _is_zero(divisor):
+            self.report(node, "Division by zero always raises ZeroDivisionError")
+            return
+        
+        function = self.context.function
+        if function is not None and isinstance(divisor, ast.Name) and divisor.id in _parameters(function):
+            self.divisors.setdefault(function, {}).setdefault(divisor.id, node)
+    
+    def _visit_guard(self, node: ast.AST):
+        function = self.context.function
+        if function is None:
+            return
+        parameters = set(_parameters(function))
+        test = node if isinstance(node, ast.Compare) else node.test
+        if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+            test = test.operand
+        names = [test] if isinstance(test, ast.Name) else (
+            [test.left] + test.comparators if isinstance(test, ast.Compare) else []
+        )
+        for name in names:
+            if isinstance(name, ast.Name) and name.id in parameters:
+                self.guarded.setdefault(function, set()).add(name.id)
+    
+    @staticmethod
+    def _handles_division(handler_type: Optional[ast.AST]) -> bool:
+        if handler_type is None:
+            return True
+        names = handler_type.elts if isinstance(handler_type, ast.Tuple) else [handler_type]
+        return any(isinstance(name, ast.Name) and name.id in _DIVISION_HANDLERS for name in names)
+    
+    def finish(self):
+        module_scope = self.context.module_scope
+        for call in self.calls:
+            bindings = module_scope.bindings.get(call.func.id, [])
+            if len(bindings) != 1 or bindings[0].kind != "function":
+                continue
+            function = bindings[0].node
+            if function in self.handled:
+                continue
+            
+            divisors = self.divisors.get(function, {})
+            guarded = self.guarded.get(function, set())
+            passed = []
+            for parameter, arg in zip(_parameters(function), call.args):
+                if isinstance(arg, ast.Starred):
+                    break
+                passed.append((parameter, arg))
+            passed += [(keyword.arg, keyword.value) for keyword in call.keywords if keyword.arg]
+            
+            for parameter, value in passed:
+                if _is_zero(value) and parameter in divisors and parameter not in guarded:
+                    division = divisors[parameter]
+                    self.report(
+                        call,
+                        f"Calling '{function.name}' with {parameter}=0 raises ZeroDivisionError: "
+                        f"'{parameter}' is a divisor on line {division.lineno}",
+                        confidence=0.85
+                    )
+                    break
+
+
+# Create a global instance running the registered rules
+rule_engine = RuleEngine()
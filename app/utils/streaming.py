@@ -0,0 +1,56 @@
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+from app.services.ai.resilience import CircuitOpenError
+
+
+def format_sse(data: Dict[str, Any], event: str = "message") -> str:
+    """
+    Format a payload as a Server-Sent Events frame
+    
+    Args:
+        data: JSON-serializable event payload
+        event: SSE event name
+        
+    Returns:
+        The encoded frame, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_frames(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Encode streamed LLM events as SSE frames, reporting failures as an "error" event
+    """
+    try:
+        async for event in events:
+            if event.get("type") == "delta":
+                yield format_sse({"content": event["content"]}, event="delta")
+            else:
+                yield format_sse(event.get("result", {}), event="result")
+    except CircuitOpenError as e:
+        yield format_sse({"detail": str(e), "retry_after": e.retry_after}, event="error")
+    except Exception as e:
+        # Headers are already sent, so errors can only be reported in-band
+        yield format_sse({"detail": str(e)}, event="error")
+    
+    yield format_sse({}, event="done")
+
+
+def sse_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Wrap streamed LLM events in a text/event-stream response
+    
+    Args:
+        events: Async iterator of {"type": "delta"|"result", ...} events
+        
+    Returns:
+        StreamingResponse emitting delta, result, error and done events
+    """
+    return StreamingResponse(
+        _sse_frames(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
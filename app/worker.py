@@ -0,0 +1,50 @@
+"""
+Agent worker process.
+
+Runs the agents without the HTTP API, consuming messages from the shared
+Redis stream, so agent capacity scales independently of API processes:
+
+    AGENT_SYSTEM_ROLE=api USE_REDIS=true gunicorn app.main:app ...
+    USE_REDIS=true python -m app.worker
+"""
+import asyncio
+import logging
+
+from app.agents.agent_system import AgentSystem, ROLE_WORKER
+from app.core.config import settings
+from app.services.ai.groq_client import GroqClient
+from app.services.ai.http_transport import open_http_client, close_http_client
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("agentlogger.worker")
+
+
+async def run_worker():
+    """Run an agent system in the worker role until cancelled."""
+    if not settings.USE_REDIS:
+        logger.warning("USE_REDIS is disabled: this worker will only see messages published in its own process")
+    
+    await open_http_client()
+    agent_system = AgentSystem(llm_client=GroqClient(api_key=settings.GROQ_API_KEY), role=ROLE_WORKER)
+    agent_system.initialize_agents()
+    logger.info(f"Agent worker started with {len(agent_system.agents)} agents")
+    
+    try:
+        await agent_system.start()
+    finally:
+        await agent_system.transport.close()
+        await close_http_client()
+
+
+def main():
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        logger.info("Agent worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Benchmark JavaScriptParser.parse on large generated inputs.
+
+Compares the parser against the previous line mapping, which counted
+newlines in code[:offset] for every match and rescanned characters from
+every class start, to show how both scale with input size.
+
+    python scripts/benchmark_js_parser.py --lines 10000 20000 50000
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to sys.path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.parsing.javascript_parser import JavaScriptParser
+
+CLASS_TEMPLATE = """class Widget{n} extends Base {{
+  constructor(value) {{
+    super(value);
+    this.value = value;
+  }}
+
+  render(target) {{
+    if (target) {{
+      return target.append(this.value);
+    }}
+    return null;
+  }}
+}}
+
+"""
+
+FUNCTION_TEMPLATE = """function helper{n}(a, b) {{
+  const total = a + b;
+  return total * {n};
+}}
+
+const arrow{n} = (x) => x * {n};
+
+"""
+
+
+def generate_code(lines: int) -> str:
+    """Generate JavaScript of roughly the given number of lines."""
+    parts = ["import { Base } from './base';\nconst fs = require('fs');\n\n"]
+    count = 3
+    n = 0
+    while count < lines:
+        block = (CLASS_TEMPLATE if n % 2 else FUNCTION_TEMPLATE).format(n=n)
+        parts.append(block)
+        count += block.count("\n")
+        n += 1
+    return "".join(parts)
+
+
+def legacy_line_mapping(code: str) -> int:
+    """Map every match to a line the way the parser used to, and scan each class body."""
+    total = 0
+    patterns = [
+        r"function\s+(\w+)\s*\((.*?)\)",
+        r"(?:const|let|var)\s+(\w+)\s*=\s*(?:\((.*?)\)|(\w+))\s*=>",
+        r"(\w+)\s*\((.*?)\)\s*\{",
+    ]
+    for pattern in patterns:
+        for match in re.finditer(pattern, code):
+            total += code[:match.start()].count("\n") + 1
+    
+    for match in re.finditer(r"class\s+(\w+)(?:\s+extends\s+(\w+))?\s*\{", code):
+        total += code[:match.start()].count("\n") + 1
+        brace_count = 1
+        for i in range(match.end(), len(code)):
+            if code[i] == "{":
+                brace_count += 1
+            elif code[i] == "}":
+                brace_count -= 1
+                if brace_count == 0:
+                    break
+    return total
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    argparser.add_argument("--lines", type=int, nargs="+", default=[10000, 20000, 50000])
+    argparser.add_argument("--skip-legacy", action="store_true", help="only time the current parser")
+    args = argparser.parse_args()
+    
+    parser = JavaScriptParser()
+    print(f"{'lines':>8} {'parse (s)':>10} {'legacy mapping (s)':>19} {'speedup':>8}")
+    
+    for lines in args.lines:
+        code = generate_code(lines)
+        parse_time = timed(parser.parse, code)
+        
+        if args.skip_legacy:
+            print(f"{lines:>8} {parse_time:>10.3f}")
+            continue
+        
+        legacy_time = timed(legacy_line_mapping, code)
+        print(f"{lines:>8} {parse_time:>10.3f} {legacy_time:>19.3f} {legacy_time / parse_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
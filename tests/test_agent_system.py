@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents.agent_system import AgentSystem
+from app.agents.base_agent import BaseAgent, Message
+from app.core.config import settings
+
+
+class SlowAgent(BaseAgent):
+    def __init__(self, agent_id: str, delay: float):
+        super().__init__(agent_id, "slow")
+        self.delay = delay
+        self.handled = []
+    
+    async def process_message(self, message):
+        await asyncio.sleep(self.delay)
+        self.handled.append(message.message_id)
+        return None
+
+
+def test_agent_types_are_backed_by_pools(monkeypatch):
+    """
+    Test that initialize_agents creates the configured number of workers per type
+    """
+    monkeypatch.setattr(settings, "AGENT_ANALYZER_WORKERS", 3)
+    monkeypatch.setattr(settings, "AGENT_FIX_GENERATOR_WORKERS", 2)
+    system = AgentSystem(llm_client=None)
+    system.initialize_agents()
+    
+    stats = system.get_pool_stats()
+    
+    assert stats["analyzer"]["workers"] == 3
+    assert stats["fix_generator"]["workers"] == 2
+    assert stats["coordinator"]["workers"] == 1
+    assert "analyzer_1" in system.agents
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_load_balances_across_pool():
+    """
+    Test that messages addressed to a pool are spread over its idle workers
+    """
+    system = AgentSystem(llm_client=None)
+    workers = [SlowAgent(f"slow_{i}", delay=0.2) for i in range(1, 4)]
+    for worker in workers:
+        system.register_agent(worker)
+        worker.send_message = system.send_message
+    
+    runner = asyncio.create_task(system.start())
+    await asyncio.sleep(0)
+    
+    started = time.monotonic()
+    for _ in range(3):
+        await system.send_message(Message("task", "coordinator_1", "slow_1", {}))
+    while sum(len(worker.handled) for worker in workers) < 3:
+        await asyncio.sleep(0.01)
+    elapsed = time.monotonic() - started
+    
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    
+    assert [len(worker.handled) for worker in workers] == [1, 1, 1]
+    assert elapsed < 0.4
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents.analyzer_agent import AnalyzerAgent
+from app.agents.base_agent import Message
+from app.core.config import settings
+from app.models.schemas.analysis import CodeIssue
+
+
+class SlowLLM:
+    def __init__(self, delay: float):
+        self.delay = delay
+    
+    async def analyze_code(self, code, language):
+        await asyncio.sleep(self.delay)
+        return [CodeIssue(id="1", type="bug", severity="medium", message="llm issue", line_start=1)]
+
+
+class SlowRunner:
+    def __init__(self, delay: float):
+        self.delay = delay
+    
+    async def run_code(self, code, language, timeout=30):
+        await asyncio.sleep(self.delay)
+        return {"error": "ZeroDivisionError on line 1"}
+
+
+def _request(code: str = "x = 1 / 0\n") -> Message:
+    return Message(
+        message_type="analyze_request",
+        sender_id="coordinator",
+        recipient_id="analyzer",
+        content={"session_id": "s1", "code": code, "language": "python"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    """
+    Test that analysis takes about as long as the slowest stage, not the sum
+    """
+    agent = AnalyzerAgent(agent_id="analyzer", llm_client=SlowLLM(0.2), code_runner=SlowRunner(0.2))
+    
+    started = time.monotonic()
+    response = await agent.analyze_code(_request())
+    elapsed = time.monotonic() - started
+    
+    issues = response.content["issues"]
+    assert elapsed < 0.35
+    # The sandbox's ZeroDivisionError is the same bug as the static finding
+    assert [issue["message"] for issue in issues] == [
+        "Division by zero always raises ZeroDivisionError", "llm issue"
+    ]
+    assert issues[0]["severity"] == "critical"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_stage_is_dropped(monkeypatch):
+    """
+    Test that a stage exceeding its timeout does not hold up or fail the others
+    """
+    monkeypatch.setattr(settings, "EXECUTION_TIMEOUT", 0)
+    monkeypatch.setattr(settings, "ANALYZER_SANDBOX_GRACE", 0.05)
+    agent = AnalyzerAgent(agent_id="analyzer", llm_client=SlowLLM(0), code_runner=SlowRunner(5))
+    
+    started = time.monotonic()
+    response = await agent.analyze_code(_request())
+    
+    assert time.monotonic() - started < 1
+    assert [issue["message"] for issue in response.content["issues"]] == [
+        "Division by zero always raises ZeroDivisionError", "llm issue"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_static_findings_are_sent_early_and_can_replace_the_llm(monkeypatch):
+    """
+    Test that rule findings are published before the LLM answers and that the fallback policy skips the LLM
+    """
+    monkeypatch.setattr(settings, "ANALYZER_LLM_POLICY", "fallback")
+    agent = AnalyzerAgent(agent_id="analyzer", llm_client=SlowLLM(5))
+    sent = []
+    
+    async def send_message(message):
+        sent.append(message)
+    
+    agent.send_message = send_message
+    
+    started = time.monotonic()
+    response = await agent.analyze_code(_request())
+    
+    assert time.monotonic() - started < 1
+    assert [issue["type"] for issue in response.content["issues"]] == ["division_by_zero"]
+    assert [(message.message_type, message.content["stage"]) for message in sent] == [("analysis_progress", "static")]
+    
+    monkeypatch.setattr(settings, "ANALYZER_LLM_POLICY", "always")
+    agent.llm_client = SlowLLM(0)
+    response = await agent.analyze_code(_request("x = 1\n"))
+    assert [issue["message"] for issue in response.content["issues"]] == ["llm issue"]
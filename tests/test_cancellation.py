@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.agents.agent_system import AgentSystem
+from app.agents.base_agent import BaseAgent, Message
+from app.agents.coordinator_agent import CoordinatorAgent
+from app.core.middleware import DeadlineMiddleware
+from app.core.request_context import CancellationToken, request_context, time_remaining
+
+
+class StuckAnalyzer(BaseAgent):
+    """Analyzer stand-in whose work never finishes on its own."""
+    def __init__(self, agent_id: str):
+        super().__init__(agent_id, "analyzer")
+        self.started = asyncio.Event()
+        self.cancelled = False
+    
+    async def process_message(self, message):
+        self.started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+async def _run_until(agent: BaseAgent, condition, timeout: float = 1.0):
+    runner = asyncio.create_task(agent.start())
+    try:
+        started = time.monotonic()
+        while not condition() and time.monotonic() - started < timeout:
+            await asyncio.sleep(0.01)
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_token_stops_in_flight_work():
+    """
+    Test that an agent abandons a message as soon as its token is cancelled
+    """
+    agent = StuckAnalyzer("analyzer_1")
+    token = CancellationToken()
+    await agent.receive_message(Message("analyze_request", "coordinator_1", "analyzer_1", {"session_id": "s1"}, cancel_token=token))
+    
+    async def cancel_when_started():
+        await agent.started.wait()
+        token.cancel("Client went away")
+    
+    canceller = asyncio.create_task(cancel_when_started())
+    await _run_until(agent, lambda: agent.cancelled)
+    await canceller
+    
+    assert agent.cancelled
+    assert agent.load == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_in_flight_work_and_is_inherited():
+    """
+    Test that messages inherit the request deadline and are abandoned when it passes
+    """
+    agent = StuckAnalyzer("analyzer_1")
+    with request_context(deadline=time.time() + 0.05):
+        message = Message("analyze_request", "coordinator_1", "analyzer_1", {"session_id": "s1"})
+    await agent.receive_message(message)
+    
+    assert message.deadline is not None
+    
+    await _run_until(agent, lambda: agent.cancelled)
+    
+    assert agent.cancelled
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_cancels_the_session():
+    """
+    Test that a session nobody waits for any more is failed and its work stopped
+    """
+    system = AgentSystem(llm_client=None)
+    analyzer = StuckAnalyzer("analyzer_1")
+    system.register_agent(analyzer)
+    system.register_agent(CoordinatorAgent("coordinator_1", llm_client=None, agent_registry=system.agents, session_store=system.session_store))
+    for agent in system.agents.values():
+        agent.send_message = system.send_message
+    
+    runner = asyncio.create_task(system.start())
+    try:
+        session_id = await system.submit_user_request("user", "x = 1", "python")
+        with pytest.raises(asyncio.TimeoutError):
+            await system.wait_for_session(session_id, timeout=0.2)
+        
+        session = await system.session_store.wait_finished(session_id, timeout=1)
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    
+    assert session["state"] == "error"
+    assert session["cancelled"] is True
+    assert analyzer.cancelled
+
+
+def test_request_timeout_header_sets_the_deadline():
+    """
+    Test that X-Request-Timeout becomes the request's deadline
+    """
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware)
+    
+    @app.get("/remaining")
+    async def remaining():
+        return {"remaining": time_remaining()}
+    
+    client = TestClient(app)
+    
+    assert client.get("/remaining").json()["remaining"] is None
+    assert 0 < client.get("/remaining", headers={"X-Request-Timeout": "5"}).json()["remaining"] <= 5
+    assert client.get("/remaining", headers={"X-Request-Timeout": "soon"}).status_code == 400
@@ -0,0 +1,55 @@
+from app.utils.parsing.chunking import chunk_code, estimate_tokens
+
+PYTHON_CODE = "\n".join(
+    f"@decorator\ndef function_{i}(x):\n    value = x * {i}\n    return value\n"
+    for i in range(20)
+)
+
+
+def test_small_code_is_a_single_chunk():
+    """
+    Test that code within the budget is not split
+    """
+    chunks = chunk_code("print('hi')\n", "python", max_tokens=100)
+    
+    assert len(chunks) == 1
+    assert chunks[0].start_line == 1
+
+
+def test_python_chunks_follow_definition_boundaries():
+    """
+    Test that chunks respect the budget, cover every line and start at a decorated definition
+    """
+    chunks = chunk_code(PYTHON_CODE, "python", max_tokens=60)
+    lines = PYTHON_CODE.split("\n")
+    
+    assert len(chunks) > 1
+    assert [line for chunk in chunks for line in chunk.lines] == lines
+    for chunk in chunks:
+        assert estimate_tokens(chunk.text) <= 60
+        assert chunk.lines[0] == "@decorator"
+        assert lines[chunk.start_line - 1] == chunk.lines[0]
+
+
+def test_javascript_chunks_keep_methods_with_their_class():
+    """
+    Test that JavaScript is split at top-level functions and classes only
+    """
+    code = "class A {\n  run() {\n    return 1;\n  }\n}\n\nfunction b() {\n  return 2;\n}\n"
+    
+    chunks = chunk_code(code, "javascript", max_tokens=12)
+    
+    assert [chunk.start_line for chunk in chunks][:2] == [1, 7]
+
+
+def test_oversized_block_is_split_by_lines():
+    """
+    Test that a single definition larger than the budget still yields bounded chunks
+    """
+    code = "def big():\n" + "\n".join(f"    x{i} = {i}" for i in range(100))
+    
+    chunks = chunk_code(code, "python", max_tokens=50)
+    
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk.text) <= 50 for chunk in chunks)
+    assert chunks[1].start_line == len(chunks[0].lines) + 1
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from app.agents.agent_system import AgentSystem
+from app.agents.base_agent import BaseAgent, Message
+from app.agents.content_store import InMemoryContentStore, content_hash
+from app.agents.coordinator_agent import CoordinatorAgent
+from app.agents.session_store import InMemorySessionStore
+from app.agents.transport import InMemoryTransport
+
+
+class RecordingAnalyzer(BaseAgent):
+    """Analyzer stand-in that records the content it received and the code it resolved."""
+    def __init__(self, agent_id: str):
+        super().__init__(agent_id, "analyzer")
+        self.received = []
+    
+    async def process_message(self, message):
+        self.received.append((message.content, await self.resolve_code(message.content)))
+        return Message(
+            message_type="analysis_result",
+            sender_id=self.agent_id,
+            recipient_id=message.sender_id,
+            content={"session_id": message.content["session_id"], "issues": []}
+        )
+
+
+def test_message_uses_slots_and_a_lazy_id():
+    """
+    Test that messages have no instance dict and only generate an ID when it is read
+    """
+    message = Message("task", "a", "b", {})
+    
+    assert not hasattr(message, "__dict__")
+    assert message._message_id is None
+    assert message.message_id == message.message_id
+    assert Message("task", "a", "b", {}, message_id="m1").message_id == "m1"
+
+
+@pytest.mark.asyncio
+async def test_content_store_releases_and_reaps_sessions():
+    """
+    Test that content is stored once per session, released on request and reaped after its TTL
+    """
+    now = [0.0]
+    store = InMemoryContentStore(ttl_seconds=10, clock=lambda: now[0])
+    
+    ref = await store.put("s1", "x = 1")
+    assert ref == content_hash("x = 1")
+    assert await store.get("s1", ref) == "x = 1"
+    
+    await store.release("s1")
+    with pytest.raises(KeyError):
+        await store.get("s1", ref)
+    
+    await store.put("s2", "y = 2")
+    now[0] = 11
+    assert store.reap() == 1
+    assert store.stats() == {"sessions": 0, "bytes": 0}
+
+
+@pytest.mark.asyncio
+async def test_agents_receive_code_by_reference():
+    """
+    Test that a submitted session's code travels as a reference and is released when the session finishes
+    """
+    content_store = InMemoryContentStore()
+    system = AgentSystem(
+        llm_client=None,
+        transport=InMemoryTransport(),
+        session_store=InMemorySessionStore(),
+        content_store=content_store
+    )
+    analyzer = RecordingAnalyzer("analyzer_1")
+    system.register_agent(analyzer)
+    system.register_agent(CoordinatorAgent("coordinator_1", llm_client=None, agent_registry=system.agents, session_store=system.session_store))
+    for agent in system.agents.values():
+        agent.send_message = system.send_message
+    
+    code = "x = 1\n" * 1000
+    runner = asyncio.create_task(system.start())
+    try:
+        session_id = await system.submit_user_request("user", code, "python")
+        session = await system.wait_for_session(session_id, timeout=2)
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    
+    [(content, resolved)] = analyzer.received
+    assert "code" not in content
+    assert content["code_ref"] == content_hash(code)
+    assert resolved == code
+    assert session["state"] == "completed"
+    assert content_store.stats()["sessions"] == 0
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.agents.base_agent import Message
+from app.agents.coordinator_agent import CoordinatorAgent
+
+
+def _coordinator() -> CoordinatorAgent:
+    coordinator = CoordinatorAgent("coordinator_1", llm_client=None, agent_registry={"analyzer_1": object()})
+    sent = []
+    
+    async def send_message(message):
+        sent.append(message)
+    
+    coordinator.send_message = send_message
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_wait_for_session_resolves_on_completion():
+    """
+    Test that waiters wake as soon as the session completes, even if they started waiting first
+    """
+    coordinator = _coordinator()
+    waiter = asyncio.create_task(coordinator.wait_for_session("s1", timeout=5))
+    await asyncio.sleep(0)
+    
+    await coordinator.process_message(Message("user_request", "user", "coordinator_1", {"session_id": "s1", "code": "x", "language": "python"}))
+    assert not waiter.done()
+    
+    await coordinator.process_message(Message("analysis_result", "analyzer_1", "coordinator_1", {"session_id": "s1", "issues": []}))
+    session = await asyncio.wait_for(waiter, timeout=1)
+    
+    assert session["state"] == "completed"
+    assert await coordinator.wait_for_session("s1", timeout=0.01) is session
+
+
+@pytest.mark.asyncio
+async def test_wait_for_session_times_out():
+    """
+    Test that waiting on an unfinished session raises after the timeout and leaves no event behind
+    """
+    coordinator = _coordinator()
+    
+    with pytest.raises(asyncio.TimeoutError):
+        await coordinator.wait_for_session("missing", timeout=0.01)
+    
+    assert coordinator.active_sessions._finished_events == {}
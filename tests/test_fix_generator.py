@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from app.agents.fix_generator_agent import FixGeneratorAgent
+
+
+class FakeLLM:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+    
+    async def generate_text(self, prompt, max_tokens=1000, temperature=0.7):
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+CODE = "a = 1\nb = 2\nprint(a / 0)\n"
+ISSUES = [
+    {"id": "i1", "type": "bug", "message": "division by zero", "line_start": 3},
+    {"id": "i2", "type": "style", "message": "unused variable", "line_start": 2},
+]
+
+
+def _edit(line: int, original: str, replacement: str) -> dict:
+    return {"start_line": line, "end_line": line, "original": original, "replacement": replacement}
+
+
+@pytest.mark.asyncio
+async def test_issues_are_fixed_in_one_batched_call():
+    """
+    Test that all issues for a file are resolved with a single prompt and merged
+    """
+    llm = FakeLLM([json.dumps({
+        "fixes": [
+            {"issue": 1, "description": "avoid zero", "edits": [_edit(3, "print(a / 0)", "print(a)")], "confidence": 0.9},
+            {"issue": 2, "description": "drop b", "edits": [_edit(2, "b = 2", "")], "confidence": 0.8},
+        ]
+    })])
+    agent = FixGeneratorAgent(agent_id="fixer", llm_client=llm)
+    
+    fixes = await agent.generate_fixes_for_issues(CODE, "python", ISSUES)
+    
+    assert len(llm.prompts) == 1
+    assert llm.prompts[0].count("print(a / 0)") == 1
+    assert [fix["issue_id"] for fix in fixes] == ["i1", "i2"]
+    assert fixes[0]["code_after"] == "a = 1\nb = 2\nprint(a)\n"
+    assert agent.merge_fixes(CODE, fixes) == "a = 1\nprint(a)\n"
+
+
+@pytest.mark.asyncio
+async def test_issues_missed_by_batch_fall_back_to_single_calls():
+    """
+    Test that issues whose batched edits are missing or stale are retried individually
+    """
+    llm = FakeLLM([
+        json.dumps({"fixes": [
+            {"issue": 1, "edits": [_edit(3, "print(a / 0)", "print(a)")]},
+            {"issue": 2, "edits": [_edit(2, "c = 3", "")]},
+        ]}),
+        json.dumps({"description": "drop b", "edits": [_edit(2, "b = 2", "")], "explanation": "", "confidence": 0.6}),
+    ])
+    agent = FixGeneratorAgent(agent_id="fixer", llm_client=llm)
+    
+    fixes = await agent.generate_fixes_for_issues(CODE, "python", ISSUES)
+    
+    assert len(llm.prompts) == 2
+    assert [fix["issue_id"] for fix in fixes] == ["i1", "i2"]
+    assert fixes[1]["code_after"] == "a = 1\nprint(a / 0)\n"
+
+
+@pytest.mark.asyncio
+async def test_whole_file_is_requested_only_when_edits_fail():
+    """
+    Test that a single issue falls back to whole-file output when its edits do not apply
+    """
+    llm = FakeLLM([
+        json.dumps({"description": "fix", "edits": [_edit(9, "missing", "x")]}),
+        json.dumps({"description": "fix", "fixed_code": "a = 1\n", "explanation": "rewrote"}),
+    ])
+    agent = FixGeneratorAgent(agent_id="fixer", llm_client=llm)
+    
+    fixes = await agent.generate_fixes_for_issues(CODE, "python", ISSUES[:1])
+    
+    assert "ENTIRE fixed file" in llm.prompts[1]
+    assert fixes[0]["code_after"] == "a = 1\n"
+    assert fixes[0]["edits"] == []
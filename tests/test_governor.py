@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.core.request_context import PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from app.services.ai.governor import LLMGovernor, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_lanes_are_served_first():
+    """
+    Test that queued interactive calls overtake queued background and batch calls
+    """
+    governor = LLMGovernor(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+    order = []
+    release = asyncio.Event()
+
+    async def call(name, priority):
+        async with governor.acquire(priority):
+            order.append(name)
+            if name == "first":
+                await release.wait()
+
+    first = asyncio.create_task(call("first", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(call("batch", PRIORITY_BATCH)),
+        asyncio.create_task(call("background", PRIORITY_BACKGROUND)),
+        asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+
+    assert governor.get_stats()["lanes"][PRIORITY_BATCH]["waiting"] == 1
+
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert order == ["first", "interactive", "background", "batch"]
+    assert governor.get_stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    """
+    Test that cancelling a queued call leaves capacity for the next one
+    """
+    governor = LLMGovernor(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+    release = asyncio.Event()
+
+    async def hold():
+        async with governor.acquire():
+            await release.wait()
+
+    async def quick():
+        async with governor.acquire():
+            return "ok"
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(quick())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+    await holder
+
+    assert await asyncio.wait_for(quick(), timeout=1) == "ok"
+    assert governor.get_stats()["active"] == 0
+
+
+def test_token_bucket_reconciles_actual_usage():
+    """
+    Test that refunds and overruns are applied to the bucket balance
+    """
+    bucket = TokenBucket(600)
+
+    bucket.consume(500)
+    assert bucket.time_until_available(500) > 0
+
+    bucket.adjust(-400)
+    assert bucket.time_until_available(500) == 0
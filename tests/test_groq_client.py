@@ -0,0 +1,198 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.ai import http_transport
+from app.services.ai.groq_client import GroqClient
+
+
+def _completion(content: str) -> dict:
+    return {"choices": [{"message": {"content": content}}], "usage": {"total_tokens": 10}}
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_clients_share_pooled_transport():
+    """
+    Test that separate GroqClient instances reuse the process-wide HTTP client
+    """
+    first = GroqClient(api_key="test-key")
+    second = GroqClient(api_key="test-key")
+
+    assert first.http_client is second.http_client
+    assert first.http_client is http_transport.get_http_client()
+
+
+@pytest.mark.asyncio
+async def test_generate_text_uses_http_client():
+    """
+    Test that completions go through the injected HTTP client
+    """
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, json=_completion("hello"))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    text = await client.generate_text("Say hello")
+
+    assert text == "hello"
+    assert len(calls) == 1
+    assert calls[0]["messages"][-1]["content"] == "Say hello"
+
+
+@pytest.mark.asyncio
+async def test_low_temperature_calls_are_cached(monkeypatch):
+    """
+    Test that identical low-temperature analysis calls reach the provider once
+    """
+    from app.services.ai import groq_client as groq_module
+    from app.services.ai.fragment_cache import FragmentCache
+    from app.services.ai.response_cache import ResponseCache
+
+    monkeypatch.setattr(groq_module, "response_cache", ResponseCache(max_entries=8, ttl_seconds=60))
+    monkeypatch.setattr(groq_module, "fragment_cache", FragmentCache(max_entries=0))
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=_completion(json.dumps({"issues": []})))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+
+    assert await client.analyze_code("x = 1", "python") == []
+    assert await client.analyze_code("x = 1", "python") == []
+    assert len(calls) == 1
+
+    await client.analyze_code("x = 1", "python", bypass_cache=True)
+    assert len(calls) == 2
+
+
+def _sse_body(*deltas: str) -> bytes:
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": delta}}]})
+        for delta in deltas
+    ]
+    lines.append("data: " + json.dumps({"choices": [], "x_groq": {"usage": {"total_tokens": 12}}}))
+    lines.append("data: [DONE]")
+    return ("\n\n".join(lines) + "\n\n").encode()
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_yields_deltas():
+    """
+    Test that streamed completions yield content deltas in order
+    """
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            content=_sse_body("Hel", "lo"),
+            headers={"Content-Type": "text/event-stream"}
+        )
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    deltas = [delta async for delta in client.stream_completion("Say hello")]
+
+    assert deltas == ["Hel", "lo"]
+    assert sent[0]["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_stream_patch_ends_with_parsed_result():
+    """
+    Test that streamed patches end with the same parsed shape as generate_patch
+    """
+    body = json.dumps({"patch": "@@ -1 +1 @@\n-a\n+b", "explanation": "swap", "can_auto_apply": True})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "response_format" not in json.loads(request.content)
+        return httpx.Response(200, content=_sse_body(body[:10], body[10:]))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    events = [event async for event in client.stream_patch("a", "python", "use b")]
+
+    assert [event["type"] for event in events] == ["delta", "delta", "result"]
+    assert events[-1]["result"] == {"patch": "@@ -1 +1 @@\n-a\n+b", "explanation": "swap", "can_auto_apply": True}
+
+
+@pytest.mark.asyncio
+async def test_patch_that_does_not_apply_is_not_auto_applicable():
+    """
+    Test that can_auto_apply is cleared when the model's diff does not match the original code
+    """
+    body = json.dumps({"patch": "@@ -1 +1 @@\n-c\n+b", "explanation": "swap", "can_auto_apply": True})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_completion(body))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    result = await client.generate_patch("a", "python", "use b", bypass_cache=True)
+
+    assert result["can_auto_apply"] is False
+
+
+@pytest.mark.asyncio
+async def test_large_files_are_analyzed_in_chunks(monkeypatch):
+    """
+    Test that chunked analysis remaps line numbers and keeps issue ids unique
+    """
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "LLM_ANALYSIS_CHUNK_TOKENS", 10)
+    code = "def first():\n    return 1 / 0\n\n\ndef second():\n    return 2 / 0\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        issue = {"id": "issue-1", "type": "bug", "severity": "high", "message": "zero", "line_start": 2, "line_end": 2}
+        return httpx.Response(200, json=_completion(json.dumps({"issues": [issue]})))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    issues = await client.analyze_code(code, "python", bypass_cache=True)
+
+    assert [issue.line_start for issue in issues] == [2, 6]
+    assert len({issue.id for issue in issues}) == 2
+
+
+@pytest.mark.asyncio
+async def test_resubmission_only_analyzes_changed_fragments(monkeypatch):
+    """
+    Test that unchanged functions are served from the fragment cache with their issues moved to the new lines
+    """
+    from app.services.ai import groq_client as groq_module
+    from app.services.ai.fragment_cache import FragmentCache
+    from app.services.ai.response_cache import ResponseCache
+
+    monkeypatch.setattr(groq_module, "response_cache", ResponseCache(max_entries=8, ttl_seconds=60))
+    monkeypatch.setattr(groq_module, "fragment_cache", FragmentCache(max_entries=16))
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        prompts.append(prompt)
+        issues = []
+        if "x / y" in prompt:
+            issues.append({"id": "issue-1", "type": "bug", "severity": "medium", "message": "divide", "line_start": 2})
+        elif "1 / 0" in prompt:
+            issues.append({"id": "issue-1", "type": "bug", "severity": "high", "message": "zero", "line_start": 5, "line_end": 5})
+        return httpx.Response(200, json=_completion(json.dumps({"issues": issues})))
+
+    client = GroqClient(api_key="test-key", http_client=_mock_client(handler))
+    original = "import math\n\n\ndef first():\n    return 1 / 0\n\n\ndef second(x):\n    return x\n"
+    changed = "import math\nimport os\n\n\ndef first():\n    return 1 / 0\n\n\ndef second(x, y):\n    return x / y\n"
+
+    assert [issue.line_start for issue in await client.analyze_code(original, "python")] == [5]
+    issues = await client.analyze_code(changed, "python")
+
+    assert len(prompts) == 3
+    assert not any("1 / 0" in prompt for prompt in prompts[1:])
+    assert [(issue.message, issue.line_start, issue.line_end) for issue in issues] == [("zero", 6, 6), ("divide", 10, None)]
+    assert len({issue.id for issue in issues}) == 2
+
+    assert await client.analyze_code(changed, "python") == issues
+    assert len(prompts) == 3
@@ -0,0 +1,67 @@
+from app.utils.issue_merging import merge_issues, message_tokens
+
+
+def _issue(message, line_start, line_end=None, type="bug", severity="medium", confidence=0.9):
+    return {
+        "type": type, "message": message, "line_start": line_start, "line_end": line_end or line_start,
+        "severity": severity, "confidence": confidence
+    }
+
+
+def test_message_tokens_are_normalized():
+    """
+    Test that CamelCase, underscores, plurals, numbers and stopwords are normalized away
+    """
+    assert message_tokens("Runtime error: ZeroDivisionError on line 3") == {"zero", "division"}
+    assert message_tokens("unused_imports found") == {"unused", "import", "found"}
+
+
+def test_same_bug_from_every_stage_is_merged():
+    """
+    Test that differently worded reports of one bug become one issue with merged severity and confidence
+    """
+    issues = merge_issues([
+        _issue("Division by zero always raises ZeroDivisionError", 5, type="division_by_zero", severity="high"),
+        _issue("Runtime error: ZeroDivisionError: division by zero", 1, 12, type="runtime", severity="critical"),
+        _issue("Dividing by zero will raise a ZeroDivisionError", 5, 6, confidence=0.5),
+    ])
+    
+    assert len(issues) == 1
+    assert issues[0]["message"] == "Division by zero always raises ZeroDivisionError"
+    assert (issues[0]["line_start"], issues[0]["line_end"]) == (5, 5)
+    assert issues[0]["severity"] == "critical"
+    assert issues[0]["confidence"] == 0.995
+
+
+def test_distinct_or_distant_issues_are_kept():
+    """
+    Test that unrelated issues on one line and identical messages on other lines stay separate,
+    while a rewording of the same finding is merged across types
+    """
+    unused = "Local variable 'x' is assigned but never used"
+    issues = merge_issues([
+        _issue(unused, 2, type="unused_variable"),
+        _issue("Division by zero always raises ZeroDivisionError", 2, type="division_by_zero"),
+        _issue(unused, 9, type="unused_variable"),
+        _issue("Variable x is never used", 2, type="style"),
+    ])
+    
+    assert [(issue["type"], issue["line_start"]) for issue in issues] == [
+        ("unused_variable", 2), ("division_by_zero", 2), ("unused_variable", 9)
+    ]
+
+
+def test_overlapping_chain_merges_through_the_interval_index():
+    """
+    Test that an issue overlapping a merged group's widened range joins it
+    """
+    issues = merge_issues([
+        _issue("Possible null dereference of user", 1, 4),
+        _issue("user may be None here: null dereference", 4, 8),
+        _issue("Null dereference of user object", 7),
+        _issue("Null dereference of user object", 20),
+    ])
+    
+    assert [(issue["message"], issue["line_start"]) for issue in issues] == [
+        ("Possible null dereference of user", 7), ("Null dereference of user object", 20)
+    ]
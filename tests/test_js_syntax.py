@@ -0,0 +1,83 @@
+import pytest
+
+from app.agents.analyzer_agent import AnalyzerAgent
+from app.utils.parsing.javascript_parser import JavaScriptParser
+
+CODE = """import { Base } from './base';
+const fs = require('fs');
+
+const banner = "function fake() { return 1; }";
+const pattern = /\\/\\*[^/]*/g;
+
+class Widget extends Base {
+  static create(value) {
+    return new Widget(value);
+  }
+
+  render(target) {
+    return `<p>${target.map((item) => `${item}`)}</p>`;
+  }
+}
+
+const double = (x) => x * 2;
+"""
+
+
+def test_strings_comments_and_templates_do_not_produce_definitions():
+    """
+    Test that only real functions, methods and classes are found, with their lines
+    """
+    parsed = JavaScriptParser().parse(CODE)
+    
+    assert "error" not in parsed
+    assert [(f["name"], f["type"], f["line"]) for f in parsed["functions"]] == [
+        ("create", "method", 8), ("render", "method", 12), ("double", "arrow", 17)
+    ]
+    assert parsed["classes"] == [
+        {"name": "Widget", "line": 7, "end_line": 15, "parent": "Base", "methods": ["create", "render"], "top_level": True}
+    ]
+    assert parsed["imports"] == ["import { Base } from './base'", "const fs = require('fs')"]
+
+
+@pytest.mark.parametrize("code", [
+    "let a = 1;\nlet b = a++ / 2;\n",
+    "let i = 4;\ni-- / 2;\n",
+    "const r = items[0]++ / 2 + (n)-- / 3;\n",
+])
+def test_division_after_postfix_increment_is_not_a_regex(code):
+    """
+    Test that a "/" after a postfix ++ or -- is read as division
+    """
+    assert "error" not in JavaScriptParser().parse(code)
+
+
+@pytest.mark.parametrize("code, line, column, message", [
+    ("const s = 'abc;\nrun();\n", 1, 11, "Unterminated string constant"),
+    ("function a() {\n  return [1, 2);\n}\n", 2, 15, "Unexpected token ')'"),
+    ("function a() {\n  if (x) {\n    return 1;\n}\n", 1, 14, "Unexpected end of input"),
+    ("let t = `abc ${x}\n", 1, 17, "Unterminated template literal"),
+    ("function (a {}\n", 1, 10, "Unexpected end of input"),
+    ("function f {\n}\n", 1, 12, "Unexpected token: expected '('"),
+])
+def test_syntax_errors_are_reported_with_line_and_column(code, line, column, message):
+    """
+    Test that scanning and bracket errors are located
+    """
+    error = JavaScriptParser().parse(code)["error"]
+    
+    assert (error["line"], error["column"]) == (line, column)
+    assert error["message"].startswith(message)
+
+
+@pytest.mark.asyncio
+async def test_static_analysis_reports_javascript_syntax_errors():
+    """
+    Test that the analyzer's static stage catches JavaScript syntax errors locally
+    """
+    analyzer = AnalyzerAgent("analyzer_1", llm_client=None)
+    
+    issues = await analyzer.perform_static_analysis("const s = 'abc;\n", "javascript")
+    
+    assert len(issues) == 1
+    assert issues[0]["type"] == "syntax"
+    assert issues[0]["line_start"] == 1
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents.fix_generator_agent import FixGeneratorAgent
+from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.static_analysis.fixers import find_local_fix
+
+
+def _syntax_issue(code: str, language: str = "python") -> dict:
+    error = get_parser_for_language(language).parse_module(code).syntax_issues()[0]
+    return {"type": "syntax", "message": error["message"], "line_start": error["line"], "column_start": error["column"]}
+
+
+@pytest.mark.parametrize("code, language, fixed", [
+    ("def f(x):\nreturn x\n", "python", "def f(x):\n    return x\n"),
+    ("def f(x):\n    y = 1\n        return y\n", "python", "def f(x):\n    y = 1\n    return y\n"),
+    ("def f(x):\n    if x:\n        y = 1\n      return x\n", "python", "def f(x):\n    if x:\n        y = 1\n    return x\n"),
+    ("print(len([1, 2)\nx = 3\n", "python", "print(len([1, 2]))\nx = 3\n"),
+    ("x = (1, 2))\n", "python", "x = (1, 2)\n"),
+    ("function a() {\n  if (x) {\n    return 1;\n}\n", "javascript", "function a() {\n  if (x) {\n    return 1;\n}\n}\n"),
+    ("const s = foo(1, bar(2);\n", "javascript", "const s = foo(1, bar(2));\n"),
+    ("function f() {\n  return [1, 2;\n}\n", "javascript", "function f() {\n  return [1, 2];\n}\n"),
+    ("function f() {\n  g(h[1;\n}\n", "javascript", "function f() {\n  g(h[1]);\n}\n"),
+])
+def test_syntax_errors_are_fixed_and_reparse(code, language, fixed):
+    """
+    Test indentation repair and bracket balancing, verified by re-parsing
+    """
+    fix = find_local_fix(code, language, _syntax_issue(code, language))
+    
+    assert fix.code_after == fixed
+    assert get_parser_for_language(language).parse_module(fix.code_after).ok
+
+
+@pytest.mark.parametrize("code, issue, fixed", [
+    (
+        '"""Paths."""\nimport os\n\n\ndef f(p):\n    return Path(p)\n',
+        {"type": "undefined_name", "message": "Undefined name 'Path'", "line_start": 6, "column_start": 12},
+        '"""Paths."""\nimport os\nfrom pathlib import Path\n\n\ndef f(p):\n    return Path(p)\n',
+    ),
+    (
+        "from typing import Dict\n\nx: List[int] = []\n",
+        {"type": "undefined_name", "message": "Undefined name 'List'", "line_start": 3, "column_start": 4},
+        "from typing import Dict, List\n\nx: List[int] = []\n",
+    ),
+    (
+        "def total(values):\n    count = len(values)\n    return sum(values) / coutn\n",
+        {"type": "runtime", "message": "Runtime error: NameError: name 'coutn' is not defined", "line_start": 3},
+        "def total(values):\n    count = len(values)\n    return sum(values) / count\n",
+    ),
+])
+def test_undefined_names_are_imported_or_corrected(code, issue, fixed):
+    """
+    Test import insertion and closest-name suggestions
+    """
+    assert find_local_fix(code, "python", issue).code_after == fixed
+
+
+def test_unfixable_issues_are_left_alone():
+    """
+    Test that issues without a fixer, or without a candidate that parses, produce no fix
+    """
+    assert find_local_fix("x = 1\n", "python", {"type": "logic", "message": "wrong", "line_start": 1}) is None
+    assert find_local_fix("x = 1\n", "python", {"type": "undefined_name", "message": "Undefined name 'qqzzy'", "line_start": 1}) is None
+    
+    # A multi-line JavaScript literal has no statement end to close it at
+    code = "function f() {\n  const a = [\n    1,\n}\n"
+    assert find_local_fix(code, "javascript", _syntax_issue(code, "javascript")) is None
+
+
+def test_languages_without_a_parser_are_not_validated_as_python(monkeypatch):
+    """
+    Test that Java is neither "fixed" by the Python fixers nor rejected as a Python syntax error
+    """
+    from app.core.config import settings
+    from app.services.fix_service import validate_fix
+    
+    monkeypatch.setattr(settings, "USE_DOCKER_SANDBOX", False)
+    java = "class A {\n    int f() {\n        return 1;\n    }\n}\n"
+    
+    assert find_local_fix(java, "java", {"type": "syntax", "message": "invalid syntax", "line_start": 1}) is None
+    assert asyncio.run(validate_fix(java, java, "java"))[0] is True
+    assert asyncio.run(validate_fix("x = (", "x = (", "python"))[0] is False
+
+
+@pytest.mark.asyncio
+async def test_fix_generator_uses_local_fixes_before_the_llm():
+    """
+    Test that locally fixable issues never reach the LLM and stay within the time budget
+    """
+    class NoLLM:
+        async def generate_text(self, prompt, max_tokens=1000, temperature=0.7):
+            raise AssertionError("the LLM should not be called")
+    
+    code = "def f(x):\nreturn sys.argv\n"
+    issues = [_syntax_issue(code)]
+    agent = FixGeneratorAgent(agent_id="fixer", llm_client=NoLLM())
+    
+    started = time.perf_counter()
+    fixes = await agent.generate_fixes_for_issues(code, "python", issues)
+    
+    assert time.perf_counter() - started < 0.05
+    assert fixes[0]["code_after"] == "def f(x):\n    return sys.argv\n"
+    assert agent.merge_fixes(code, fixes) == fixes[0]["code_after"]
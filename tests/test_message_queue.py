@@ -0,0 +1,81 @@
+import pytest
+
+from app.agents.agent_system import AgentSystem
+from app.agents.base_agent import Message
+from app.agents.message_queue import AgentOverloadedError, PriorityMessageQueue
+from app.core.config import settings
+from app.core.request_context import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+
+
+def make_message(message_type: str, priority: str = None) -> Message:
+    return Message(
+        message_type=message_type,
+        sender_id="test",
+        recipient_id="coordinator_1",
+        content={"priority": priority} if priority else {}
+    )
+
+
+@pytest.mark.asyncio
+async def test_queue_serves_results_before_work_and_interactive_before_batch():
+    """
+    Test that messages come out by class, then priority, then arrival order
+    """
+    queue = PriorityMessageQueue()
+    batch_request = make_message("user_request", PRIORITY_BATCH)
+    interactive_request = make_message("user_request", PRIORITY_INTERACTIVE)
+    work = make_message("analyze_request", PRIORITY_BATCH)
+    result = make_message("analysis_result")
+    error = make_message("error")
+    
+    for message in [batch_request, interactive_request, work, result, error]:
+        await queue.put(message)
+    
+    assert queue.backlog == 3
+    
+    order = [await queue.get() for _ in range(5)]
+    
+    assert order == [error, result, work, interactive_request, batch_request]
+    assert queue.backlog == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_user_request_sheds_batch_before_interactive(monkeypatch):
+    """
+    Test that admission control refuses lower priorities first and counts rejections
+    """
+    monkeypatch.setattr(settings, "AGENT_MAX_BACKLOG", 4)
+    monkeypatch.setattr(settings, "AGENT_OVERLOAD_RETRY_AFTER", 7)
+    system = AgentSystem(llm_client=None)
+    
+    for _ in range(2):
+        await system.submit_user_request("user", "x = 1", "python", priority=PRIORITY_BATCH)
+    
+    with pytest.raises(AgentOverloadedError) as exc_info:
+        await system.submit_user_request("user", "x = 1", "python", priority=PRIORITY_BATCH)
+    assert exc_info.value.retry_after == 7
+    
+    # Interactive requests may still use the rest of the backlog
+    for _ in range(2):
+        await system.submit_user_request("user", "x = 1", "python", priority=PRIORITY_INTERACTIVE)
+    
+    with pytest.raises(AgentOverloadedError):
+        await system.submit_user_request("user", "x = 1", "python", priority=PRIORITY_INTERACTIVE)
+    
+    stats = system.get_queue_stats()
+    assert stats["backlog"] == 4
+    assert stats["rejected"][PRIORITY_BATCH] == 1
+    assert stats["rejected"][PRIORITY_INTERACTIVE] == 1
+
+
+@pytest.mark.asyncio
+async def test_overload_maps_to_503_with_retry_after():
+    """
+    Test that the HTTP layer turns an overload into 503 with Retry-After
+    """
+    from app.main import agent_overloaded_handler
+    
+    response = await agent_overloaded_handler(None, AgentOverloadedError("busy", retry_after=5))
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,55 @@
+import ast
+
+from app.utils.parsing.parse_cache import ParseCache, parse_cache
+from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.parsing.parsed_module import ParsedModule
+
+
+def test_parsers_are_shared_singletons():
+    """
+    Test that the factory returns one shared instance per parser class
+    """
+    assert get_parser_for_language("python") is get_parser_for_language("Python")
+    assert get_parser_for_language("cobol") is get_parser_for_language("python")
+    assert get_parser_for_language("javascript") is not get_parser_for_language("python")
+
+
+def test_same_code_is_parsed_once_across_consumers(monkeypatch):
+    """
+    Test that a second parse of the same code is a cache hit and reuses the module
+    """
+    calls = []
+    real_parse = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda code, *args, **kwargs: calls.append(code) or real_parse(code, *args, **kwargs))
+    parse_cache.clear()
+    before = parse_cache.get_stats()
+    code = "def cached_once(x):\n    return x + 1\n"
+    
+    parser = get_parser_for_language("python")
+    first = parser.parse_module(code)
+    parser.extract_functions(code)
+    parser.process_fix_result(code)
+    
+    stats = parse_cache.get_stats()
+    assert calls == [code]
+    assert parser.parse_module(code) is first
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 2
+
+
+def test_parse_cache_evicts_least_recently_used():
+    """
+    Test LRU eviction and the reported stats
+    """
+    cache = ParseCache(max_entries=2)
+    parse = lambda code: ParsedModule(language="text", line_count=1, char_count=len(code))
+    
+    a = cache.get_or_parse("text", "a", parse)
+    cache.get_or_parse("text", "b", parse)
+    assert cache.get_or_parse("text", "a", parse) is a
+    cache.get_or_parse("text", "c", parse)
+    
+    assert cache.get_or_parse("text", "a", parse) is a
+    assert cache.get_stats() == {
+        "hits": 2, "misses": 3, "evictions": 1, "hit_rate": 0.4, "entries": 2, "max_entries": 2
+    }
@@ -0,0 +1,82 @@
+import ast
+
+import pytest
+
+from app.utils.parsing.python_parser import PythonParser
+
+CODE = '''"""Module docstring."""
+import os
+from typing import List
+
+
+@decorator
+def top(a, b):
+    """Top-level function."""
+    def inner():
+        pass
+    return inner
+
+
+class Widget(Base):
+    async def run(self):
+        return os.getcwd()
+'''
+
+
+def test_python_module_is_parsed_once(monkeypatch):
+    """
+    Test that parsing a module costs a single ast.parse and finds all of its structure
+    """
+    calls = []
+    original = ast.parse
+    
+    def counting_parse(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+    
+    monkeypatch.setattr(ast, "parse", counting_parse)
+    module = PythonParser().parse_module(CODE)
+    
+    assert len(calls) == 1
+    assert module.ok
+    assert module.docstring == "Module docstring."
+    assert module.imports == ("import os", "from typing import List")
+    assert [(f.name, f.top_level, f.parent) for f in module.functions] == [
+        ("top", True, None), ("inner", False, None), ("run", False, "Widget")
+    ]
+    assert module.functions[0].span == (7, 11)
+    assert module.functions[0].docstring == "Top-level function."
+    assert module.functions[2].is_async
+    assert [d.name for d in module.top_level_definitions] == ["top", "Widget"]
+
+
+def test_parsed_module_is_immutable_and_keeps_the_parse_format():
+    """
+    Test that the module cannot be modified and converts to the dictionary parse() returns
+    """
+    parser = PythonParser()
+    module = parser.parse_module(CODE)
+    
+    with pytest.raises(AttributeError):
+        module.error = {"message": "changed"}
+    with pytest.raises(AttributeError):
+        module.functions[0].name = "changed"
+    
+    parsed = parser.parse(CODE)
+    assert parsed["ast_type"] == "Module"
+    assert parsed["functions"][0] == {"name": "top", "line": 7, "args": ["a", "b"], "decorators": ["decorator"]}
+    assert parsed["classes"] == [{"name": "Widget", "line": 14, "methods": ["run"], "bases": ["Base"]}]
+
+
+def test_syntax_errors_are_reported_from_the_module():
+    """
+    Test that a syntax error yields no definitions, a located error and regex-found imports
+    """
+    module = PythonParser().parse_module("import os\ndef broken(:\n    pass\n")
+    
+    assert not module.ok
+    assert module.functions == ()
+    assert module.imports == ("import os",)
+    [issue] = module.syntax_issues()
+    assert issue["line"] == 2
+    assert issue["type"] == "SyntaxError"
@@ -0,0 +1,71 @@
+import pytest
+
+from app.utils.patching import (
+    Hunk, PatchApplyError, apply_hunks, hunks_from_edits, merge_hunks, parse_unified_diff
+)
+
+CODE = "def f(x):\n    y = x + 1\n    return y\n\nprint(f(1))\n"
+
+
+def test_edits_are_validated_and_applied():
+    """
+    Test that line-anchored edits replace exactly the lines they name
+    """
+    hunks = hunks_from_edits([
+        {"start_line": 2, "end_line": 2, "original": "    y = x + 1", "replacement": "    y = x + 2"}
+    ])
+    
+    assert apply_hunks(CODE, hunks) == CODE.replace("x + 1", "x + 2")
+
+
+def test_blank_line_edits_are_distinguished_from_deletions():
+    """
+    Test that "\\n" replaces with a blank line, "" deletes, and an empty one-line original is a blank line
+    """
+    replace_blank = hunks_from_edits([{"start_line": 4, "end_line": 4, "original": "", "replacement": "# end"}])
+    to_blank = hunks_from_edits([{"start_line": 2, "end_line": 2, "original": "    y = x + 1", "replacement": "\n"}])
+    deleted = hunks_from_edits([{"start_line": 2, "end_line": 2, "original": "    y = x + 1", "replacement": ""}])
+    
+    assert apply_hunks(CODE, replace_blank) == CODE.replace("\n\nprint", "\n# end\nprint")
+    assert apply_hunks(CODE, to_blank) == CODE.replace("    y = x + 1", "")
+    assert apply_hunks(CODE, deleted) == CODE.replace("    y = x + 1\n", "")
+    with pytest.raises(PatchApplyError):
+        hunks_from_edits([{"start_line": 2, "end_line": 3, "original": "", "replacement": "pass"}])
+
+
+def test_misnumbered_hunk_is_relocated_by_its_original_lines():
+    """
+    Test that a hunk whose line number is slightly off still lands on the right lines
+    """
+    assert apply_hunks(CODE, [Hunk(4, ["    return y"], ["    return y * 2"])]) == CODE.replace("return y", "return y * 2")
+
+
+def test_context_mismatch_is_rejected():
+    """
+    Test that hunks whose original lines are not in the file raise PatchApplyError
+    """
+    with pytest.raises(PatchApplyError):
+        apply_hunks(CODE, [Hunk(2, ["    z = 0"], ["    z = 1"])])
+
+
+def test_unified_diff_is_applied():
+    """
+    Test that unified diffs parse into hunks that validate their context lines
+    """
+    diff = "--- a.py\n+++ b.py\n@@ -1,3 +1,3 @@\n def f(x):\n-    y = x + 1\n+    y = x - 1\n     return y\n"
+    
+    assert apply_hunks(CODE, parse_unified_diff(diff)) == CODE.replace("x + 1", "x - 1")
+
+
+def test_merge_skips_overlapping_fixes():
+    """
+    Test that fixes touching the same lines are not merged, while independent ones are
+    """
+    first = [Hunk(2, ["    y = x + 1"], ["    y = x + 2"])]
+    conflicting = [Hunk(2, ["    y = x + 1"], ["    y = 0"])]
+    independent = [Hunk(5, ["print(f(1))"], ["print(f(2))"])]
+    
+    merged, applied = merge_hunks(CODE, [first, conflicting, independent])
+    
+    assert applied == [0, 2]
+    assert merged == CODE.replace("x + 1", "x + 2").replace("f(1)", "f(2)")
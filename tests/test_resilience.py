@@ -0,0 +1,144 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.request_context import request_context
+from app.services.ai import resilience
+from app.services.ai.groq_client import GroqClient
+from app.services.ai.resilience import (
+    CircuitBreaker, CircuitOpenError, GroqAPIError, RetryBudgets, parse_retry_after
+)
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    """Retry without sleeping and with a fresh breaker and budgets"""
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(resilience, "llm_circuit_breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    monkeypatch.setattr(resilience, "llm_retry_budgets", RetryBudgets(retries_per_session=1))
+
+
+def _client(responses, requests=None) -> GroqClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        return responses.pop(0)
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return GroqClient(api_key="test-key", http_client=http_client)
+
+
+def _ok() -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+
+def test_parse_retry_after():
+    """
+    Test Retry-After parsing for seconds, HTTP dates and garbage
+    """
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_circuit_breaker_opens_and_probes():
+    """
+    Test the closed -> open -> half-open -> closed transitions
+    """
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(fast_retries):
+    """
+    Test that a 503 followed by a success returns the successful completion
+    """
+    client = _client([httpx.Response(503, headers={"Retry-After": "0"}), _ok()])
+
+    assert await client.generate_text("hi") == "ok"
+    assert resilience.llm_circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(fast_retries):
+    """
+    Test that a 400 fails immediately with a typed error
+    """
+    client = _client([httpx.Response(400, text="bad request"), _ok()])
+
+    with pytest.raises(GroqAPIError) as exc_info:
+        await client.generate_text("hi")
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_session_retry_budget_and_breaker(fast_retries):
+    """
+    Test that a session's retry budget caps retries and repeated failures open the circuit
+    """
+    client = _client([httpx.Response(503), httpx.Response(503), httpx.Response(503)])
+
+    with request_context(session_id="session-1"):
+        with pytest.raises(GroqAPIError):
+            await client.generate_text("hi")
+
+    assert resilience.llm_circuit_breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await client.generate_text("hi")
+
+
+@pytest.mark.asyncio
+async def test_session_retry_budget_applies_inside_single_flight(fast_retries, monkeypatch):
+    """
+    Test that retries of a coalesced call are charged to the calling session's budget
+    """
+    monkeypatch.setattr(resilience, "llm_circuit_breaker", CircuitBreaker(failure_threshold=10, reset_timeout=60))
+    requests = []
+    client = _client([httpx.Response(503) for _ in range(settings.LLM_MAX_RETRIES + 1)], requests)
+    payload = {"model": "test-model", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.7}
+
+    with request_context(session_id="sess-1"):
+        with pytest.raises(GroqAPIError):
+            await client._call_api("chat/completions", payload)
+
+    # One attempt plus the single retry the session's budget allows
+    assert len(requests) == 2
+    assert not resilience.llm_retry_budgets.try_spend("sess-1")
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_releases_half_open_probe(monkeypatch):
+    """
+    Test that a probe failing with a non-provider error does not leave the breaker rejecting every call
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(resilience, "llm_circuit_breaker", breaker)
+
+    async def broken():
+        raise RuntimeError("bug outside the provider call")
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await resilience.call_with_resilience(broken)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    assert await resilience.call_with_resilience(ok) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
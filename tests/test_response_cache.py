@@ -0,0 +1,75 @@
+import pytest
+
+from app.services.ai.response_cache import ResponseCache, make_cache_key
+
+
+def _payload(**overrides) -> dict:
+    payload = {
+        "model": "llama3-70b-8192",
+        "messages": [{"role": "user", "content": "print(1/0)"}],
+        "temperature": 0.2,
+        "max_tokens": 4000,
+        "response_format": {"type": "json_object"},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_cache_key_is_canonical():
+    """
+    Test that key order does not matter but payload content does
+    """
+    payload = _payload()
+    reordered = dict(reversed(list(payload.items())))
+
+    assert make_cache_key(payload) == make_cache_key(reordered)
+    assert make_cache_key(payload) != make_cache_key(_payload(max_tokens=100))
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_lru_eviction():
+    """
+    Test that the memory tier evicts the least recently used entry
+    """
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+
+    await cache.set("a", {"value": 1})
+    await cache.set("b", {"value": 2})
+    assert await cache.get("a") == {"value": 1}
+
+    await cache.set("c", {"value": 3})
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == {"value": 1}
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_not_served():
+    """
+    Test that entries past their TTL count as misses
+    """
+    cache = ResponseCache(max_entries=2, ttl_seconds=-1)
+
+    await cache.set("a", {"value": 1})
+
+    assert await cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_new_instance(tmp_path):
+    """
+    Test that the SQLite tier serves entries written by another cache instance
+    """
+    db_path = str(tmp_path / "llm_cache.db")
+    writer = ResponseCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+    await writer.set("a", {"value": 1})
+
+    reader = ResponseCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+
+    assert await reader.get("a") == {"value": 1}
+    assert reader.get_stats()["disk_hits"] == 1
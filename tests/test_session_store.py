@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.agents.base_agent import Message
+from app.agents.content_store import InMemoryContentStore, content_hash
+from app.agents.coordinator_agent import CoordinatorAgent
+from app.agents.session_store import InMemorySessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_finished_sessions_expire_before_in_flight_ones():
+    """
+    Test that finished sessions use the short TTL and in-flight ones the long one
+    """
+    clock = FakeClock()
+    store = InMemorySessionStore(ttl_seconds=10, active_ttl_seconds=100, max_entries=10, clock=clock)
+    store["done"] = {"state": "completed"}
+    store["running"] = {"state": "analyzing"}
+    
+    clock.now = 11
+    assert "done" not in store
+    assert "running" in store
+    
+    assert store.reap() == 1
+    assert list(store) == ["running"]
+    assert store.stats()["expired"] == 1
+
+
+def test_capacity_evicts_least_recently_used_finished_sessions():
+    """
+    Test that max_entries evicts finished sessions in LRU order and keeps in-flight ones
+    """
+    store = InMemorySessionStore(ttl_seconds=10, active_ttl_seconds=100, max_entries=2, clock=FakeClock())
+    store["a"] = {"state": "completed"}
+    store["b"] = {"state": "completed"}
+    store["a"]  # a is now more recently used than b
+    
+    store["c"] = {"state": "analyzing"}
+    
+    assert set(store) == {"a", "c"}
+    
+    store["d"] = {"state": "analyzing"}
+    store["e"] = {"state": "analyzing"}
+    
+    # Only in-flight sessions are left, which are never evicted for capacity
+    assert set(store) == {"c", "d", "e"}
+    assert store.stats()["evicted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_coordinator_compacts_finished_sessions():
+    """
+    Test that finished session records drop the submitted code and release it from the content store
+    """
+    coordinator = CoordinatorAgent("coordinator_1", llm_client=None, agent_registry={"analyzer_1": object()})
+    coordinator.content_store = InMemoryContentStore()
+    
+    async def send_message(message):
+        pass
+    
+    coordinator.send_message = send_message
+    
+    await coordinator.process_message(Message("user_request", "user", "coordinator_1", {"session_id": "s1", "code": "x = 1", "language": "python"}))
+    assert coordinator.active_sessions["s1"]["code_ref"] == content_hash("x = 1")
+    assert await coordinator.resolve_code({"session_id": "s1", "code_ref": content_hash("x = 1")}) == "x = 1"
+    
+    await coordinator.process_message(Message("analysis_result", "analyzer_1", "coordinator_1", {"session_id": "s1", "issues": []}))
+    
+    session = coordinator.active_sessions["s1"]
+    assert session["state"] == "completed"
+    assert "code_ref" not in session
+    assert coordinator.content_store.stats()["sessions"] == 0
+    assert coordinator.get_session_stats()["finished"] == 1
+
+
+@pytest.mark.asyncio
+async def test_conditional_save_only_applies_in_the_expected_state():
+    """
+    Test that save() with expected_state is a compare-and-set on the stored state
+    """
+    store = InMemorySessionStore()
+    await store.save("s1", {"state": "analyzing"})
+    
+    session = await store.load("s1")
+    session["state"] = "generating_fixes"
+    assert (await store.load("s1"))["state"] == "analyzing"
+    
+    assert await store.save("s1", session, expected_state="analyzing") is True
+    assert await store.save("s1", {"state": "analyzing", "issues": []}, expected_state="analyzing") is False
+    assert await store.save("missing", {"state": "completed"}, expected_state="analyzing") is False
+    assert (await store.load("s1"))["state"] == "generating_fixes"
+
+
+@pytest.mark.asyncio
+async def test_late_progress_does_not_overwrite_another_workers_transition():
+    """
+    Test that a progress update read before another coordinator moved the session on is dropped
+    """
+    class SlowLoadStore(InMemorySessionStore):
+        async def load(self, session_id):
+            session = await super().load(session_id)
+            await asyncio.sleep(0.01)
+            return session
+    
+    async def send_message(message):
+        pass
+    
+    store = SlowLoadStore()
+    registry = {"analyzer_1": object(), "fix_generator_1": object()}
+    coordinators = [CoordinatorAgent(f"coordinator_{i}", llm_client=None, agent_registry=registry, session_store=store) for i in (1, 2)]
+    for coordinator in coordinators:
+        coordinator.content_store = InMemoryContentStore()
+        coordinator.send_message = send_message
+    
+    await coordinators[0].process_message(Message("user_request", "user", "coordinator_1", {"session_id": "s1", "code": "x = 1", "language": "python"}))
+    issues = [{"message": "full analysis", "line_start": 1}]
+    await asyncio.gather(
+        coordinators[1].process_message(Message("analysis_result", "analyzer_1", "coordinator_2", {"session_id": "s1", "issues": issues})),
+        coordinators[0].process_message(Message("analysis_progress", "analyzer_1", "coordinator_1", {"session_id": "s1", "stage": "static", "issues": []}))
+    )
+    
+    session = await store.load("s1")
+    assert session["state"] == "generating_fixes"
+    assert session["issues"] == issues
@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+from app.services.ai.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    """
+    Test that concurrent callers with the same key share one call
+    """
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result == {"value": 1} for result in results)
+    assert flight.get_stats()["coalesced"] == 4
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_shared_call():
+    """
+    Test that a cancelled waiter does not cancel the call for other waiters
+    """
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    """
+    Test that a failed call raises for every waiter and is not remembered
+    """
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_first_waiter_does_not_fail_the_shared_call():
+    """
+    Test that the shared call does not run under the first caller's token, and other waiters still get the result
+    """
+    from app.core.request_context import (
+        CancellationToken, RequestCancelledError, check_cancelled, get_cancel_token, request_context
+    )
+
+    flight = SingleFlight()
+    release = asyncio.Event()
+    seen_tokens = []
+
+    async def fetch():
+        await release.wait()
+        seen_tokens.append(get_cancel_token())
+        check_cancelled()
+        return "done"
+
+    async def waiter(token):
+        with request_context(cancel_token=token):
+            return await flight.do("key", fetch)
+
+    first_token = CancellationToken()
+    first = asyncio.create_task(waiter(first_token))
+    second = asyncio.create_task(waiter(CancellationToken()))
+    await asyncio.sleep(0)
+
+    first_token.cancel("client went away")
+    with pytest.raises(RequestCancelledError, match="client went away"):
+        await first
+    release.set()
+
+    assert await second == "done"
+    assert seen_tokens == [None]
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_deadline_is_enforced_around_the_wait():
+    """
+    Test that a waiter whose deadline passes gives up without failing the shared call
+    """
+    import time
+
+    from app.core.request_context import RequestCancelledError, request_context
+
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    async def waiter(deadline=None):
+        with request_context(deadline=deadline):
+            return await flight.do("key", fetch)
+
+    first = asyncio.create_task(waiter(time.time() + 0.01))
+    second = asyncio.create_task(waiter())
+    with pytest.raises(RequestCancelledError, match="Deadline exceeded"):
+        await first
+    release.set()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_every_waiter_leaves():
+    """
+    Test that the shared call stops once no waiter is left
+    """
+    flight = SingleFlight()
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            stopped.set()
+
+    waiter = asyncio.create_task(flight.do("key", fetch))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(stopped.wait(), timeout=1)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_caller_arriving_while_the_call_is_cancelled_starts_a_new_call():
+    """
+    Test that a call abandoned by its last waiter is not joined by a later caller
+    """
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def stuck():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fetch():
+        return "fresh"
+
+    waiter = asyncio.create_task(flight.do("key", stuck))
+    await started.wait()
+    waiter.cancel()
+    # Let the waiter leave, but not the shared call finish cancelling
+    await asyncio.sleep(0)
+
+    assert await flight.do("key", fetch) == "fresh"
+    assert flight.stats["calls"] == 2
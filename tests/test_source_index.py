@@ -0,0 +1,27 @@
+from app.utils.parsing.javascript_parser import JavaScriptParser
+from app.utils.parsing.source_index import LineIndex
+
+
+def test_line_index_maps_offsets_to_positions():
+    """
+    Test that offsets map to 1-based lines and columns, including line starts and ends
+    """
+    code = "ab\n\ncd\n"
+    index = LineIndex(code)
+    
+    assert index.line_count == 4
+    assert [index.line_of(offset) for offset in range(len(code))] == [1, 1, 1, 2, 3, 3, 3]
+    assert index.position(5) == (3, 2)
+    assert index.offset(3, 2) == 5
+
+
+def test_javascript_parser_lines_and_class_methods():
+    """
+    Test that functions and classes are reported on the right lines with their methods
+    """
+    code = "function a() {\n}\n\nclass B extends C {\n  run(x) {\n    return x;\n  }\n}\nconst d = (y) => y;\n"
+    
+    parsed = JavaScriptParser().parse(code)
+    
+    assert [(f["name"], f["line"]) for f in parsed["functions"] if f["type"] != "method"] == [("a", 1), ("d", 9)]
+    assert parsed["classes"] == [{"name": "B", "line": 4, "end_line": 8, "parent": "C", "methods": ["run"], "top_level": True}]
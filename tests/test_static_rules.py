@@ -0,0 +1,115 @@
+import ast
+
+from app.utils.parsing.parser_factory import get_parser_for_language
+from app.utils.static_analysis.engine import Rule, RuleEngine
+from app.utils.static_analysis.python_rules import rule_engine
+
+CODE = '''import os
+import sys
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections import OrderedDict
+
+
+def collect(items=[], *, seen={}):
+    unused = 1
+    try:
+        total = sum(items) / 0
+    except:
+        return missing_name
+    return total
+    print("never")
+
+
+def scale(values: "List[int]", list):
+    return [value * 2 for value in values], sys.argv
+
+
+def divide(a, b):
+    return a / b
+
+
+def safe_divide(a, b):
+    if b == 0:
+        return 0
+    return a / b
+
+
+print(divide(10, 0), safe_divide(1, 0), "%d" % 0)
+'''
+
+
+def _findings(code: str = CODE):
+    return [(f.rule, f.line) for f in rule_engine.run(get_parser_for_language("python").parse_module(code))]
+
+
+def test_rules_report_common_python_bugs():
+    """
+    Test that each built-in rule reports its issue on the right line, and nothing else is reported
+    """
+    assert _findings() == [
+        ("unused_import", 1),
+        ("mutable_default", 9),
+        ("mutable_default", 9),
+        ("unused_variable", 10),
+        ("division_by_zero", 12),
+        ("bare_except", 13),
+        ("undefined_name", 14),
+        ("unreachable_code", 16),
+        ("shadowed_builtin", 19),
+        ("division_by_zero", 33),
+    ]
+
+
+def test_scoping_does_not_produce_false_positives():
+    """
+    Test globals, nonlocals, class bodies, comprehensions, __all__ and guarded imports
+    """
+    code = '''__all__ = ["exported"]
+try:
+    import optional_dependency
+except ImportError:
+    optional_dependency = None
+from os import path as exported
+
+counter = 0
+
+
+def bump():
+    global counter
+    counter += 1
+
+
+def outer():
+    value = 0
+
+    def inner():
+        nonlocal value
+        value = 1
+    inner()
+    return value, [n for n in range(3) if n], (late := 2), late
+
+
+class Model:
+    id = 1
+    label = id
+'''
+    assert _findings(code) == []
+
+
+def test_custom_rules_run_in_the_same_pass():
+    """
+    Test that a rule subscribed to node types is called during the engine's walk
+    """
+    class CallRule(Rule):
+        rule_id = "call"
+        node_types = (ast.Call,)
+        
+        def visit(self, node):
+            self.report(node, f"call to {node.func.id}")
+    
+    findings = RuleEngine([CallRule]).run(get_parser_for_language("python").parse_module("print(len([]))\n"))
+    
+    assert [finding.message for finding in findings] == ["call to print", "call to len"]
+    assert RuleEngine([CallRule]).run(get_parser_for_language("python").parse_module("def (:\n")) == []
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.agents.agent_system import ROLE_API, ROLE_WORKER, AgentSystem
+from app.agents.base_agent import BaseAgent, Message
+from app.agents.coordinator_agent import CoordinatorAgent
+from app.agents.session_store import InMemorySessionStore
+from app.agents.transport import InMemoryTransport, decode_message, encode_message
+
+
+class CleanAnalyzer(BaseAgent):
+    """Analyzer stand-in that never finds issues."""
+    def __init__(self, agent_id: str):
+        super().__init__(agent_id, "analyzer")
+    
+    async def process_message(self, message):
+        return Message(
+            message_type="analysis_result",
+            sender_id=self.agent_id,
+            recipient_id=message.sender_id,
+            content={"session_id": message.content["session_id"], "issues": []}
+        )
+
+
+def test_messages_round_trip_through_the_broker_encoding():
+    """
+    Test that a message survives serialization for the broker
+    """
+    message = Message("fix_request", "coordinator_1", "fix_generator_1", {"session_id": "s1", "issues": [{"line_start": 3}]}, parent_id="p1")
+    
+    decoded = decode_message(encode_message(message))
+    
+    assert decoded.to_dict() == message.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_api_process_submits_and_worker_process_completes_sessions():
+    """
+    Test that an API-role system with no agents is served by a worker-role system over a shared transport and store
+    """
+    transport = InMemoryTransport()
+    store = InMemorySessionStore()
+    api = AgentSystem(llm_client=None, role=ROLE_API, transport=transport, session_store=store)
+    api.initialize_agents()
+    worker = AgentSystem(llm_client=None, role=ROLE_WORKER, transport=transport, session_store=store)
+    worker.register_agent(CleanAnalyzer("analyzer_1"))
+    worker.register_agent(CoordinatorAgent("coordinator_1", llm_client=None, agent_registry=worker.agents, session_store=store))
+    for agent in worker.agents.values():
+        agent.send_message = worker.send_message
+    
+    runner = asyncio.create_task(worker.start())
+    try:
+        session_id = await api.submit_user_request("user", "x = 1", "python")
+        session = await api.wait_for_session(session_id, timeout=2)
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    
+    assert api.agents == {}
+    assert session["state"] == "completed"
+    assert transport.backlog() == 0